@@ -3,7 +3,7 @@ from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.fields import Field
 
-from .models import AttendeeProfile, PretixOrder
+from .models import AttendeeProfile, PretixOrder, PretixSyncCheckpoint, PretixSyncRun
 
 
 @admin.register(PretixOrder)
@@ -77,3 +77,37 @@ class AttendeeProfileAdmin(ImportExportModelAdmin):
     )
     readonly_fields = ("raw_answers",)
     resource_classes = [AttendeeProfileResource]
+
+
+@admin.register(PretixSyncCheckpoint)
+class PretixSyncCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "conference",
+        "status",
+        "full",
+        "pages_synced",
+        "orders_synced",
+        "orders_skipped",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+
+
+@admin.register(PretixSyncRun)
+class PretixSyncRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "started_at",
+        "source",
+        "event_slug",
+        "full",
+        "finished_at",
+        "pages_fetched",
+        "http_seconds",
+        "orders_inserted",
+        "orders_updated",
+        "orders_skipped",
+        "retries",
+    )
+    list_filter = ("source", "conference")
+    date_hierarchy = "started_at"
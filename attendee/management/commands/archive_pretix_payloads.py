@@ -0,0 +1,70 @@
+"""
+Management command to shrink the raw Pretix payloads of past conferences.
+"""
+
+from django.core.management.base import BaseCommand
+
+from attendee.models import PayloadCodec, PretixOrderPayload
+from common.bulk import BATCH_SIZE, bulk_upsert
+from portal.models import Conference
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompress the raw Pretix payloads of conferences whose stats are "
+        "frozen, or purge them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="Only archive the payloads of this year's conference.",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete the payloads instead of recompressing them. Their "
+            "orders' raw_data is then gone until a --full sync imports it again.",
+        )
+
+    def handle(self, *args, **options):
+        # A conference is frozen once freeze_stats() has snapshotted its stats;
+        # nothing reads its orders' payloads after that.
+        conferences = Conference.objects.exclude(historical_snapshot={}).order_by(
+            "year"
+        )
+        if options["year"]:
+            conferences = conferences.filter(year=options["year"])
+        if not conferences:
+            self.stdout.write(self.style.WARNING("No frozen conference to archive"))
+            return
+
+        for conference in conferences:
+            payloads = PretixOrderPayload.objects.filter(order__conference=conference)
+            if options["purge"]:
+                _, deleted = payloads.delete()
+                count = deleted.get(PretixOrderPayload._meta.label, 0)
+                action = "purged"
+            else:
+                count = self.recompress(payloads.exclude(codec=PayloadCodec.LZMA))
+                action = "archived"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{conference}: {action} {count} Pretix order payloads"
+                )
+            )
+
+    def recompress(self, payloads):
+        """Rewrite ``payloads`` with the LZMA codec, a batch at a time."""
+        pks = list(payloads.values_list("pk", flat=True))
+        for start in range(0, len(pks), BATCH_SIZE):
+            end = start + BATCH_SIZE
+            batch = list(PretixOrderPayload.objects.filter(pk__in=pks[start:end]))
+            for payload in batch:
+                payload.data = PretixOrderPayload.compress(
+                    payload.load(), PayloadCodec.LZMA
+                )
+                payload.codec = PayloadCodec.LZMA
+            bulk_upsert(PretixOrderPayload, batch, "order")
+        return len(pks)
@@ -2,47 +2,184 @@
 Management command to fetch orders from Pretix and collect Attendee data.
 """
 
-from django.core.management.base import BaseCommand
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from attendee.models import AttendeeProfile, PretixOrder
-from common.pretix_wrapper import PRETIX_EVENT_SLUG, PRETIX_ORG, PretixWrapper
+from django.core.management.base import BaseCommand, CommandError
+
+from attendee.models import PretixSyncRun, PretixSyncSource
+from attendee.sync import (
+    PRETIX_SYNC_WORKERS,
+    WATERMARK_OVERLAP,
+    advance_watermark,
+    sync_orders,
+)
+from attendee.tasks import start_pretix_sync_task
+from common.pretix_wrapper import PRETIX_ORG, PretixRequestStats, PretixWrapper
+from portal.models import Conference
+
+# Pages each worker may fetch ahead of the database writes.
+PRETIX_SYNC_PREFETCH = 2
+
+
+class EventSync:
+    """The progress of syncing one conference's Pretix event."""
+
+    def __init__(self, conference, full):
+        self.conference = conference
+        self.wrapper = PretixWrapper(PRETIX_ORG, conference.pretix_event_slug)
+        self.synced_until = conference.pretix_orders_synced_until
+        self.modified_since = None
+        if self.synced_until and not full:
+            self.modified_since = self.synced_until - WATERMARK_OVERLAP
+        self.orders_synced = 0
+        self.orders_skipped = 0
+        # Written to by the worker fetching the event, read once it is done.
+        self.requests = PretixRequestStats()
+        self.run = PretixSyncRun.objects.create(
+            conference=conference,
+            event_slug=conference.pretix_event_slug,
+            source=PretixSyncSource.COMMAND,
+            full=full,
+        )
+
+    def __str__(self):
+        return self.conference.pretix_event_slug
+
+    def add_page(self, page, skipped):
+        self.orders_synced += len(page) - skipped
+        self.orders_skipped += skipped
+        self.synced_until = advance_watermark(self.synced_until, page)
+
+    def finish(self, error=None):
+        self.run.add_requests(self.requests)
+        self.run.finish(error)
+
+    def save_watermark(self):
+        # Only advance the watermark once every page is in, so a failed run
+        # starts over from the same point next time.
+        if self.synced_until:
+            Conference.objects.filter(pk=self.conference.pk).update(
+                pretix_orders_synced_until=self.synced_until
+            )
 
 
 class Command(BaseCommand):
     help = "Fetch Pretix orders and sync attendee demographics"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Sync every order of the event, not only those changed since "
+            "the last run, and import the ones that are unchanged again.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the sync as Celery tasks, a page per task, instead of "
+            "running it here. Follow it on the organizer dashboard.",
+        )
+
     def handle(self, *args, **options):
-        pretix_wrapper = PretixWrapper(PRETIX_ORG, PRETIX_EVENT_SLUG)
-        orders_synced = 0
-        profiles_synced = 0
-
-        for order in pretix_wrapper.get_orders():
-            order_code = order["code"]
-            pretix_order, created = PretixOrder.objects.get_or_create(
-                order_code=order_code,
-                defaults={"conference": PretixOrder.resolve_conference(order["event"])},
+        if options["background"]:
+            start_pretix_sync_task.delay(full=options["full"])
+            self.stdout.write(self.style.SUCCESS("Queued a background Pretix sync"))
+            return
+
+        conferences = Conference.objects.exclude(pretix_event_slug="").order_by("year")
+        events = [EventSync(conference, options["full"]) for conference in conferences]
+        if not events:
+            self.stdout.write(
+                self.style.WARNING("No conference has a Pretix event to sync")
             )
-            pretix_order.from_pretix_data(order)
-            pretix_order.save()
-            orders_synced += 1
+            return
+
+        # Workers only talk to Pretix; every database write happens here, on
+        # the main thread, a page at a time as the pages come in.
+        workers = min(PRETIX_SYNC_WORKERS, len(events))
+        pages = queue.Queue(maxsize=workers * PRETIX_SYNC_PREFETCH)
+        stop = threading.Event()
+
+        def fetch(event):
+            try:
+                with event.requests.record():
+                    for page in event.wrapper.get_order_pages(
+                        modified_since=event.modified_since
+                    ):
+                        if stop.is_set():
+                            return
+                        pages.put((event, page, None))
+            except Exception as error:
+                result = error
+            else:
+                result = None
+            if not stop.is_set():
+                pages.put((event, None, result))
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for event in events:
+                executor.submit(fetch, event)
+            try:
+                remaining = len(events)
+                while remaining:
+                    event, page, error = pages.get()
+                    if page is not None:
+                        self.sync_page(event, page, options["full"])
+                    elif error is not None:
+                        remaining -= 1
+                        failed.append(event)
+                        event.finish(error)
+                        self.stderr.write(f"{event}: sync failed: {error!r}")
+                    else:
+                        remaining -= 1
+                        event.save_watermark()
+                        event.finish()
+                        self.report(event)
+            except Exception as error:
+                for event in events:
+                    if event.run.finished_at is None:
+                        event.finish(error)
+                raise
+            finally:
+                # Unblock workers waiting for room in the queue; each puts at
+                # most one more item once it sees ``stop``.
+                stop.set()
+                while not pages.empty():
+                    pages.get_nowait()
 
-            # Sync attendee profile for paid orders
-            profile, profile_created = AttendeeProfile.objects.get_or_create(
-                order=pretix_order
+        synced = sum(event.orders_synced for event in events)
+        skipped = sum(event.orders_skipped for event in events)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully synced {synced} orders and {synced} attendee profiles "
+                f"from {len(events) - len(failed)} events, "
+                f"skipped {skipped} unchanged orders"
+            )
+        )
+        if failed:
+            raise CommandError(
+                f"Failed to sync Pretix events: {', '.join(map(str, failed))}"
             )
-            profile.from_pretix_data(order)
-            profile.save()
-            profiles_synced += 1
 
-            if profile_created:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Created attendee profile for order {order_code}"
-                    )
-                )
+    def sync_page(self, event, page, full):
+        created, skipped = sync_orders(
+            page, conference=event.conference, force=full, run=event.run
+        )
+        for order_code in created:
+            self.stdout.write(
+                self.style.SUCCESS(f"Created attendee profile for order {order_code}")
+            )
+        event.add_page(page, skipped)
 
+    def report(self, event):
+        since = f" changed since {event.modified_since}" if event.modified_since else ""
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully synced {orders_synced} orders and {profiles_synced} attendee profiles"
+                f"{event}: synced {event.orders_synced} orders{since} and "
+                f"{event.orders_synced} attendee profiles, "
+                f"skipped {event.orders_skipped} unchanged orders"
             )
         )
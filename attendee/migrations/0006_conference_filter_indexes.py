@@ -0,0 +1,28 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0005_alter_pretixorder_conference"),
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pretixorder",
+            index=models.Index(
+                fields=["conference", "status"], name="pretix_order_conf_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pretixorder",
+            index=models.Index(
+                condition=models.Q(("status", "p")),
+                fields=["conference", "total"],
+                name="pretix_order_paid_conf_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.13 on 2026-10-19 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0006_conference_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pretixorder",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True
+            ),
+        ),
+    ]
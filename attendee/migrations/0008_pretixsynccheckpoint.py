@@ -0,0 +1,63 @@
+# Generated by Django 5.2.13 on 2026-10-19 19:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0007_pretixorder_content_hash"),
+        ("portal", "0008_conference_pretix_orders_synced_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PretixSyncCheckpoint",
+            fields=[
+                (
+                    "basemodel_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="portal.basemodel",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                    ),
+                ),
+                ("full", models.BooleanField(default=False)),
+                ("modified_since", models.DateTimeField(blank=True, null=True)),
+                ("next_url", models.URLField(blank=True, max_length=1000)),
+                ("synced_until", models.DateTimeField(blank=True, null=True)),
+                ("pages_synced", models.PositiveIntegerField(default=0)),
+                ("orders_synced", models.PositiveIntegerField(default=0)),
+                ("orders_skipped", models.PositiveIntegerField(default=0)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                (
+                    "conference",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pretix_sync",
+                        to="portal.conference",
+                    ),
+                ),
+            ],
+            bases=("portal.basemodel",),
+        ),
+    ]
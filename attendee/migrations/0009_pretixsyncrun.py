@@ -0,0 +1,81 @@
+# Generated by Django 5.2.13 on 2026-10-19 19:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0008_pretixsynccheckpoint"),
+        ("portal", "0008_conference_pretix_orders_synced_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PretixSyncRun",
+            fields=[
+                (
+                    "basemodel_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="portal.basemodel",
+                    ),
+                ),
+                ("event_slug", models.CharField(max_length=100)),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("command", "fetch_pretix_orders"),
+                            ("background", "Background sync"),
+                            ("webhook", "Webhook batch"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("full", models.BooleanField(default=False)),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("pages_fetched", models.PositiveIntegerField(default=0)),
+                ("http_seconds", models.FloatField(default=0)),
+                ("retries", models.PositiveIntegerField(default=0)),
+                ("orders_inserted", models.PositiveIntegerField(default=0)),
+                ("orders_updated", models.PositiveIntegerField(default=0)),
+                ("orders_skipped", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                (
+                    "conference",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pretix_sync_runs",
+                        to="portal.conference",
+                    ),
+                ),
+            ],
+            bases=("portal.basemodel",),
+        ),
+        migrations.AddField(
+            model_name="pretixsynccheckpoint",
+            name="run",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="attendee.pretixsyncrun",
+            ),
+        ),
+    ]
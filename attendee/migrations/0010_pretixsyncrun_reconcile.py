@@ -0,0 +1,26 @@
+# Generated by Django 5.2.13 on 2026-10-19 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0009_pretixsyncrun"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pretixsyncrun",
+            name="source",
+            field=models.CharField(
+                choices=[
+                    ("command", "fetch_pretix_orders"),
+                    ("background", "Background sync"),
+                    ("webhook", "Webhook batch"),
+                    ("reconcile", "Reconciliation"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
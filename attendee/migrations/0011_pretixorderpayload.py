@@ -0,0 +1,104 @@
+# Generated by Django 5.2.13 on 2026-10-19 19:41
+
+import json
+import lzma
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# The compression is spelled out here rather than imported from
+# attendee.models, so the migration replays the same whatever becomes of it.
+DECOMPRESS = {"zlib": zlib.decompress, "lzma": lzma.decompress}
+
+
+def move_to_payloads(apps, schema_editor):
+    """Compress each order's ``raw_data`` into a payload (zlib, compact JSON).
+
+    ``AttendeeProfile.raw_answers`` is dropped: it is the answers of the
+    positions in ``raw_data``, and read from there from now on.
+    """
+    PretixOrder = apps.get_model("attendee", "PretixOrder")
+    PretixOrderPayload = apps.get_model("attendee", "PretixOrderPayload")
+    orders = (
+        PretixOrder.objects.exclude(raw_data=None)
+        .values_list("pk", "raw_data")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for order_id, raw_data in orders:
+        data = json.dumps(raw_data, separators=(",", ":")).encode()
+        PretixOrderPayload.objects.create(
+            order_id=order_id, codec="zlib", data=zlib.compress(data)
+        )
+
+
+def move_from_payloads(apps, schema_editor):
+    PretixOrder = apps.get_model("attendee", "PretixOrder")
+    PretixOrderPayload = apps.get_model("attendee", "PretixOrderPayload")
+    AttendeeProfile = apps.get_model("attendee", "AttendeeProfile")
+    for payload in PretixOrderPayload.objects.iterator(chunk_size=BATCH_SIZE):
+        raw_data = json.loads(DECOMPRESS[payload.codec](bytes(payload.data)))
+        PretixOrder.objects.filter(pk=payload.order_id).update(raw_data=raw_data)
+        AttendeeProfile.objects.filter(order_id=payload.order_id).update(
+            raw_answers=[
+                answer
+                for position in raw_data.get("positions", [])
+                for answer in position.get("answers", [])
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendee", "0010_pretixsyncrun_reconcile"),
+        ("portal", "0008_conference_pretix_orders_synced_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PretixOrderPayload",
+            fields=[
+                (
+                    "basemodel_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="portal.basemodel",
+                    ),
+                ),
+                (
+                    "codec",
+                    models.CharField(
+                        choices=[("zlib", "zlib"), ("lzma", "lzma (archived)")],
+                        default="zlib",
+                        max_length=10,
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payload",
+                        to="attendee.pretixorder",
+                    ),
+                ),
+            ],
+            bases=("portal.basemodel",),
+        ),
+        migrations.RunPython(move_to_payloads, move_from_payloads),
+        migrations.RemoveField(
+            model_name="attendeeprofile",
+            name="raw_answers",
+        ),
+        migrations.RemoveField(
+            model_name="pretixorder",
+            name="raw_data",
+        ),
+    ]
@@ -1,6 +1,12 @@
+import hashlib
+import json
+import lzma
+import zlib
 from enum import StrEnum
 
 from django.db import models
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
 
 from portal.models import BaseModel, ChoiceArrayField
 
@@ -101,6 +107,85 @@ ATTENDEE_FIELD_MAPPING = {
 }
 
 
+# The parts of a pretix order we import; a change anywhere else (a comment,
+# an internal note, a resent email) does not need the order imported again.
+PRETIX_HASHED_ORDER_FIELDS = [
+    "code",
+    "event",
+    "status",
+    "email",
+    "total",
+    "cancellation_date",
+    "url",
+    "datetime",
+]
+PRETIX_HASHED_POSITION_FIELDS = ["attendee_name", "answers"]
+
+
+def parse_boolean_answer(answer_value):
+    return "yes" in answer_value.lower()
+
+
+def parse_choices_answer(answer_value):
+    # remove extra comma in the specific case of participated_in_previous_event
+    answer_value = answer_value.replace(
+        "No, this is my first one", "No this is my first one"
+    )
+    return [answer.strip() for answer in answer_value.split(",")]
+
+
+def parse_text_answer(answer_value):
+    return None if answer_value.lower() == "none" else answer_value
+
+
+# How an answer is read, by the type of the AttendeeProfile field it goes to;
+# any other field is treated as a CharField/free text field.
+ANSWER_PARSERS_BY_FIELD_TYPE = {
+    "BooleanField": parse_boolean_answer,
+    "ChoiceArrayField": parse_choices_answer,
+}
+
+
+class PretixPositions:
+    """What we import from the positions of pretix order ``data``.
+
+    Read in a single pass over the positions and their answers, and shared by
+    ``PretixOrder.from_pretix_data`` and ``AttendeeProfile.from_pretix_data``.
+    """
+
+    def __init__(self, data):
+        self.name = None
+        self.is_anonymous = None
+        self.profile_fields = {}
+        self.answers = []
+
+        for position in data.get("positions", []):
+            if self.name is None and position.get("attendee_name"):
+                self.name = position["attendee_name"]
+            answers = position.get("answers", [])
+            self.answers.extend(answers)
+
+            has_pyladies_chapter = False
+            for answer in answers:
+                question_id = answer.get("question_identifier")
+                if (
+                    self.is_anonymous is None
+                    and question_id == PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER
+                ):
+                    self.is_anonymous = (
+                        PRETIX_STAY_ANONYMOUS_ANSWER_IDENTIFIER
+                        in answer["option_identifiers"]
+                    )
+                parser = ATTENDEE_ANSWER_PARSERS.get(question_id)
+                if parser is not None:
+                    field_name, parse = parser
+                    self.profile_fields[field_name] = parse(answer.get("answer"))
+                    if field_name == "pyladies_chapter":
+                        has_pyladies_chapter = True
+            if not has_pyladies_chapter:
+                self.profile_fields["pyladies_chapter"] = None
+
+
 class PretixOrder(BaseModel):
     # Every order belongs to a conference edition, resolved from event_slug
     # matching Conference.pretix_event_slug (Phase 3 backfilled existing rows;
@@ -126,64 +211,136 @@ class PretixOrder(BaseModel):
     url = models.URLField(null=True, blank=True)
     is_anonymous = models.BooleanField(default=True, null=True, blank=True)
     event_slug = models.CharField(max_length=100, null=True)
-    raw_data = models.JSONField(null=True, blank=True)
+    # hash_pretix_data() of the pretix data last imported into this order
+    content_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False
+    )
+
+    class Meta:
+        # The stats count and sum each edition's orders by status, and only
+        # ever the paid ones; the partial index is all those queries read.
+        indexes = [
+            models.Index(
+                fields=["conference", "status"], name="pretix_order_conf_status_idx"
+            ),
+            models.Index(
+                fields=["conference", "total"],
+                condition=models.Q(status=PretixOrderstatus.PAID.value),
+                name="pretix_order_paid_conf_idx",
+            ),
+        ]
+
+    # Imported by from_pretix_data(), and written to the payload on save().
+    _unsaved_raw_data = None
 
     def __str__(self):
         return self.order_code
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self._unsaved_raw_data is not None:
+            try:
+                payload = self.payload
+            except PretixOrderPayload.DoesNotExist:
+                payload = PretixOrderPayload(order=self)
+            payload.codec = PayloadCodec.ZLIB
+            payload.data = PretixOrderPayload.compress(self._unsaved_raw_data)
+            payload.save()
+            self._unsaved_raw_data = None
+
+    @property
+    def raw_data(self):
+        """The pretix data last imported into this order, or ``None``.
+
+        Kept in the order's ``PretixOrderPayload`` and only read from there
+        when asked for, so querying orders never loads it.
+        """
+        if self._unsaved_raw_data is not None:
+            return self._unsaved_raw_data
+        try:
+            return self.payload.load()
+        except PretixOrderPayload.DoesNotExist:
+            return None
+
+    @raw_data.setter
+    def raw_data(self, data):
+        self._unsaved_raw_data = data
+
     @staticmethod
     def resolve_conference(event_slug):
         """Map a pretix event slug to its Conference.
 
         Matches ``Conference.pretix_event_slug`` so a future year's orders land
         on the right edition automatically; falls back to the active conference
-        when no edition declares that slug.
+        when no edition declares that slug. Each process caches the lookups,
+        see ``Conference.for_pretix_event``.
         """
         from portal.models import Conference
 
-        return (
-            Conference.objects.filter(pretix_event_slug=event_slug).first()
-            or Conference.get_active()
-        )
+        return Conference.for_pretix_event(event_slug)
 
-    def from_pretix_data(self, data):
-        """Populate the PretixOrder instance from pretix order data."""
-        if self.last_modified != data["last_modified"]:
+    @staticmethod
+    def hash_pretix_data(data):
+        """Return a stable hash of the parts of pretix order ``data`` we import."""
+        relevant = {field: data.get(field) for field in PRETIX_HASHED_ORDER_FIELDS}
+        relevant["positions"] = [
+            {field: position.get(field) for field in PRETIX_HASHED_POSITION_FIELDS}
+            for position in data.get("positions", [])
+        ]
+        encoded = json.dumps(relevant, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def is_current(self, data):
+        """Whether this stored order already holds pretix order ``data``.
+
+        That is, pretix has not modified the order since it was imported, or
+        did not change anything we import.
+        """
+        if self.pk is None:
+            return False
+        last_modified = data.get("last_modified")
+        if last_modified and self.last_modified == parse_datetime(last_modified):
+            return True
+        return self.content_hash == self.hash_pretix_data(data)
+
+    def from_pretix_data(self, data, conference=None, force=False, positions=None):
+        """Populate the PretixOrder instance from pretix order data.
+
+        Pass the order's ``conference`` when it is already known, to save
+        looking it up from the event slug, and its ``PretixPositions`` when
+        they are read already. Data the order already holds is not imported
+        again, unless ``force`` is set.
+        """
+        if force or not self.is_current(data):
             # update only if there are changes
+            last_modified = data.get("last_modified", None)
             self.status = data["status"]
             self.email = data.get("email", "")
             self.total = data.get("total", 0.0)
             self.cancellation_date = data.get("cancellation_date", None)
             self.url = data.get("url", "")
             self.datetime = data.get("datetime", None)
-            self.last_modified = data.get("last_modified", None)
+            self.last_modified = last_modified and parse_datetime(last_modified)
             self.event_slug = data["event"]
-            self.conference = self.resolve_conference(data["event"])
-            self.set_name_from_data(data)
-            self.set_is_anonymous_from_data(data)
+            self.conference = conference or self.resolve_conference(data["event"])
+            positions = positions or PretixPositions(data)
+            self.set_name_from_data(data, positions)
+            self.set_is_anonymous_from_data(data, positions)
             self.raw_data = data
+            self.content_hash = self.hash_pretix_data(data)
         return self
 
-    def set_name_from_data(self, data):
+    def set_name_from_data(self, data, positions=None):
         """Set the name field from pretix order data."""
-        for pos in data["positions"]:
-            if pos["attendee_name"]:
-                self.name = pos["attendee_name"]
-                return
+        positions = positions or PretixPositions(data)
+        if positions.name is not None:
+            self.name = positions.name
 
-    def set_is_anonymous_from_data(self, data):
+    def set_is_anonymous_from_data(self, data, positions=None):
         """Set the is_anonymous field from pretix order data."""
-        for pos in data["positions"]:
-            for answer in pos["answers"]:
-                if (
-                    answer["question_identifier"]
-                    == PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER
-                ):
-                    self.is_anonymous = (
-                        PRETIX_STAY_ANONYMOUS_ANSWER_IDENTIFIER
-                        in answer["option_identifiers"]
-                    )
-                    return
+        positions = positions or PretixPositions(data)
+        if positions.is_anonymous is not None:
+            self.is_anonymous = positions.is_anonymous
 
 
 class AttendeeProfile(BaseModel):
@@ -268,9 +425,6 @@ class AttendeeProfile(BaseModel):
         help_text="Organization you work for",
     )
 
-    # Store raw answers from pretix in case we need additional data
-    raw_answers = models.JSONField(null=True, blank=True)
-
     class Meta:
         verbose_name = "Attendee Profile"
         verbose_name_plural = "Attendee Profiles"
@@ -278,51 +432,198 @@ class AttendeeProfile(BaseModel):
     def __str__(self):
         return f"Profile for {self.order.order_code}"
 
-    def from_pretix_data(self, pretix_data):
+    @property
+    def raw_answers(self):
+        """Every answer of the order's positions, from its ``raw_data``."""
+        data = self.order.raw_data
+        if data is None:
+            return None
+        return [
+            answer
+            for position in data.get("positions", [])
+            for answer in position.get("answers", [])
+        ]
+
+    def from_pretix_data(self, pretix_data, positions=None):
         """
         Extract attendee demographic data from pretix order data.
         This method maps pretix question identifiers to model fields.
         """
-        # Store all answers for reference
-        all_answers = []
+        positions = positions or PretixPositions(pretix_data)
+        for field_name, value in positions.profile_fields.items():
+            setattr(self, field_name, value)
+        return self
 
-        for position in pretix_data.get("positions", []):
-            answers = position.get("answers", [])
-            all_answers.extend(answers)
 
-            # Map pretix question identifiers to our fields
-            has_pyladies_chapter = False
-            for answer in answers:
-                question_id = answer.get("question_identifier")
-                answer_value = answer.get("answer")
-
-                if question_id in ATTENDEE_FIELD_MAPPING:
-                    field_name = ATTENDEE_FIELD_MAPPING[question_id]
-                    field = AttendeeProfile._meta.get_field(field_name)
-                    field_type = field.get_internal_type()
-                    match field_type:
-                        case "BooleanField":
-                            setattr(self, field_name, "yes" in answer_value.lower())
-                        case "ChoiceArrayField":
-                            # remove extra comma in the specific case of participated_in_previous_event
-                            answer_value = answer_value.replace(
-                                "No, this is my first one", "No this is my first one"
-                            )
-                            answers = [
-                                answer.strip() for answer in answer_value.split(",")
-                            ]
-                            setattr(self, field_name, answers)
-
-                        case _:
-                            # treat as CharField/Freetext field by default
-                            if answer_value.lower() == "none":
-                                setattr(self, field_name, None)
-                            else:
-                                setattr(self, field_name, answer_value)
+class PayloadCodec(models.TextChoices):
+    ZLIB = "zlib", "zlib"
+    # Smaller, and slower to write; for the payloads of past conferences.
+    LZMA = "lzma", "lzma (archived)"
 
-                    if field_name == "pyladies_chapter":
-                        has_pyladies_chapter = True
-            if not has_pyladies_chapter:
-                setattr(self, "pyladies_chapter", None)
-        self.raw_answers = all_answers
-        return self
+
+PAYLOAD_CODECS = {
+    PayloadCodec.ZLIB: (zlib.compress, zlib.decompress),
+    PayloadCodec.LZMA: (
+        lambda data: lzma.compress(data, preset=9 | lzma.PRESET_EXTREME),
+        lzma.decompress,
+    ),
+}
+
+
+class PretixOrderPayload(BaseModel):
+    """The pretix data last imported into an order, compressed.
+
+    Kept apart from ``PretixOrder`` so the stats, the admin and the exports,
+    which never use it, never read it either. ``PretixOrder.raw_data`` and
+    ``AttendeeProfile.raw_answers`` load it when asked for, and
+    ``archive_pretix_payloads`` shrinks or drops the payloads of conferences
+    whose stats are frozen.
+    """
+
+    order = models.OneToOneField(
+        PretixOrder, on_delete=models.CASCADE, related_name="payload"
+    )
+    codec = models.CharField(
+        max_length=10, choices=PayloadCodec.choices, default=PayloadCodec.ZLIB
+    )
+    data = models.BinaryField()
+
+    def __str__(self):
+        return f"Payload of {self.order_id}"
+
+    @staticmethod
+    def compress(data, codec=PayloadCodec.ZLIB):
+        """Return pretix ``data`` as JSON, compressed with ``codec``."""
+        compress, _ = PAYLOAD_CODECS[codec]
+        return compress(json.dumps(data, separators=(",", ":")).encode())
+
+    def load(self):
+        """Return the pretix data of the payload."""
+        _, decompress = PAYLOAD_CODECS[self.codec]
+        return json.loads(decompress(bytes(self.data)))
+
+
+class PretixSyncStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class PretixSyncSource(models.TextChoices):
+    COMMAND = "command", "fetch_pretix_orders"
+    BACKGROUND = "background", "Background sync"
+    WEBHOOK = "webhook", "Webhook batch"
+    RECONCILE = "reconcile", "Reconciliation"
+
+
+class PretixSyncRun(BaseModel):
+    """What one sync of a Pretix event, or one batch of webhooks, did and cost.
+
+    ``fetch_pretix_orders`` and the reconciliation record a run per event, a
+    background sync a run per attempt (it may span many tasks), and the
+    webhook task a run per batch. The organizer dashboard charts them, see
+    ``PretixSyncRunsView``.
+    """
+
+    conference = models.ForeignKey(
+        "portal.Conference",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="pretix_sync_runs",
+    )
+    event_slug = models.CharField(max_length=100)
+    source = models.CharField(max_length=20, choices=PretixSyncSource.choices)
+    full = models.BooleanField(default=False)
+    started_at = models.DateTimeField(default=now, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Responses read from Pretix: pages of orders, or single orders.
+    pages_fetched = models.PositiveIntegerField(default=0)
+    http_seconds = models.FloatField(default=0)
+    # Requests the session retried, plus the times the task itself retried.
+    retries = models.PositiveIntegerField(default=0)
+    orders_inserted = models.PositiveIntegerField(default=0)
+    orders_updated = models.PositiveIntegerField(default=0)
+    orders_skipped = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.get_source_display()} of {self.event_slug} at {self.started_at}"
+
+    @property
+    def seconds(self):
+        """How long the run took, or ``None`` while it runs."""
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+    @property
+    def orders_per_second(self):
+        """Orders written per second of the run, or ``None`` while it runs."""
+        seconds = self.seconds
+        if not seconds:
+            return None
+        return (self.orders_inserted + self.orders_updated) / seconds
+
+    def add_requests(self, stats):
+        """Add the requests of a ``PretixRequestStats`` to the run."""
+        self.pages_fetched += stats.requests
+        self.http_seconds += stats.seconds
+        self.retries += stats.retries
+
+    def finish(self, error=None):
+        self.finished_at = now()
+        self.error = repr(error) if error is not None else ""
+        self.save()
+
+
+class PretixSyncCheckpoint(BaseModel):
+    """How far the background sync of a conference's Pretix event got.
+
+    Saved with the orders of every page it syncs, so a sync that fails
+    carries on from the page it failed on. See ``attendee.tasks``.
+    """
+
+    conference = models.OneToOneField(
+        "portal.Conference", on_delete=models.CASCADE, related_name="pretix_sync"
+    )
+    status = models.CharField(
+        max_length=20, choices=PretixSyncStatus.choices, default=PretixSyncStatus.QUEUED
+    )
+    full = models.BooleanField(default=False)
+    modified_since = models.DateTimeField(null=True, blank=True)
+    # The ``next`` link of the last page synced; empty before the first page.
+    next_url = models.URLField(max_length=1000, blank=True)
+    synced_until = models.DateTimeField(null=True, blank=True)
+    pages_synced = models.PositiveIntegerField(default=0)
+    orders_synced = models.PositiveIntegerField(default=0)
+    orders_skipped = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # The telemetry of the current attempt, made when its first page syncs.
+    run = models.ForeignKey(
+        PretixSyncRun,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    def __str__(self):
+        return f"Pretix sync of {self.conference}"
+
+
+# The parser and AttendeeProfile field of each pretix question we import,
+# worked out once rather than for every answer of every order.
+ATTENDEE_ANSWER_PARSERS = {
+    question_id: (
+        field_name,
+        ANSWER_PARSERS_BY_FIELD_TYPE.get(
+            AttendeeProfile._meta.get_field(field_name).get_internal_type(),
+            parse_text_answer,
+        ),
+    )
+    for question_id, field_name in ATTENDEE_FIELD_MAPPING.items()
+}
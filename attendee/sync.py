@@ -0,0 +1,130 @@
+"""Write Pretix orders and their attendee profiles to the database in bulk.
+
+A sync hands over one page of orders at a time. Each page costs a handful of
+statements whatever its size: one to load the orders already stored, and an
+upsert per table for the orders, their payloads and their profiles (see
+``common.bulk``).
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from attendee.models import (
+    AttendeeProfile,
+    PayloadCodec,
+    PretixOrder,
+    PretixOrderPayload,
+    PretixPositions,
+)
+from common.bulk import bulk_upsert
+
+# Re-read a little before the watermark, in case an order changed between
+# two orders Pretix had already returned. Syncing an order again is harmless.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Events fetched from Pretix at the same time. Each worker holds one of the
+# shared session's pooled connections (PRETIX_POOL_SIZE).
+PRETIX_SYNC_WORKERS = 4
+
+
+def advance_watermark(synced_until, orders):
+    """Return the latest of ``synced_until`` and the ``orders``' last changes."""
+    for order in orders:
+        last_modified = parse_datetime(order["last_modified"])
+        if synced_until is None or last_modified > synced_until:
+            synced_until = last_modified
+    return synced_until
+
+
+def divergent_orders(orders):
+    """Return the ``orders`` we lack, or hold at another ``last_modified``.
+
+    Costs one query for the codes and ``last_modified`` of the stored orders,
+    against the full rows ``sync_orders`` loads, so checking a page that is
+    already in sync stays cheap.
+    """
+    stored = dict(
+        PretixOrder.objects.filter(
+            order_code__in=[order["code"] for order in orders]
+        ).values_list("order_code", "last_modified")
+    )
+    return [
+        order
+        for order in orders
+        if order["code"] not in stored
+        or stored[order["code"]] != parse_datetime(order["last_modified"])
+    ]
+
+
+def sync_orders(orders, conference=None, force=False, run=None):
+    """Store a page of Pretix ``orders`` and their attendee profiles.
+
+    Orders are assigned to ``conference`` when given, or else to the conference
+    of their event (``PretixOrder.resolve_conference``).
+
+    Orders already stored with the same data (see ``PretixOrder.is_current``)
+    are skipped, unless ``force`` is set. Returns the order codes whose
+    attendee profile was created and the number of orders skipped. With a
+    ``PretixSyncRun``, also counts the orders inserted, updated and skipped
+    on it (the caller saves it).
+    """
+    # When an order shows up twice, its later copy is the current one.
+    latest = {data["code"]: data for data in orders}
+    if not latest:
+        return [], 0
+    stored = {
+        order.order_code: order
+        for order in PretixOrder.objects.filter(order_code__in=list(latest))
+        .select_related("profile", "payload")
+        .defer("payload__data")
+    }
+
+    conferences, pretix_orders, payloads, profiles, created = {}, [], [], [], []
+    if conference is not None:
+        conferences = {data["event"]: conference for data in latest.values()}
+    for code, data in latest.items():
+        pretix_order = stored.get(code) or PretixOrder(order_code=code)
+        try:
+            profile = pretix_order.profile
+        except AttendeeProfile.DoesNotExist:
+            profile = AttendeeProfile(order=pretix_order)
+            created.append(code)
+        else:
+            if not force and pretix_order.is_current(data):
+                continue
+        if data["event"] not in conferences:
+            conferences[data["event"]] = PretixOrder.resolve_conference(data["event"])
+        positions = PretixPositions(data)
+        pretix_order.from_pretix_data(
+            data,
+            conference=conferences[data["event"]],
+            force=force,
+            positions=positions,
+        )
+        try:
+            payload = pretix_order.payload
+        except PretixOrderPayload.DoesNotExist:
+            payload = PretixOrderPayload(order=pretix_order)
+        payload.codec = PayloadCodec.ZLIB
+        payload.data = PretixOrderPayload.compress(data)
+        pretix_orders.append(pretix_order)
+        payloads.append(payload)
+        profiles.append(profile.from_pretix_data(data, positions))
+    skipped = len(latest) - len(pretix_orders)
+    if run is not None:
+        inserted = sum(1 for order in pretix_orders if order.pk is None)
+        run.orders_inserted += inserted
+        run.orders_updated += len(pretix_orders) - inserted
+        run.orders_skipped += skipped
+    if not pretix_orders:
+        return created, skipped
+
+    with transaction.atomic():
+        bulk_upsert(PretixOrder, pretix_orders, "order_code")
+        for payload, profile, pretix_order in zip(payloads, profiles, pretix_orders):
+            # New orders only have a primary key now.
+            payload.order_id = profile.order_id = pretix_order.pk
+        bulk_upsert(PretixOrderPayload, payloads, "order")
+        bulk_upsert(AttendeeProfile, profiles, "order")
+    return created, skipped
@@ -0,0 +1,300 @@
+"""Sync the Pretix orders of every conference in the background, a page per task.
+
+``start_pretix_sync_task`` queues a sync of each conference's Pretix event and
+starts up to ``PRETIX_SYNC_WORKERS`` of them. Each sync is a chain of
+``sync_pretix_page_task`` runs, one per page of orders, that record how far
+they got on the conference's ``PretixSyncCheckpoint``; when a sync ends, the
+next queued one starts. A sync that fails, or whose worker died, carries on
+from its checkpoint the next time one is started.
+
+Each attempt at a sync records what it did and cost in a ``PretixSyncRun``.
+
+Between syncs, ``reconcile_pretix_orders_task`` runs every few minutes to
+repair the orders whose webhooks were lost.
+"""
+
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import now
+
+from attendee.models import (
+    PretixSyncCheckpoint,
+    PretixSyncRun,
+    PretixSyncSource,
+    PretixSyncStatus,
+)
+from attendee.sync import (
+    PRETIX_SYNC_WORKERS,
+    WATERMARK_OVERLAP,
+    advance_watermark,
+    divergent_orders,
+    sync_orders,
+)
+from common.pretix_wrapper import PretixRequestStats, get_wrapper
+from common.tasks import enqueue
+from portal.models import Conference
+
+logger = logging.getLogger(__name__)
+
+# A sync that has not saved its checkpoint for this long lost its worker; the
+# next start picks it up again.
+PRETIX_SYNC_STALE_AFTER = timedelta(minutes=15)
+# Held while a reconciliation runs, so one that overruns its schedule makes
+# the next a no-op instead of both syncing the same orders.
+PRETIX_RECONCILE_LOCK = "attendee:reconcile_pretix_orders"
+PRETIX_RECONCILE_LOCK_TIMEOUT = 10 * 60
+
+
+def restart_checkpoint(checkpoint, full):
+    """Set ``checkpoint`` up for a sync from the first page."""
+    synced_until = checkpoint.conference.pretix_orders_synced_until
+    checkpoint.full = full
+    checkpoint.modified_since = None
+    if synced_until and not full:
+        checkpoint.modified_since = synced_until - WATERMARK_OVERLAP
+    checkpoint.synced_until = synced_until
+    checkpoint.next_url = ""
+    checkpoint.pages_synced = 0
+    checkpoint.orders_synced = 0
+    checkpoint.orders_skipped = 0
+    checkpoint.started_at = now()
+    checkpoint.finished_at = None
+
+
+def start_next_pretix_syncs():
+    """Start queued syncs while fewer than ``PRETIX_SYNC_WORKERS`` run."""
+    with transaction.atomic():
+        running = PretixSyncCheckpoint.objects.filter(
+            status=PretixSyncStatus.RUNNING
+        ).count()
+        free = max(PRETIX_SYNC_WORKERS - running, 0)
+        starting = list(
+            PretixSyncCheckpoint.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            )
+            .filter(status=PretixSyncStatus.QUEUED)
+            .order_by("conference__year")[:free]
+        )
+        for checkpoint in starting:
+            checkpoint.status = PretixSyncStatus.RUNNING
+            checkpoint.save(update_fields=["status"])
+    for checkpoint in starting:
+        enqueue(sync_pretix_page_task, checkpoint.pk)
+    return len(starting)
+
+
+def fail_checkpoint(checkpoint, error):
+    """Mark the sync of ``checkpoint`` failed, and start the next queued one."""
+    logger.error(f"{checkpoint.conference.pretix_event_slug}: sync failed: {error!r}")
+    # Updated rather than saved: the run may count a page that was rolled back.
+    PretixSyncRun.objects.filter(pk=checkpoint.run_id).update(
+        finished_at=now(), error=repr(error)
+    )
+    PretixSyncCheckpoint.objects.filter(pk=checkpoint.pk).update(
+        status=PretixSyncStatus.FAILED,
+        error=repr(error),
+        run=None,
+        modified_date=now(),
+    )
+    start_next_pretix_syncs()
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def start_pretix_sync_task(self, full=False):
+    """Queue a sync of every conference's Pretix event, and start the first ones.
+
+    Events already being synced are left alone, and a sync that failed or
+    stalled carries on from its checkpoint. Any other sync starts over with
+    the orders changed since the last one; with ``full``, every sync starts
+    over and imports every order of its event again.
+    """
+    stale = now() - PRETIX_SYNC_STALE_AFTER
+    queued = 0
+    conferences = Conference.objects.exclude(pretix_event_slug="").order_by("year")
+    for conference in conferences:
+        checkpoint, created = PretixSyncCheckpoint.objects.get_or_create(
+            conference=conference
+        )
+        in_progress = checkpoint.status in (
+            PretixSyncStatus.QUEUED,
+            PretixSyncStatus.RUNNING,
+        )
+        if not created and in_progress and checkpoint.modified_date > stale:
+            continue
+        if checkpoint.run_id is not None:
+            # The run of a sync whose worker died never finished.
+            PretixSyncRun.objects.filter(
+                pk=checkpoint.run_id, finished_at__isnull=True
+            ).update(finished_at=now(), error="The sync stalled")
+            checkpoint.run = None
+        if created or full or checkpoint.status == PretixSyncStatus.DONE:
+            restart_checkpoint(checkpoint, full)
+        checkpoint.status = PretixSyncStatus.QUEUED
+        checkpoint.save()
+        queued += 1
+    started = start_next_pretix_syncs()
+    return f"Queued {queued} Pretix syncs, started {started}"
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_pretix_page_task(self, checkpoint_id):
+    """Sync the next page of orders of a running sync, then queue the one after.
+
+    The orders and the checkpoint are saved together, so the page is synced
+    once whatever fails later. Pretix errors are retried after 1, 2 and 4
+    minutes; after that, or on any other error, the sync is marked failed.
+    After the last page, the conference's ``pretix_orders_synced_until`` moves
+    up to the latest change synced.
+    """
+    checkpoint = (
+        PretixSyncCheckpoint.objects.select_related("conference", "run")
+        .filter(pk=checkpoint_id, status=PretixSyncStatus.RUNNING)
+        .first()
+    )
+    if checkpoint is None:
+        return f"Pretix sync {checkpoint_id} is not running"
+    conference = checkpoint.conference
+    run = checkpoint.run
+    if run is None:
+        run = checkpoint.run = PretixSyncRun.objects.create(
+            conference=conference,
+            event_slug=conference.pretix_event_slug,
+            source=PretixSyncSource.BACKGROUND,
+            full=checkpoint.full,
+        )
+        checkpoint.save(update_fields=["run"])
+
+    stats = PretixRequestStats()
+    try:
+        with stats.record():
+            page, next_url = get_wrapper(conference.pretix_event_slug).get_order_page(
+                checkpoint.next_url or None, modified_since=checkpoint.modified_since
+            )
+    except Exception as error:
+        run.add_requests(stats)
+        if self.request.retries >= self.max_retries:
+            run.save()
+            fail_checkpoint(checkpoint, error)
+            raise
+        run.retries += 1
+        run.save()
+        checkpoint.error = repr(error)
+        checkpoint.save(update_fields=["error"])
+        raise self.retry(
+            exc=error, countdown=self.default_retry_delay * 2**self.request.retries
+        )
+
+    try:
+        with transaction.atomic():
+            _, skipped = sync_orders(
+                page, conference=conference, force=checkpoint.full, run=run
+            )
+            run.add_requests(stats)
+            checkpoint.pages_synced += 1
+            checkpoint.orders_synced += len(page) - skipped
+            checkpoint.orders_skipped += skipped
+            checkpoint.synced_until = advance_watermark(checkpoint.synced_until, page)
+            checkpoint.next_url = next_url or ""
+            checkpoint.error = ""
+            if next_url is None:
+                checkpoint.status = PretixSyncStatus.DONE
+                checkpoint.finished_at = now()
+                run.finished_at = checkpoint.finished_at
+                if checkpoint.synced_until:
+                    Conference.objects.filter(pk=conference.pk).update(
+                        pretix_orders_synced_until=checkpoint.synced_until
+                    )
+            run.save()
+            checkpoint.save()
+    except Exception as error:
+        fail_checkpoint(checkpoint, error)
+        raise
+
+    if next_url is not None:
+        enqueue(sync_pretix_page_task, checkpoint.pk)
+        return f"{conference.pretix_event_slug}: synced page {checkpoint.pages_synced}"
+    logger.info(
+        f"{conference.pretix_event_slug}: synced {checkpoint.orders_synced} orders "
+        f"in {checkpoint.pages_synced} pages, "
+        f"skipped {checkpoint.orders_skipped} unchanged orders"
+    )
+    start_next_pretix_syncs()
+    return f"{conference.pretix_event_slug}: sync done"
+
+
+def reconcile_event(conference):
+    """Sync the orders of ``conference`` that changed in Pretix and not here.
+
+    Returns the ``PretixSyncRun`` of the reconciliation, which holds the
+    error when it failed.
+    """
+    synced_until = conference.pretix_orders_synced_until
+    modified_since = synced_until - WATERMARK_OVERLAP if synced_until else None
+    run = PretixSyncRun.objects.create(
+        conference=conference,
+        event_slug=conference.pretix_event_slug,
+        source=PretixSyncSource.RECONCILE,
+    )
+    stats = PretixRequestStats()
+    try:
+        with stats.record():
+            pages = get_wrapper(conference.pretix_event_slug).get_order_pages(
+                modified_since=modified_since
+            )
+            for page in pages:
+                divergent = divergent_orders(page)
+                run.orders_skipped += len(page) - len(divergent)
+                sync_orders(divergent, conference=conference, run=run)
+                synced_until = advance_watermark(synced_until, page)
+    except Exception as error:
+        logger.error(
+            f"{conference.pretix_event_slug}: reconciliation failed: {error!r}"
+        )
+        run.add_requests(stats)
+        run.finish(error)
+        return run
+    run.add_requests(stats)
+    run.finish()
+    if synced_until != conference.pretix_orders_synced_until:
+        Conference.objects.filter(pk=conference.pk).update(
+            pretix_orders_synced_until=synced_until
+        )
+    return run
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def reconcile_pretix_orders_task(self):
+    """Repair the orders whose Pretix webhooks were lost.
+
+    Scheduled every few minutes (``CELERY_BEAT_SCHEDULE``). For each
+    conference's event, lists the orders Pretix changed since the last sync
+    and compares their codes and ``last_modified`` with ours; only those that
+    differ are synced, so a run where nothing was missed costs a request and
+    a query per event. Events being synced in the background are left to
+    that sync. An event that fails is logged and tried again next time.
+    """
+    if not cache.add(PRETIX_RECONCILE_LOCK, True, PRETIX_RECONCILE_LOCK_TIMEOUT):
+        return "A Pretix reconciliation is already running"
+    try:
+        syncing = PretixSyncCheckpoint.objects.filter(
+            status__in=[PretixSyncStatus.QUEUED, PretixSyncStatus.RUNNING],
+            modified_date__gt=now() - PRETIX_SYNC_STALE_AFTER,
+        ).values("conference")
+        conferences = (
+            Conference.objects.exclude(pretix_event_slug="")
+            .exclude(pk__in=syncing)
+            .order_by("year")
+        )
+        runs = [reconcile_event(conference) for conference in conferences]
+    finally:
+        cache.delete(PRETIX_RECONCILE_LOCK)
+    repaired = sum(run.orders_inserted + run.orders_updated for run in runs)
+    result = f"Repaired {repaired} Pretix orders"
+    failed = [run.event_slug for run in runs if run.error]
+    if failed:
+        result += f", failed to reconcile {', '.join(failed)}"
+    return result
@@ -0,0 +1,101 @@
+"""Benchmarks of the Pretix order sync, against the stand-in in tests/fake_pretix.py.
+
+They are not part of the test suite (``testpaths`` only covers ``tests/``).
+Run them on their own, picking sizes with ``-k``::
+
+    pytest benchmarks --no-migrations -k "1k or 10k"
+
+Each reports the orders synced per second, the database queries per order,
+and the peak Python memory (tracemalloc) of syncing an event of 1k, 10k or
+100k orders, through ``fetch_pretix_orders`` and through its webhooks.
+tracemalloc slows everything down, and the fake Pretix runs in the same
+process, so compare runs with each other rather than with production.
+"""
+
+import json
+import time
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from attendee.models import PretixOrder
+
+BENCHMARK_SIZES = [
+    pytest.param(1_000, id="1k"),
+    pytest.param(10_000, id="10k"),
+    pytest.param(100_000, id="100k"),
+]
+
+
+def measure(name, run, capsys, record_property):
+    """Run ``run``, which returns the number of orders it synced, and report it."""
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with connection.execute_wrapper(count):
+        orders = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = {
+        "orders": orders,
+        "seconds": round(elapsed, 2),
+        "orders_per_second": round(orders / elapsed),
+        "queries_per_order": round(queries / orders, 2),
+        "peak_memory_mib": round(peak / 2**20, 1),
+    }
+    for key, value in results.items():
+        record_property(key, value)
+    with capsys.disabled():
+        print(
+            f"\n{name}: {orders} orders in {results['seconds']}s, "
+            f"{results['orders_per_second']} orders/s, "
+            f"{results['queries_per_order']} queries/order, "
+            f"{results['peak_memory_mib']} MiB peak"
+        )
+    return results
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", BENCHMARK_SIZES)
+def test_fetch_pretix_orders(fake_pretix, size, capsys, record_property):
+    fake_pretix.orders = size
+
+    def run():
+        call_command("fetch_pretix_orders", "--full", stdout=StringIO())
+        return PretixOrder.objects.count()
+
+    measure("fetch_pretix_orders", run, capsys, record_property)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", BENCHMARK_SIZES)
+def test_webhooks(client, settings, fake_pretix, size, capsys, record_property):
+    settings.PRETIX_WEBHOOK_SECRET = "benchmark"
+    fake_pretix.orders = size
+    url = reverse("webhooks:pretix_webhook")
+
+    def run():
+        # Celery runs eagerly here, so each notification is handled before
+        # the next one comes in.
+        for notification in fake_pretix.notifications():
+            client.post(
+                url,
+                query_params={"secret": "benchmark"},
+                data=json.dumps(notification),
+                content_type="application/json",
+            )
+        return PretixOrder.objects.count()
+
+    measure("webhooks", run, capsys, record_property)
@@ -0,0 +1,67 @@
+"""Bulk inserts and updates for models that inherit from ``BaseModel``.
+
+``BaseModel`` is a concrete model, so every portal model is a multi-table
+child of it and ``QuerySet.bulk_create()`` refuses them: the ``BaseModel`` rows
+need their ids back before the child rows can point at them. ``bulk_upsert``
+takes the two steps itself, with one statement per table per batch.
+"""
+
+from django.db import transaction
+from django.db.models.constants import OnConflict
+from django.utils.timezone import now
+
+from portal.models import BaseModel
+
+# Comfortably below Postgres' 65535 parameters per statement, for any model.
+BATCH_SIZE = 500
+
+
+def bulk_upsert(model, objs, unique_field):
+    """Insert ``objs`` or update the rows they collide with on ``unique_field``.
+
+    ``objs`` may mix new instances and ones loaded from the database. Each
+    ends up with the primary key of its row, including a new instance whose
+    row someone else inserted since it was looked up; the ``BaseModel`` row
+    made for it is then deleted again. ``save()`` and its signals are skipped.
+    """
+    unique = model._meta.get_field(unique_field)
+    fields = [f for f in model._meta.local_concrete_fields if not f.generated]
+    update_fields = [f for f in fields if not f.primary_key and f != unique]
+
+    with transaction.atomic():
+        for start in range(0, len(objs), BATCH_SIZE):
+            end = start + BATCH_SIZE
+            batch = objs[start:end]
+            stored = [obj for obj in batch if obj.pk is not None]
+            new = [obj for obj in batch if obj.pk is None]
+            parents = BaseModel.objects.bulk_create(BaseModel() for _ in new)
+            for obj, parent in zip(new, parents):
+                obj.pk = obj.id = parent.pk
+                obj.creation_date = parent.creation_date
+                obj.modified_date = parent.modified_date
+            timestamp = now()
+            BaseModel.objects.filter(pk__in=[obj.pk for obj in stored]).update(
+                modified_date=timestamp
+            )
+            for obj in stored:
+                obj.modified_date = timestamp
+
+            # What bulk_create() runs for the child table of a plain model.
+            rows = model._base_manager.all()._insert(
+                batch,
+                fields=fields,
+                returning_fields=[model._meta.pk],
+                on_conflict=OnConflict.UPDATE,
+                update_fields=update_fields,
+                unique_fields=[unique],
+            )
+            orphans = []
+            for obj, (pk,) in zip(batch, rows):
+                if pk != obj.pk:
+                    orphans.append(obj.pk)
+                    obj.pk = obj.id = pk
+                obj._state.adding = False
+                obj._state.db = model._base_manager.db
+            if orphans:
+                BaseModel.objects.filter(pk__in=orphans).delete()
+    return objs
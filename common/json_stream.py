@@ -0,0 +1,115 @@
+"""Read a page of a paginated JSON API one result at a time.
+
+``response.json()`` holds the whole body and every object in it in memory
+before returning. ``PaginatedListing`` decodes a page of the form
+``{"count": ..., "next": ..., "previous": ..., "results": [...]}`` from the
+chunks of a streamed response instead, and hands over each result as soon as
+it is read, so only one result and a chunk of the body are held at a time.
+"""
+
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+
+
+class PaginatedListing:
+    """The results of one page of a listing, read from ``chunks`` of its body.
+
+    Iterate over it for the results; once they are all read, ``next`` holds
+    the URL of the next page, or ``None`` on the last one.
+    """
+
+    def __init__(self, chunks):
+        self.next = None
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "results":
+                yield from self._results()
+            else:
+                value = self._value()
+                if key == "next":
+                    self.next = value
+            if self._separator("}"):
+                return
+
+    def _results(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._take()
+            return
+        while True:
+            yield self._value()
+            if self._separator("]"):
+                return
+
+    def _fill(self):
+        """Read the next chunk of the body; ``False`` once it is all read."""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            text = self._text.decode(b"", final=True)
+        else:
+            text = self._text.decode(chunk)
+        # Drop what was already read, so the buffer never grows past the
+        # result being read and one chunk.
+        pos = self._pos
+        self._buffer = self._buffer[pos:] + text
+        self._pos = 0
+        return chunk is not None
+
+    def _peek(self):
+        """Return the next character that is not whitespace, without reading it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _take(self):
+        char = self._peek()
+        if not char:
+            raise self._error("Unexpected end of the response")
+        self._pos += 1
+        return char
+
+    def _expect(self, char):
+        if self._take() != char:
+            raise self._error(f"Expecting {char!r}")
+
+    def _separator(self, closing):
+        """Read a ``,``, or ``closing``; return whether it was ``closing``."""
+        char = self._take()
+        if char not in (",", closing):
+            raise self._error(f"Expecting ',' or {closing!r}")
+        return char == closing
+
+    def _value(self):
+        """Read the JSON value starting at the next character."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Most likely cut off by the end of the chunk.
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the chunk may go on in the next one.
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buffer, self._pos)
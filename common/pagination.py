@@ -0,0 +1,206 @@
+"""Keyset (seek) pagination for the django-tables2 list views.
+
+Offset pagination makes Postgres walk and discard every row before the
+requested page, and it needs a ``COUNT(*)`` to number the pages, so deep pages
+of a big edition get slower and slower. Keyset pagination instead remembers the
+sort value and id of the last row shown and asks for the rows *after* it, which
+an index on ``(sort_key, id)`` answers directly: every page costs the same as
+the first one.
+
+The signed cursor travels in the ``?after=`` query parameter. It records the
+ordering it was taken under, so re-sorting the table simply starts again from
+the top.
+"""
+
+import hashlib
+import json
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django_tables2 import RequestConfig
+from django_tables2.paginators import LazyPaginator
+from django_tables2.utils import Accessor, OrderByTuple
+
+from portal.constants import STATS_CACHE_TIMEOUT
+
+CURSOR_SALT = "common.pagination.cursor"
+
+
+class KeysetPaginator(LazyPaginator):
+    """Serve the first page of an already seeked queryset.
+
+    The view moves the queryset past the cursor before paginating, so the page
+    wanted is always the first slice of it. Like ``LazyPaginator`` it fetches
+    one extra row to know whether there is a next page, and never counts.
+    """
+
+    def page(self, number):
+        return super().page(1)
+
+
+def encode_cursor(ordering, values):
+    """Sign the ordering and the last row's sort values into a URL-safe token."""
+    # Round-trip through DjangoJSONEncoder so dates and decimals become strings.
+    values = json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+    return signing.dumps({"o": list(ordering), "v": values}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return the ``(ordering, values)`` stored in ``cursor``, or ``None`` if it is invalid.
+
+    Cursors are signed, so a value that was not produced by ``encode_cursor``
+    (edited by hand, or signed with an old ``SECRET_KEY``) is rejected here.
+    """
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    return payload["o"], payload["v"]
+
+
+def keyset_count_version_key(model):
+    return f"keyset_count_version_{model._meta.label_lower}"
+
+
+def invalidate_keyset_counts(model):
+    """Drop the cached "About N results" counts for ``model``.
+
+    Counts are cached under a per-model version number, so bumping it makes
+    every cached count for that model stale at once. Call it from the model's
+    ``post_save`` and ``post_delete`` receivers.
+    """
+    key = keyset_count_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def seek_filter(ordering, values):
+    """Build the filter selecting the rows that sort after ``values``.
+
+    ``ordering`` is a list of ``order_by()`` terms ending in a unique
+    tiebreaker. Rows come after the cursor when they match it on every earlier
+    key and sort past it on the next one. Postgres puts NULLs last in ascending
+    order and first in descending order, and the comparisons follow suit.
+    """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for term, value in zip(ordering, values):
+        descending = term.startswith("-")
+        field = term.lstrip("-")
+        if value is None:
+            beyond = Q(**{f"{field}__isnull": False}) if descending else None
+            same = Q(**{f"{field}__isnull": True})
+        else:
+            if descending:
+                beyond = Q(**{f"{field}__lt": value})
+            else:
+                beyond = Q(**{f"{field}__gt": value}) | Q(**{f"{field}__isnull": True})
+            same = Q(**{field: value})
+        if beyond is not None:
+            condition |= equal & beyond
+        equal &= same
+    return condition
+
+
+class KeysetPaginationMixin:
+    """Keyset pagination for a ``SingleTableMixin`` view over a queryset.
+
+    Every orderable column is ordered by its own key and then by
+    ``keyset_tiebreaker``, so rows with equal sort values still have a total
+    order to seek on. The "About N results" line uses a cached count instead
+    of counting the rows on every page.
+    """
+
+    keyset_cursor_field = "after"
+    keyset_tiebreaker = "pk"
+    keyset_template_name = "portal/base-tables-keyset.html"
+
+    def get_table_pagination(self, table):
+        paginate = super().get_table_pagination(table)
+        paginate["paginator_class"] = KeysetPaginator
+        return paginate
+
+    def get_table(self, **kwargs):
+        kwargs.setdefault("template_name", self.keyset_template_name)
+        table = self.get_table_class()(data=self.get_table_data(), **kwargs)
+        self.add_keyset_tiebreaker(table)
+
+        # Apply the requested ordering before seeking; RequestConfig below
+        # re-applies the same ordering, which is a no-op on the queryset.
+        order_by = self.request.GET.getlist(table.prefixed_order_by_field)
+        if order_by:
+            table.order_by = order_by
+        queryset = table.data.data
+        ordering = [str(term) for term in queryset.query.order_by]
+        if self.keyset_tiebreaker not in (term.lstrip("-") for term in ordering):
+            # A default ordering without a unique key has no total order to seek on.
+            ordering.append(self.keyset_tiebreaker)
+            queryset = queryset.order_by(*ordering)
+
+        table.keyset_count = self.get_keyset_count(queryset)
+        table.keyset_cursor_field = self.keyset_cursor_field
+        table.keyset_has_previous = False
+        cursor = decode_cursor(self.request.GET.get(self.keyset_cursor_field, ""))
+        if cursor is not None and cursor[0] == ordering:
+            try:
+                queryset = queryset.filter(seek_filter(*cursor))
+            except (ValueError, TypeError, ValidationError):
+                # A value the column no longer accepts; start from the top.
+                pass
+            else:
+                table.keyset_has_previous = True
+        table.data.data = queryset
+
+        RequestConfig(
+            self.request, paginate=self.get_table_pagination(table)
+        ).configure(table)
+
+        table.keyset_next_cursor = None
+        if getattr(table, "page", None) and table.page.has_next():
+            last = table.page.object_list[-1].record
+            table.keyset_next_cursor = encode_cursor(
+                ordering,
+                [
+                    Accessor(term.lstrip("-")).resolve(last, quiet=True)
+                    for term in ordering
+                ],
+            )
+        return table
+
+    def add_keyset_tiebreaker(self, table):
+        """Make every orderable column order by ``(its key, tiebreaker)``."""
+        tiebreaker = self.keyset_tiebreaker
+        for bound_column in table.columns:
+            if not bound_column.orderable:
+                continue
+            column = bound_column.column
+            order_by = [
+                str(term) for term in (column.order_by or (bound_column.accessor,))
+            ]
+            if tiebreaker not in (term.lstrip("-") for term in order_by):
+                column.order_by = OrderByTuple((*order_by, tiebreaker))
+
+    def get_keyset_count(self, queryset):
+        """Return a cached count of the rows in ``queryset``.
+
+        The count is cached per query for ``STATS_CACHE_TIMEOUT`` and dropped
+        whenever a row of the model is saved or deleted, see
+        ``invalidate_keyset_counts``.
+        """
+        try:
+            query = str(queryset.order_by().query)
+        except EmptyResultSet:
+            return 0
+        version = cache.get(keyset_count_version_key(queryset.model), 0)
+        digest = hashlib.md5(query.encode()).hexdigest()
+        cache_key = f"keyset_count_{version}_{digest}"
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, STATS_CACHE_TIMEOUT)
+        return count
@@ -1,6 +1,15 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from common.json_stream import PaginatedListing
 from portal.constants import BASE_PRETIX_URL
 
 statuses = []
@@ -16,10 +25,113 @@ PRETIX_ALLOWED_WEBHOOK_ACTIONS = [
     PRETIX_WEBHOOK_ORDER_CANCELLED,
 ]
 PRETIX_ORG = "pyladiescon"
-PRETIX_EVENT_SLUG = "2025"
+
+# (connect, read) seconds. Pretix pages of 50 orders with positions can take a
+# while to render, but a request should never hang a worker forever.
+PRETIX_TIMEOUT = (5, 30)
+# Retries for rate limiting and server errors, sleeping 0.5s, 1s, 2s, ...
+# between attempts unless Pretix says how long to wait in ``Retry-After``.
+PRETIX_RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+)
+PRETIX_POOL_SIZE = 10
+# Bytes of a page of orders read at a time; see ``PaginatedListing``.
+PRETIX_STREAM_CHUNK_SIZE = 64 * 1024
+
+# The parts of a pretix order, and of its positions, the portal imports.
+# Everything else (invoice address, fees, payments, downloads, check-ins, ...)
+# is dropped as soon as an order is read, and never stored in ``raw_data``.
+PRETIX_ORDER_FIELDS = [
+    "code",
+    "event",
+    "status",
+    "email",
+    "total",
+    "datetime",
+    "last_modified",
+    "cancellation_date",
+    "url",
+]
+PRETIX_POSITION_FIELDS = ["attendee_name", "answers"]
+
+_session = None
+_session_lock = threading.Lock()
+_recording = ContextVar("pretix_request_stats", default=None)
+
+
+class PretixRequestStats:
+    """What the requests to Pretix made inside ``record()`` cost.
+
+    Counts the requests, the seconds spent on them (until their response was
+    read) and the retries the session made for them (``PRETIX_RETRY``), for
+    sync runs to report. Recording is per thread and per task.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.retries = 0
+
+    @contextmanager
+    def record(self):
+        token = _recording.set(self)
+        try:
+            yield self
+        finally:
+            _recording.reset(token)
+
+    def add(self, seconds, response=None):
+        self.requests += 1
+        self.seconds += seconds
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        if retries is not None:
+            self.retries += len(retries.history)
+
+
+def get_session():
+    """Return the process-wide ``requests.Session`` used to talk to Pretix.
+
+    Sharing one session keeps connections to Pretix alive between requests, so
+    a burst of webhooks or the pages of a sync skip the TCP and TLS handshakes.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=PRETIX_POOL_SIZE,
+                    max_retries=PRETIX_RETRY,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def compact_order(order):
+    """Return the parts of pretix ``order`` we use, see ``PRETIX_ORDER_FIELDS``."""
+    compact = {field: order[field] for field in PRETIX_ORDER_FIELDS if field in order}
+    if "positions" in order:
+        compact["positions"] = [
+            {
+                field: position[field]
+                for field in PRETIX_POSITION_FIELDS
+                if field in position
+            }
+            for position in order["positions"]
+        ]
+    return compact
 
 
 class PretixWrapper:
+    base_url = BASE_PRETIX_URL
+
     def __init__(self, org, event_slug):
         token = settings.PRETIX_API_TOKEN
         if not token:
@@ -27,41 +139,118 @@ class PretixWrapper:
         self.headers = {"Authorization": f"Token {settings.PRETIX_API_TOKEN}"}
         self.org = org
         self.event_slug = event_slug
+        self.session = get_session()
+        if settings.PRETIX_API_URL:
+            self.base_url = settings.PRETIX_API_URL
+
+    @contextmanager
+    def _get(self, url, **kwargs):
+        """GET ``url``, recording it in the ``PretixRequestStats`` recording now."""
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.session.get(
+                url, headers=self.headers, timeout=PRETIX_TIMEOUT, **kwargs
+            )
+            with response:
+                yield response
+        finally:
+            stats = _recording.get()
+            if stats is not None:
+                stats.add(time.perf_counter() - started, response)
 
-    def get_orders(self):
-        """Get all orders from pretix for the given event.
+    def get_order_pages(self, modified_since=None):
+        """Get the orders from pretix for the given event, a page at a time.
 
         We only want to care about non-testmode orders, fully paid orders, and canceled orders.
         If we found fully-paid orders: record the values to add to our stats.
         If we found cancelled orders: lookup the order and mark it as cancelled so that we can exclude from stats.
+
+        With ``modified_since`` (a datetime), only orders changed since then are
+        returned. Orders come oldest change first, so an order that changes
+        while we page through moves to the end rather than being skipped.
+
+        Yields one list per page Pretix returns, which may be empty when the
+        whole page was filtered out. Each page is read from Pretix as it
+        arrives, an order at a time, and only the order fields we use are kept
+        (``compact_order``), so memory use stays flat however large the event.
         """
-        params = {}
-        has_next = True
-        url = (
-            BASE_PRETIX_URL + f"organizers/{self.org}/events/{self.event_slug}/orders/"
-        )
-        index = 0
-
-        while has_next:
-            response = requests.get(url, headers=self.headers, params=params)
-            url = response.json()["next"]
-            has_next = url is not None
-            for r in response.json()["results"]:
-                index += 1
-                if r["testmode"] is False:
-                    if r["status"] in [PRETIX_PAID_STATUS, PRETIX_CANCELLED_STATUS]:
-                        yield r
+        page, url = self.get_order_page(modified_since=modified_since)
+        yield page
+        while url is not None:
+            page, url = self.get_order_page(url)
+            yield page
+
+    def get_order_page(self, url=None, modified_since=None):
+        """Get one page of ``get_order_pages``, and the URL of the next one.
+
+        Without ``url``, gets the first page of the orders changed since
+        ``modified_since``; with it, the page at a URL an earlier page
+        returned. The next URL is ``None`` after the last page.
+        """
+        params = None
+        if url is None:
+            url = (
+                self.base_url
+                + f"organizers/{self.org}/events/{self.event_slug}/orders/"
+            )
+            params = {"ordering": "last_modified"}
+            if modified_since is not None:
+                params["modified_since"] = modified_since.isoformat()
+
+        with self._get(url, params=params, stream=True) as response:
+            response.raise_for_status()
+            listing = PaginatedListing(response.iter_content(PRETIX_STREAM_CHUNK_SIZE))
+            page = [
+                compact_order(r)
+                for r in listing
+                if r["testmode"] is False
+                and r["status"] in [PRETIX_PAID_STATUS, PRETIX_CANCELLED_STATUS]
+            ]
+        return page, listing.next
+
+    def get_orders(self, modified_since=None):
+        """Get the orders of ``get_order_pages`` one by one."""
+        for page in self.get_order_pages(modified_since=modified_since):
+            yield from page
+
+    def get_orders_by_code(self, order_codes, modified_since):
+        """Get the orders with the given codes, all changed since ``modified_since``.
+
+        A single order is fetched by its code. For several, one listing of the
+        orders changed since ``modified_since`` usually holds all of them, in a
+        request per page of 50 instead of a request per order; any it misses
+        are then fetched by code. Returns the orders in no particular order.
+        """
+        order_codes = set(order_codes)
+        found = {}
+        if len(order_codes) > 1:
+            for order in self.get_orders(modified_since=modified_since):
+                if order["code"] in order_codes:
+                    found[order["code"]] = order
+        for order_code in order_codes - found.keys():
+            found[order_code] = self.get_order_by_code(order_code)
+        return list(found.values())
 
     def get_order_by_code(self, order_code):
-        """Get a single order by its code."""
+        """Get a single order by its code, see ``compact_order``."""
         url = (
-            BASE_PRETIX_URL
+            self.base_url
             + f"organizers/{self.org}/events/{self.event_slug}/orders/{order_code}/"
         )
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(
-                f"Failed to get order {order_code}: {response.status_code} {response.text}"
-            )
+        with self._get(url) as response:
+            if response.status_code == 200:
+                return compact_order(response.json())
+            else:
+                raise Exception(
+                    f"Failed to get order {order_code}: {response.status_code} {response.text}"
+                )
+
+
+@lru_cache(maxsize=None)
+def get_wrapper(event_slug):
+    """Return the process-wide ``PretixWrapper`` for one of our Pretix events.
+
+    Saves reading the settings and building the headers on every webhook task.
+    """
+    return PretixWrapper(PRETIX_ORG, event_slug)
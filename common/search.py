@@ -0,0 +1,116 @@
+"""Stored full-text search documents for the admin list views.
+
+Searching with ``SearchVector(...)`` built inside the query makes Postgres
+compute a tsvector for every row on every search, and no index can help with
+that. Instead each searchable model keeps a ``search_document`` column with a
+GIN index over it, and the list filters only have to match and rank against
+that column. A model whose searched text all lives in its own table stores it
+as a generated column (``search_vector_for_fields``); one that searches related
+rows too rebuilds it from signal receivers (``build_search_vector``).
+
+Names and handles are not English prose, so documents and queries both use the
+``simple`` configuration (no stemming, no stop words) and are split into plain
+letters-and-digits words first, so ``jane.doe@acme.org`` is found by ``acme``.
+Every query word matches as a prefix, so ``"jan do"`` finds ``jane.doe`` while
+the user is still typing.
+
+Prefix matching is as fuzzy as the search gets: trigram similarity needs the
+``pg_trgm`` extension, which is not installed on every database the portal runs
+against, and the test database is built without migrations so it could not be
+enabled there either.
+"""
+
+import operator
+import re
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, Func, TextField, Value
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = "simple"
+
+# Python and Postgres spellings of "anything that is not a letter or digit".
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+_SEPARATOR_SQL = "[^[:alnum:]]+"
+
+
+def search_words(text):
+    """Split ``text`` into lowercase words, dropping punctuation."""
+    return _SEPARATOR_RE.sub(" ", str(text or "").lower()).split()
+
+
+def build_search_vector(parts):
+    """Build the tsvector to store from ``(weight, text)`` pairs.
+
+    ``weight`` is one of Postgres' ``"A"`` to ``"D"`` labels, ``"A"`` ranking
+    highest.
+    """
+    return reduce(
+        operator.add,
+        (
+            SearchVector(
+                Value(" ".join(search_words(text))),
+                config=SEARCH_CONFIG,
+                weight=weight,
+            )
+            for weight, text in parts
+        ),
+    )
+
+
+def search_vector_for_fields(parts):
+    """The ``build_search_vector`` of ``(weight, field name)`` pairs, as SQL.
+
+    Meant for a ``GeneratedField``, so Postgres keeps the document current on
+    every write, ``QuerySet.update()`` included.
+    """
+    return reduce(
+        operator.add,
+        (
+            SearchVector(
+                Func(
+                    F(field),
+                    Value(_SEPARATOR_SQL),
+                    Value(" "),
+                    Value("g"),
+                    function="regexp_replace",
+                    output_field=TextField(),
+                ),
+                config=SEARCH_CONFIG,
+                weight=weight,
+            )
+            for weight, field in parts
+        ),
+    )
+
+
+def build_search_query(value):
+    """Turn user input into a prefix-matching query, or ``None`` if it has no words."""
+    words = search_words(value)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def search_documents(queryset, value, field="search_document"):
+    """Filter ``queryset`` to rows whose ``field`` matches ``value``, best first.
+
+    Rows are annotated with ``search_rank`` and ordered by it, with the primary
+    key as a tiebreaker so the order is stable for keyset pagination.
+    """
+    query = build_search_query(value)
+    if query is None:
+        return queryset
+    # ts_rank() returns a float4, which does not survive the trip through a
+    # Python float in a pagination cursor; as float8 it compares exactly.
+    rank = Cast(SearchRank(F(field), query), FloatField())
+    return (
+        queryset.filter(**{field: query})
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "pk")
+    )
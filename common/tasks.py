@@ -15,7 +15,19 @@ def enqueue(task, *args, **kwargs):
     try:
         task.delay(*args, **kwargs)
     except OperationalError:
-        logger.exception(
-            "Failed to enqueue Celery task %r — broker unavailable",
-            getattr(task, "name", task),
-        )
+        _log_enqueue_failure(task)
+
+
+def enqueue_later(task, countdown, *args, **kwargs):
+    """Like ``enqueue``, but run the task ``countdown`` seconds from now."""
+    try:
+        task.apply_async(args, kwargs, countdown=countdown)
+    except OperationalError:
+        _log_enqueue_failure(task)
+
+
+def _log_enqueue_failure(task):
+    logger.exception(
+        "Failed to enqueue Celery task %r — broker unavailable",
+        getattr(task, "name", task),
+    )
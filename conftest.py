@@ -1,5 +1,6 @@
 import unittest
 from datetime import date, timedelta
+from unittest.mock import patch
 
 import pytest
 
@@ -7,7 +8,9 @@ from attendee.models import (
     PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER,
     PRETIX_NOT_ANONYMOUS_ANSWER_IDENTIFIER,
 )
+from common.pretix_wrapper import PretixWrapper
 from portal.models import Conference
+from tests.fake_pretix import FakePretix, serve
 from volunteer.models import Language
 
 
@@ -48,6 +51,16 @@ def language(db):
     return Language.objects.create(code="en", name="English")
 
 
+@pytest.fixture(autouse=True)
+def clear_pretix_events_cache():
+    """Forget the conferences cached by ``Conference.for_pretix_event``.
+
+    Their rows are rolled back after each test, which never goes through
+    ``Conference.delete()``.
+    """
+    Conference._pretix_events = None
+
+
 @pytest.fixture(autouse=True)
 def conference(request):
     """The active conference every year-bound record is scoped to.
@@ -104,3 +117,15 @@ def pretix_order_data():
         "url": "https://someurl/",
         "cancellation_date": None,
     }
+
+
+@pytest.fixture
+def fake_pretix(settings):
+    """A ``FakePretix`` of the conference's event, which ``PretixWrapper`` talks to.
+
+    Change its ``orders``, ``latency`` or ``error_rate`` as a test needs.
+    """
+    pretix = FakePretix(orders=120, event="2025")
+    settings.PRETIX_API_TOKEN = pretix.token
+    with serve(pretix) as url, patch.object(PretixWrapper, "base_url", url):
+        yield pretix
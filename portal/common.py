@@ -1,5 +1,6 @@
 from django.core.cache import cache
 from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
 
 from attendee.models import (
     PARTICIPATED_IN_PREVIOUS_EVENT_CHOICES,
@@ -25,6 +26,7 @@ from portal.constants import (
     CACHE_KEY_SPONSORSHIP_PAID_PERCENT,
     CACHE_KEY_SPONSORSHIP_PENDING,
     CACHE_KEY_SPONSORSHIP_PENDING_COUNT,
+    CACHE_KEY_SPONSORSHIP_PIPELINE,
     CACHE_KEY_SPONSORSHIP_TOWARDS_GOAL_PERCENT,
     CACHE_KEY_TEAMS_COUNT,
     CACHE_KEY_TOTAL_FUNDS_RAISED,
@@ -236,6 +238,45 @@ SPONSOR_AWAITING_INVOICE_STATUS = [
 ]
 
 
+def get_sponsorship_pipeline_summary(conference):
+    """Returns the count and amount of sponsors in each progress status.
+
+    A dict keyed by every ``SponsorshipProgressStatus`` value, each holding
+    ``{"count": ..., "amount": ...}``, from a single grouped query. A sponsor's
+    amount is its override amount, or else its tier's amount.
+    """
+    cache_key = f"{CACHE_KEY_SPONSORSHIP_PIPELINE}_{conference.year}"
+    summary = cache.get(cache_key)
+    if summary is None:
+        summary = {
+            status: {"count": 0, "amount": 0}
+            for status in SponsorshipProgressStatus.values
+        }
+        sponsors_by_status = (
+            SponsorshipProfile.objects.filter(conference=conference)
+            .values("progress_status")
+            .annotate(
+                count=Count("pk"),
+                amount=Sum(
+                    Coalesce("sponsorship_override_amount", "sponsorship_tier__amount")
+                ),
+            )
+            .order_by()
+        )
+        for data in sponsors_by_status:
+            summary[data["progress_status"]] = {
+                "count": data["count"],
+                "amount": data["amount"] or 0,
+            }
+        cache.set(cache_key, summary, STATS_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_sponsorship_pipeline_summary(conference):
+    """Drop the cached pipeline summary, e.g. after a sponsor changes status."""
+    cache.delete(f"{CACHE_KEY_SPONSORSHIP_PIPELINE}_{conference.year}")
+
+
 def get_sponsorship_total_count_stats_cache(conference):
     """Returns total sponsorship count"""
     cache_key = f"{CACHE_KEY_TOTAL_SPONSORSHIPS}_{conference.year}"
@@ -261,23 +302,22 @@ def get_sponsorship_paid_amount_stats_cache(conference):
         paid_sponsors_no_override_qs = paid_sponsors.filter(
             sponsorship_override_amount__isnull=True, sponsorship_tier__isnull=False
         )
-        if paid_sponsors_no_override_qs:
-            paid_sponsors_no_override = paid_sponsors_no_override_qs.aggregate(
-                Sum("sponsorship_tier__amount")
-            )["sponsorship_tier__amount__sum"]
-        else:
-            paid_sponsors_no_override = 0
+        paid_sponsors_no_override = (
+            paid_sponsors_no_override_qs.aggregate(Sum("sponsorship_tier__amount"))[
+                "sponsorship_tier__amount__sum"
+            ]
+            or 0
+        )
 
         paid_sponsors_with_override_qs = paid_sponsors.filter(
             sponsorship_override_amount__isnull=False
         )
-        if paid_sponsors_with_override_qs:
-
-            paid_sponsors_with_override = paid_sponsors_with_override_qs.aggregate(
+        paid_sponsors_with_override = (
+            paid_sponsors_with_override_qs.aggregate(
                 Sum("sponsorship_override_amount")
             )["sponsorship_override_amount__sum"]
-        else:
-            paid_sponsors_with_override = 0
+            or 0
+        )
 
         total_paid = paid_sponsors_no_override + paid_sponsors_with_override
         total_paid = total_paid
@@ -296,24 +336,22 @@ def get_sponsorship_pending_amount_stats_cache(conference):
         pending_sponsors_no_override_qs = pending_sponsors.filter(
             sponsorship_override_amount__isnull=True, sponsorship_tier__isnull=False
         )
-        if pending_sponsors_no_override_qs:
-            pending_sponsors_no_override = pending_sponsors_no_override_qs.aggregate(
-                Sum("sponsorship_tier__amount")
-            )["sponsorship_tier__amount__sum"]
-        else:
-            pending_sponsors_no_override = 0
+        pending_sponsors_no_override = (
+            pending_sponsors_no_override_qs.aggregate(Sum("sponsorship_tier__amount"))[
+                "sponsorship_tier__amount__sum"
+            ]
+            or 0
+        )
 
         pending_sponsors_with_override_qs = pending_sponsors.filter(
             sponsorship_override_amount__isnull=False
         )
-        if pending_sponsors_with_override_qs:
-            pending_sponsors_with_override = (
-                pending_sponsors_with_override_qs.aggregate(
-                    Sum("sponsorship_override_amount")
-                )["sponsorship_override_amount__sum"]
-            )
-        else:
-            pending_sponsors_with_override = 0
+        pending_sponsors_with_override = (
+            pending_sponsors_with_override_qs.aggregate(
+                Sum("sponsorship_override_amount")
+            )["sponsorship_override_amount__sum"]
+            or 0
+        )
 
         total_pending = pending_sponsors_no_override + pending_sponsors_with_override
         total_pending = total_pending
@@ -333,25 +371,21 @@ def get_sponsorship_committed_amount_stats_cache(conference):
         committed_sponsors_no_override_qs = committed_sponsors.filter(
             sponsorship_override_amount__isnull=True, sponsorship_tier__isnull=False
         )
-        if committed_sponsors_no_override_qs:
-            committed_sponsors_no_override = (
-                committed_sponsors_no_override_qs.aggregate(
-                    Sum("sponsorship_tier__amount")
-                )["sponsorship_tier__amount__sum"]
-            )
-        else:
-            committed_sponsors_no_override = 0
+        committed_sponsors_no_override = (
+            committed_sponsors_no_override_qs.aggregate(
+                Sum("sponsorship_tier__amount")
+            )["sponsorship_tier__amount__sum"]
+            or 0
+        )
         committed_sponsors_with_override_qs = committed_sponsors.filter(
             sponsorship_override_amount__isnull=False
         )
-        if committed_sponsors_with_override_qs:
-            committed_sponsors_with_override = (
-                committed_sponsors_with_override_qs.aggregate(
-                    Sum("sponsorship_override_amount")
-                )["sponsorship_override_amount__sum"]
-            )
-        else:
-            committed_sponsors_with_override = 0
+        committed_sponsors_with_override = (
+            committed_sponsors_with_override_qs.aggregate(
+                Sum("sponsorship_override_amount")
+            )["sponsorship_override_amount__sum"]
+            or 0
+        )
 
         total_committed = (
             committed_sponsors_no_override + committed_sponsors_with_override
@@ -624,6 +658,18 @@ def get_donors_count_cache(conference):
     return donors_count
 
 
+def invalidate_donation_stats(conferences):
+    """Forget the cached donation stats of ``conferences``, in one go."""
+    keys = [CACHE_KEY_HISTORICAL_COMPARISON]
+    for conference in conferences:
+        keys += [
+            f"{CACHE_KEY_DONATIONS_TOTAL_AMOUNT}_{conference.year}",
+            f"{CACHE_KEY_DONORS_COUNT}_{conference.year}",
+            f"{CACHE_KEY_DONATION_TOWARDS_GOAL_PERCENT}_{conference.year}",
+        ]
+    cache.delete_many(keys)
+
+
 def get_donation_to_goal_percent_cache(conference):
     """Returns donation towards goal percent"""
     cache_key = f"{CACHE_KEY_DONATION_TOWARDS_GOAL_PERCENT}_{conference.year}"
@@ -691,6 +737,7 @@ def get_attendee_experience_breakdown(attendee_profiles):
         attendee_profiles.filter(experience_level__isnull=False)
         .values("experience_level")
         .annotate(count=Count("id"))
+        .order_by("experience_level")
     )
     for data in attendees_by_experience:
         experience_breakdown.append([data["experience_level"], data["count"]])
@@ -703,6 +750,7 @@ def get_attendee_current_position_breakdown(attendee_profiles):
         attendee_profiles.filter(current_position__isnull=False)
         .values("current_position")
         .annotate(count=Count("id"))
+        .order_by("current_position")
     )
     current_positions = {}
     for data in attendees_by_current_position:
@@ -16,6 +16,7 @@ CACHE_KEY_SPONSORSHIP_COMMITTED_COUNT = "sponsorship_committed_count"
 CACHE_KEY_SPONSORSHIP_PAID_PERCENT = "sponsorship_paid_percent"
 CACHE_KEY_SPONSORSHIP_TOWARDS_GOAL_PERCENT = "sponsorship_towards_goal_percent"
 CACHE_KEY_SPONSORSHIP_BREAKDOWN = "sponsorship_breakdown"
+CACHE_KEY_SPONSORSHIP_PIPELINE = "sponsorship_pipeline"
 
 CACHE_KEY_VOLUNTEER_BREAKDOWN = "volunteer_breakdown"
 
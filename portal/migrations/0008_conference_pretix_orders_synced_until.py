@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conference",
+            name="pretix_orders_synced_until",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
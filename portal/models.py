@@ -1,3 +1,5 @@
+import time
+
 from django import forms
 from django.contrib.admin.widgets import FilteredSelectMultiple
 from django.contrib.postgres.fields import ArrayField
@@ -34,6 +36,13 @@ class BaseModel(models.Model):
         super().save(*args, **kwargs)
 
 
+# How long a process trusts its copy of the configured Pretix events and the
+# conferences they belong to. Editions are added about once a year; the
+# process that saves one forgets its copy right away, the others within this
+# many seconds.
+PRETIX_EVENT_SLUGS_TTL = 60
+
+
 class Conference(BaseModel):
     """A single PyLadiesCon edition (2023, 2024, 2025, ...).
 
@@ -59,6 +68,11 @@ class Conference(BaseModel):
     slug = models.SlugField(unique=True)
     is_active = models.BooleanField(default=False)
     pretix_event_slug = models.CharField(max_length=100, blank=True)
+    # The latest ``last_modified`` of the Pretix orders synced so far; the
+    # next ``fetch_pretix_orders`` run only asks Pretix for orders changed since.
+    pretix_orders_synced_until = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
 
     # year-bound config (replaces hardcoded constants)
     sponsorship_goal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -89,6 +103,9 @@ class Conference(BaseModel):
     # e.g. for 2023 and 2024, and for "freezing" past years)
     historical_snapshot = models.JSONField(blank=True, default=dict)
 
+    # (expiry on the time.monotonic() clock, slugs); see pretix_event_slugs()
+    _pretix_events = None
+
     class Meta:
         ordering = ["-year"]
 
@@ -99,6 +116,50 @@ class Conference(BaseModel):
         if self.is_active:
             Conference.objects.exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        Conference._pretix_events = None
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Conference._pretix_events = None
+        return result
+
+    @classmethod
+    def _load_pretix_events(cls):
+        """Return the conference of each Pretix event, and the active conference.
+
+        Checked on every Pretix webhook and for every synced order, so each
+        process keeps them for ``PRETIX_EVENT_SLUGS_TTL`` seconds instead of
+        querying every time.
+        """
+        cached = cls._pretix_events
+        if cached is None or cached[0] < time.monotonic():
+            # When editions share an event, the latest one gets its orders.
+            conferences = {
+                conference.pretix_event_slug: conference
+                for conference in cls.objects.exclude(pretix_event_slug="").order_by(
+                    "year"
+                )
+            }
+            active = cls.get_active()
+            cached = (time.monotonic() + PRETIX_EVENT_SLUGS_TTL, conferences, active)
+            cls._pretix_events = cached
+        return cached[1], cached[2]
+
+    @classmethod
+    def pretix_event_slugs(cls):
+        """Return the set of ``pretix_event_slug`` values configured on any edition."""
+        conferences, _ = cls._load_pretix_events()
+        return frozenset(conferences)
+
+    @classmethod
+    def for_pretix_event(cls, event_slug):
+        """Return the conference whose ``pretix_event_slug`` is ``event_slug``.
+
+        Falls back to the active conference when no edition declares that
+        slug, or ``None`` when there is none either.
+        """
+        conferences, active = cls._load_pretix_events()
+        return conferences.get(event_slug) or active
 
     @classmethod
     def get_active(cls):
@@ -83,6 +83,7 @@ INSTALLED_APPS = [
     "widget_tweaks",
     "sponsorship",
     "attendee",
+    "webhooks",
 ]
 DJANGO_TABLES2_TEMPLATE = "portal/base-tables-responsive.html"
 
@@ -340,6 +341,9 @@ CACHES = {
 }
 
 PRETIX_API_TOKEN = os.getenv("PRETIX_API_TOKEN")
+# Point the portal at another Pretix API, such as the stand-in in
+# tests/fake_pretix.py. Defaults to pretix.eu.
+PRETIX_API_URL = os.getenv("PRETIX_API_URL")
 PRETIX_WEBHOOK_SECRET = os.getenv("PRETIX_WEBHOOK_SECRET")
 
 # Celery settings - using Redis.
@@ -348,6 +352,17 @@ PRETIX_WEBHOOK_SECRET = os.getenv("PRETIX_WEBHOOK_SECRET")
 # broker works without copying that secret into a second env var.
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL") or os.environ.get("REDIS_URL")
 
+# Run by ``celery -A portal beat``. The Pretix reconciliation repairs the
+# orders whose webhooks were lost; every five minutes by default, sooner
+# during ticket sales.
+PRETIX_RECONCILE_INTERVAL = int(os.getenv("PRETIX_RECONCILE_INTERVAL", 5 * 60))
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-pretix-orders": {
+        "task": "attendee.tasks.reconcile_pretix_orders_task",
+        "schedule": PRETIX_RECONCILE_INTERVAL,
+    },
+}
+
 # This makes Celery run tasks synchronously during tests
 if "test" in sys.argv or "pytest" in sys.modules:
     CELERY_TASK_ALWAYS_EAGER = True
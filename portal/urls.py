@@ -31,6 +31,16 @@ urlpatterns = [
         views.OrganizerDashboardView.as_view(),
         name="organizer_dashboard",
     ),
+    path(
+        "organize/pretix-sync/",
+        views.PretixSyncView.as_view(),
+        name="pretix_sync",
+    ),
+    path(
+        "organize/pretix-sync/runs/",
+        views.PretixSyncRunsView.as_view(),
+        name="pretix_sync_runs",
+    ),
     path("volunteer/", include("volunteer.urls", namespace="volunteer")),
     path("admin/", admin.site.urls),
     # Override two allauth views so finishing returns to the account page (the
@@ -4,14 +4,18 @@ from django.db.models import ProtectedError
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
-from django.views.generic import ListView, TemplateView
+from django.views.generic import ListView, TemplateView, View
 from django.views.generic.edit import DeleteView, FormView, UpdateView
 
+from attendee.models import PretixSyncCheckpoint, PretixSyncRun, PretixSyncSource
+from attendee.tasks import start_pretix_sync_task
 from common.mixins import AdminRequiredMixin, SuperuserRequiredMixin
+from common.tasks import enqueue
 from portal.common import (
     SPONSOR_AWAITING_INVOICE_STATUS,
     get_alltime_landing_stats,
     get_historical_comparison_data,
+    get_sponsorship_pipeline_summary,
     get_stats_cached_values,
 )
 from portal.constants import (
@@ -32,9 +36,11 @@ from portal.services import (
     clone_teams,
 )
 from portal_account.models import PortalProfile
-from sponsorship.models import SponsorshipProfile
 from volunteer.models import Team
 
+PRETIX_SYNC_RUNS_CHARTED = 200
+PRETIX_SYNC_RUNS_LISTED = 50
+
 
 def index(request):
     """
@@ -164,14 +170,66 @@ class OrganizerDashboardView(AdminRequiredMixin, TemplateView):
             teams = Team.objects.filter(conference=conference)
             context["pending_reviews"] = sum(t.pending_members.count() for t in teams)
             context["unled_teams"] = sum(1 for t in teams if not t.team_leads.exists())
-            context["awaiting_invoice"] = SponsorshipProfile.objects.filter(
-                conference=conference,
-                progress_status__in=SPONSOR_AWAITING_INVOICE_STATUS,
-            ).count()
+            pipeline = get_sponsorship_pipeline_summary(conference)
+            context["awaiting_invoice"] = sum(
+                pipeline[status]["count"] for status in SPONSOR_AWAITING_INVOICE_STATUS
+            )
         else:
             context["pending_reviews"] = 0
             context["unled_teams"] = 0
             context["awaiting_invoice"] = 0
+
+        context["pretix_syncs"] = PretixSyncCheckpoint.objects.select_related(
+            "conference"
+        ).order_by("-conference__year")
+        return context
+
+
+class PretixSyncView(AdminRequiredMixin, View):
+    """Start a background sync of the Pretix orders from the organizer dashboard.
+
+    The dashboard shows how far it got; see ``attendee.tasks``.
+    """
+
+    def post(self, request):
+        enqueue(start_pretix_sync_task, full=False)
+        messages.success(request, "Pretix sync started.")
+        return redirect("organizer_dashboard")
+
+
+class PretixSyncRunsView(AdminRequiredMixin, TemplateView):
+    """Chart how long recent Pretix syncs and webhook batches took, and how fast.
+
+    Shows the latest ``PRETIX_SYNC_RUNS_CHARTED`` runs, of every source or
+    only of the one in ``?source=``, so slowdowns on the Pretix side show up
+    before a ticket launch rather than during it.
+    """
+
+    template_name = "portal/pretix_sync_runs.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        source = self.request.GET.get("source", "")
+        if source not in PretixSyncSource.values:
+            source = ""
+        runs = PretixSyncRun.objects.order_by("-started_at")
+        if source:
+            runs = runs.filter(source=source)
+        runs = list(runs[:PRETIX_SYNC_RUNS_CHARTED])
+
+        context["source"] = source
+        context["sources"] = PretixSyncSource.choices
+        context["runs"] = runs[:PRETIX_SYNC_RUNS_LISTED]
+        context["chart_data"] = [
+            {
+                "started_at": run.started_at.isoformat(),
+                "seconds": round(run.seconds, 3),
+                "http_seconds": round(run.http_seconds, 3),
+                "orders_per_second": round(run.orders_per_second or 0, 2),
+            }
+            for run in reversed(runs)
+            if run.finished_at is not None
+        ]
         return context
 
 
@@ -0,0 +1,236 @@
+"""Import individual donations from a CiviCRM contribution export.
+
+PSF's CiviCRM exports contributions as CSV or XLSX. ``read_donation_rows``
+streams either a row at a time, and ``import_donations`` validates each row,
+drops repeated transactions, finds the row's conference from its date, and
+upserts the donations a batch at a time (see ``common.bulk``). Rows that fail
+validation are reported and skipped; the donation stats are refreshed once, at
+the end.
+"""
+
+import csv
+import io
+import re
+
+from django import forms
+
+from common.bulk import BATCH_SIZE, bulk_upsert
+from portal.common import invalidate_donation_stats
+from portal.models import Conference
+
+from .models import IndividualDonation
+
+# The columns of a CiviCRM export each donation field is read from, compared
+# lowercased and with underscores as spaces.
+DONATION_COLUMNS = {
+    "transaction_id": ("transaction id", "trxn id"),
+    "donation_amount": ("total amount", "amount"),
+    "donor_email": ("email", "email address", "donor email"),
+    "transaction_date": (
+        "date received",
+        "receive date",
+        "contribution date",
+        "transaction date",
+    ),
+    "donor_name": ("display name", "contact name", "donor name", "sort name"),
+    "is_anonymous": ("anonymous", "is anonymous"),
+}
+REQUIRED_DONATION_COLUMNS = ("transaction_id", "donation_amount", "donor_email")
+ANONYMOUS_ANSWERS = {"1", "true", "yes", "y", "x"}
+
+
+class DonationRowForm(forms.Form):
+    """Validate one row of a CiviCRM export."""
+
+    transaction_id = forms.CharField(max_length=100)
+    donation_amount = forms.DecimalField(max_digits=10, decimal_places=2)
+    donor_email = forms.EmailField()
+    transaction_date = forms.DateTimeField(required=False)
+    donor_name = forms.CharField(max_length=255, required=False)
+    is_anonymous = forms.CharField(required=False)
+
+    def clean_is_anonymous(self):
+        return self.cleaned_data["is_anonymous"].lower() in ANONYMOUS_ANSWERS
+
+
+class DonationImport:
+    """What an import did, and the rows it could not import."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.duplicates = 0
+        # (row number, message), numbered as in a spreadsheet: the header is 1.
+        self.errors = []
+        self.conferences = set()
+
+    def __str__(self):
+        return (
+            f"Imported {self.created + self.updated} donations "
+            f"({self.created} new, {self.updated} updated), "
+            f"skipped {self.duplicates} repeated transactions "
+            f"and {len(self.errors)} invalid rows"
+        )
+
+
+def _column(header):
+    return str(header or "").strip().lower().replace("_", " ")
+
+
+def read_donation_rows(file, name):
+    """Yield each row of the CSV or XLSX export ``file`` as a dict.
+
+    ``name`` is the file's name; an ``.xlsx`` one is read with openpyxl, in
+    read-only mode, anything else as UTF-8 CSV. Raises ``ValueError`` when
+    the export lacks one of the ``REQUIRED_DONATION_COLUMNS``.
+    """
+    if name.lower().endswith(".xlsx"):
+        rows = _read_xlsx(file)
+    else:
+        rows = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    header = [_column(value) for value in next(rows, [])]
+    columns = {}
+    for field, names in DONATION_COLUMNS.items():
+        for index, column in enumerate(header):
+            if column in names:
+                columns[field] = index
+                break
+    missing = [field for field in REQUIRED_DONATION_COLUMNS if field not in columns]
+    if missing:
+        raise ValueError(
+            "The export has no "
+            + ", ".join(DONATION_COLUMNS[field][0].title() for field in missing)
+            + " column"
+        )
+    for values in rows:
+        if all(value in (None, "") for value in values):
+            continue
+        yield {
+            field: values[index] if index < len(values) else None
+            for field, index in columns.items()
+        }
+
+
+def _read_xlsx(file):
+    # Imported here, like the other optional file formats of import-export.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _amount(value):
+    # CiviCRM formats amounts with the currency, e.g. "$ 1,250.00".
+    if isinstance(value, str):
+        return re.sub(r"[^\d.\-]", "", value)
+    return value
+
+
+class ConferenceResolver:
+    """Find the conference a donation made at some date counts towards.
+
+    That is the conference whose ``start_date``-``end_date`` window holds the
+    date, else the one of the date's year. Every conference is loaded once.
+    """
+
+    def __init__(self):
+        self.conferences = list(Conference.objects.order_by("year"))
+
+    def __call__(self, date):
+        day = date.date()
+        for conference in self.conferences:
+            if (
+                conference.start_date
+                and conference.end_date
+                and conference.start_date <= day <= conference.end_date
+            ):
+                return conference
+        for conference in self.conferences:
+            if conference.year == day.year:
+                return conference
+        return None
+
+
+def import_donations(rows, conference=None):
+    """Upsert the donations of ``rows`` (see ``read_donation_rows``).
+
+    Each donation goes to ``conference`` if given, else to the conference of
+    its transaction date. A transaction repeated in ``rows`` is imported
+    once, from its last row; a transaction already stored is updated.
+    Returns a ``DonationImport``.
+    """
+    result = DonationImport()
+    resolve = ConferenceResolver()
+    seen, written = set(), set()
+    batch = {}
+    for number, row in enumerate(rows, start=2):
+        donation = _donation(row, conference, resolve, result, number)
+        if donation is None:
+            continue
+        if donation.transaction_id in seen:
+            result.duplicates += 1
+        seen.add(donation.transaction_id)
+        batch[donation.transaction_id] = donation
+        if len(batch) >= BATCH_SIZE:
+            _write(batch, result, written)
+            batch = {}
+    _write(batch, result, written)
+    invalidate_donation_stats(result.conferences)
+    return result
+
+
+def _donation(row, conference, resolve, result, number):
+    """Return the unsaved donation of ``row``, or ``None`` if it is invalid."""
+    row = dict(row, donation_amount=_amount(row["donation_amount"]))
+    form = DonationRowForm(
+        {field: "" if value is None else value for field, value in row.items()}
+    )
+    if not form.is_valid():
+        for field, errors in form.errors.items():
+            result.errors.append((number, f"{field}: {' '.join(errors)}"))
+        return None
+    data = form.cleaned_data
+    if conference is None:
+        if data["transaction_date"] is None:
+            result.errors.append(
+                (number, "transaction_date: needed to find the conference")
+            )
+            return None
+        row_conference = resolve(data["transaction_date"])
+        if row_conference is None:
+            result.errors.append(
+                (number, f"No conference for {data['transaction_date']:%Y-%m-%d}")
+            )
+            return None
+    else:
+        row_conference = conference
+    result.conferences.add(row_conference)
+    return IndividualDonation(
+        conference=row_conference,
+        transaction_id=data["transaction_id"],
+        donation_amount=data["donation_amount"],
+        donor_email=data["donor_email"],
+        transaction_date=data["transaction_date"],
+        donor_name=data["donor_name"] or None,
+        is_anonymous=data["is_anonymous"],
+    )
+
+
+def _write(batch, result, written):
+    if not batch:
+        return
+    stored = dict(
+        IndividualDonation.objects.filter(transaction_id__in=list(batch)).values_list(
+            "transaction_id", "pk"
+        )
+    )
+    for transaction_id, donation in batch.items():
+        donation.pk = donation.id = stored.get(transaction_id)
+    bulk_upsert(IndividualDonation, list(batch.values()), "transaction_id")
+    # A transaction repeated across batches was counted when first written.
+    result.created += len(batch) - len(stored)
+    result.updated += len(stored.keys() - written)
+    written.update(batch)
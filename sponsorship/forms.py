@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.core.validators import FileExtensionValidator
 
 from portal.models import Conference
 
@@ -116,3 +117,20 @@ class SponsorshipTierForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if not self.instance.pk:
             self.fields["conference"].initial = Conference.get_active()
+
+
+class DonationImportForm(forms.Form):
+    """Upload a CiviCRM export of individual donations."""
+
+    file = forms.FileField(
+        label="CiviCRM export",
+        help_text="A CSV or XLSX export of contributions, with their Transaction "
+        "ID, Total Amount, Email and Date Received.",
+        validators=[FileExtensionValidator(["csv", "xlsx"])],
+    )
+    conference = forms.ModelChoiceField(
+        queryset=Conference.objects.all(),
+        required=False,
+        empty_label="The conference of each donation's date",
+        help_text="The conference the donations count towards.",
+    )
@@ -0,0 +1,40 @@
+"""
+Management command to import individual donations from a CiviCRM export.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.models import Conference
+from sponsorship.donations import import_donations, read_donation_rows
+
+
+class Command(BaseCommand):
+    help = "Import individual donations from a CiviCRM CSV or XLSX export"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The CiviCRM export, a .csv or .xlsx file.")
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="Count every donation towards this year's conference, instead "
+            "of the conference of each donation's date.",
+        )
+
+    def handle(self, *args, **options):
+        conference = None
+        if options["year"]:
+            conference = Conference.objects.filter(year=options["year"]).first()
+            if conference is None:
+                raise CommandError(f"No conference for {options['year']}")
+
+        try:
+            with open(options["path"], "rb") as file:
+                result = import_donations(
+                    read_donation_rows(file, options["path"]), conference=conference
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Could not import {options['path']}: {error}")
+
+        for number, message in result.errors:
+            self.stderr.write(f"Row {number}: {message}")
+        self.stdout.write(self.style.SUCCESS(str(result)))
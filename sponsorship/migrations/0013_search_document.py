@@ -0,0 +1,95 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+        (
+            "sponsorship",
+            "0012_sponsorshipprofile_sponsorship_conference_id_idx_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sponsorshipprofile",
+            name="search_document",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.CombinedSearchVector(
+                            django.contrib.postgres.search.SearchVector(
+                                models.Func(
+                                    models.F("organization_name"),
+                                    models.Value("[^[:alnum:]]+"),
+                                    models.Value(" "),
+                                    models.Value("g"),
+                                    function="regexp_replace",
+                                    output_field=models.TextField(),
+                                ),
+                                config="simple",
+                                weight="A",
+                            ),
+                            "||",
+                            django.contrib.postgres.search.SearchVector(
+                                models.Func(
+                                    models.F("sponsor_contact_name"),
+                                    models.Value("[^[:alnum:]]+"),
+                                    models.Value(" "),
+                                    models.Value("g"),
+                                    function="regexp_replace",
+                                    output_field=models.TextField(),
+                                ),
+                                config="simple",
+                                weight="B",
+                            ),
+                            django.contrib.postgres.search.SearchConfig("simple"),
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            models.Func(
+                                models.F("sponsors_contact_email"),
+                                models.Value("[^[:alnum:]]+"),
+                                models.Value(" "),
+                                models.Value("g"),
+                                function="regexp_replace",
+                                output_field=models.TextField(),
+                            ),
+                            config="simple",
+                            weight="B",
+                        ),
+                        django.contrib.postgres.search.SearchConfig("simple"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        models.Func(
+                            models.F("po_number"),
+                            models.Value("[^[:alnum:]]+"),
+                            models.Value(" "),
+                            models.Value("g"),
+                            function="regexp_replace",
+                            output_field=models.TextField(),
+                        ),
+                        config="simple",
+                        weight="C",
+                    ),
+                    django.contrib.postgres.search.SearchConfig("simple"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sponsorshipprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="sponsorship_search_doc_idx"
+            ),
+        ),
+    ]
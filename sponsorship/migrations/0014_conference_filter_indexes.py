@@ -0,0 +1,30 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+        ("sponsorship", "0013_search_document"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="individualdonation",
+            index=models.Index(
+                fields=["conference", "donor_email"], name="donation_conf_email_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sponsorshipprofile",
+            index=models.Index(
+                condition=models.Q(("sponsorship_override_amount__isnull", False)),
+                fields=["conference", "progress_status"],
+                name="sponsorship_override_conf_idx",
+            ),
+        ),
+    ]
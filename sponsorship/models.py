@@ -1,6 +1,9 @@
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from common.search import search_vector_for_fields
 from portal.models import BaseModel
 
 
@@ -95,6 +98,46 @@ class SponsorshipProfile(BaseModel):
         null=True,
         help_text="Link to the GitHub issue tracking this sponsorship",
     )
+    # Stored tsvector for the sponsors table search, kept current by Postgres.
+    # See common/search.py.
+    search_document = models.GeneratedField(
+        expression=search_vector_for_fields(
+            [
+                ("A", "organization_name"),
+                ("B", "sponsor_contact_name"),
+                ("B", "sponsors_contact_email"),
+                ("C", "po_number"),
+            ]
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        # Keyset pagination of the sponsors table seeks on ``(sort_key, id)``
+        # within one edition; these cover the default, name and status orderings.
+        indexes = [
+            models.Index(
+                fields=["conference", "basemodel_ptr"],
+                name="sponsorship_conference_id_idx",
+            ),
+            models.Index(
+                fields=["conference", "organization_name", "basemodel_ptr"],
+                name="sponsorship_conf_org_id_idx",
+            ),
+            models.Index(
+                fields=["conference", "progress_status", "basemodel_ptr"],
+                name="sponsorship_conf_status_id_idx",
+            ),
+            GinIndex(fields=["search_document"], name="sponsorship_search_doc_idx"),
+            # Few sponsors have an override amount; the amount stats sum those
+            # separately, so keep them in a small index of their own.
+            models.Index(
+                fields=["conference", "progress_status"],
+                condition=models.Q(sponsorship_override_amount__isnull=False),
+                name="sponsorship_override_conf_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.organization_name
@@ -119,5 +162,13 @@ class IndividualDonation(BaseModel):
     donor_email = models.EmailField()  # required
     is_anonymous = models.BooleanField(default=False)
 
+    class Meta:
+        # Counting an edition's distinct donors reads only this index.
+        indexes = [
+            models.Index(
+                fields=["conference", "donor_email"], name="donation_conf_email_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.transaction_id}: ${self.donation_amount:.2f}"
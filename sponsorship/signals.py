@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from common.pagination import invalidate_keyset_counts
 from common.tasks import enqueue
+from portal.common import invalidate_sponsorship_pipeline_summary
 
 from .models import SponsorshipProfile
 from .tasks import (
@@ -28,3 +30,17 @@ def sponsorship_profile_signal(sender, instance, created, **kwargs):
     else:
         # Send progress update email asynchronously
         enqueue(send_internal_sponsor_progress_update_email_task, instance.id)
+
+
+@receiver(post_save, sender=SponsorshipProfile)
+@receiver(post_delete, sender=SponsorshipProfile)
+def sponsorship_profile_count_signal(sender, **kwargs):
+    """Refresh the sponsors table's "About N results" count."""
+    invalidate_keyset_counts(sender)
+
+
+@receiver(post_save, sender=SponsorshipProfile)
+@receiver(post_delete, sender=SponsorshipProfile)
+def sponsorship_pipeline_summary_signal(sender, instance, **kwargs):
+    """Keep the managers' needs-attention counts current."""
+    invalidate_sponsorship_pipeline_summary(instance.conference)
@@ -43,6 +43,11 @@ urlpatterns = [
         views.SponsorshipTierDelete.as_view(),
         name="tier_delete",
     ),
+    path(
+        "donations/import/",
+        views.IndividualDonationImport.as_view(),
+        name="donation_import",
+    ),
     path(
         "<int:pk>/",
         views.SponsorshipProfileDetail.as_view(),
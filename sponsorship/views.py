@@ -2,24 +2,29 @@ import django_filters
 import django_tables2 as tables
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.contrib.postgres.search import SearchQuery, SearchVector
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.utils.html import format_html
 from django.views.generic import DetailView, ListView
 from django.views.generic.base import View
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
 from django_filters.views import FilterView
 from django_tables2.views import SingleTableMixin
 
 from common.mixins import AdminRequiredMixin
-from portal.common import get_sponsorships_stats_dict
+from common.pagination import KeysetPaginationMixin
+from common.search import search_documents
+from portal.common import (
+    get_sponsorship_pipeline_summary,
+    get_sponsorships_stats_dict,
+)
 from portal.models import Conference
 from volunteer.constants import ApplicationStatus
 from volunteer.models import VolunteerProfile
 
+from .donations import import_donations, read_donation_rows
 from .emails import send_psf_invoice_request_email
-from .forms import SponsorshipProfileForm, SponsorshipTierForm
+from .forms import DonationImportForm, SponsorshipProfileForm, SponsorshipTierForm
 from .models import SponsorshipProfile, SponsorshipProgressStatus, SponsorshipTier
 
 
@@ -87,8 +92,10 @@ class SponsorshipProfileDelete(AdminRequiredMixin, DeleteView):
 
 class SponsorshipProfileTable(tables.Table):
 
+    # Ids grow with creation time, and unlike ``creation_date`` (which lives
+    # on the BaseModel parent table) they are indexed per conference.
     creation_date = tables.Column(
-        accessor="creation_date", verbose_name="Creation Date"
+        accessor="creation_date", verbose_name="Creation Date", order_by=("pk",)
     )
     updated_date = tables.Column(accessor="modified_date", verbose_name="Last Updated")
     amount = tables.Column(accessor="sponsorship_tier__amount", verbose_name="Amount")
@@ -209,7 +216,8 @@ class SponsorshipProfileTable(tables.Table):
 
 class SponsorshipProfileFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(
-        label="Search by organization name", method="search_fulltext"
+        label="Search by organization, contact, or PO number",
+        method="search_fulltext",
     )
     # Status and tier are filtered via the quick-filter chips (handled in the
     # list view's get_queryset), not form fields, to avoid duplicate controls.
@@ -219,11 +227,7 @@ class SponsorshipProfileFilter(django_filters.FilterSet):
         fields = ["search"]
 
     def search_fulltext(self, queryset, field_name, value):
-        if not value:
-            return queryset
-        return queryset.annotate(  # pragma: no cover
-            search=SearchVector("organization_name", "progress_status")
-        ).filter(search=SearchQuery(value))
+        return search_documents(queryset, value)
 
     @property
     def qs(self):
@@ -244,7 +248,9 @@ class SponsorshipProfileFilter(django_filters.FilterSet):
             )
 
 
-class SponsorshipProfileList(CanViewSponsorship, SingleTableMixin, FilterView):
+class SponsorshipProfileList(
+    CanViewSponsorship, KeysetPaginationMixin, SingleTableMixin, FilterView
+):
     model = SponsorshipProfile
     template_name = "sponsorship/sponsorshipprofile_list.html"
     table_class = SponsorshipProfileTable
@@ -270,7 +276,10 @@ class SponsorshipProfileList(CanViewSponsorship, SingleTableMixin, FilterView):
         # ``conference=None`` matches nothing, so a year the viewer may not see
         # yields an empty list rather than leaking another year's sponsors.
         queryset = (
-            super().get_queryset().filter(conference=self.get_selected_conference())
+            super()
+            .get_queryset()
+            .filter(conference=self.get_selected_conference())
+            .defer("search_document")
         )
         # Status and tier come from the quick-filter chips.
         status = self.request.GET.get("progress_status")
@@ -320,21 +329,26 @@ class SponsorshipProfileList(CanViewSponsorship, SingleTableMixin, FilterView):
         # Needs-attention buckets for managers: each is a single status that
         # signals an action is owed, and links to the list filtered to it.
         if self.request.user.is_superuser or self.request.user.is_staff:
-            base = SponsorshipProfile.objects.filter(conference=selected_conference)
+            pipeline = (
+                get_sponsorship_pipeline_summary(selected_conference)
+                if selected_conference
+                else {}
+            )
+            counts = {status: data["count"] for status, data in pipeline.items()}
             context["status_agreement_sent"] = SponsorshipProgressStatus.AGREEMENT_SENT
             context["status_agreement_signed"] = (
                 SponsorshipProgressStatus.AGREEMENT_SIGNED
             )
             context["status_invoiced"] = SponsorshipProgressStatus.INVOICED
-            context["attention_unsigned"] = base.filter(
-                progress_status=SponsorshipProgressStatus.AGREEMENT_SENT
-            ).count()
-            context["attention_awaiting_invoice"] = base.filter(
-                progress_status=SponsorshipProgressStatus.AGREEMENT_SIGNED
-            ).count()
-            context["attention_unpaid"] = base.filter(
-                progress_status=SponsorshipProgressStatus.INVOICED
-            ).count()
+            context["attention_unsigned"] = counts.get(
+                SponsorshipProgressStatus.AGREEMENT_SENT, 0
+            )
+            context["attention_awaiting_invoice"] = counts.get(
+                SponsorshipProgressStatus.AGREEMENT_SIGNED, 0
+            )
+            context["attention_unpaid"] = counts.get(
+                SponsorshipProgressStatus.INVOICED, 0
+            )
         return context
 
 
@@ -419,3 +433,29 @@ class SponsorshipTierDelete(AdminRequiredMixin, DeleteView):
     template_name = "sponsorship/sponsorshiptier_confirm_delete.html"
     context_object_name = "tier"
     success_url = reverse_lazy("sponsorship:tier_list")
+
+
+class IndividualDonationImport(AdminRequiredMixin, FormView):
+    """Import individual donations from a CiviCRM export.
+
+    Renders the form again with what the import did and each row it skipped;
+    see ``sponsorship.donations``.
+    """
+
+    form_class = DonationImportForm
+    template_name = "sponsorship/donation_import.html"
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        try:
+            result = import_donations(
+                read_donation_rows(upload, upload.name),
+                conference=form.cleaned_data["conference"],
+            )
+        except ValueError as error:
+            form.add_error("file", str(error))
+            return self.form_invalid(form)
+        messages.success(self.request, str(result))
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), result=result)
+        )
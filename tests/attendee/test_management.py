@@ -0,0 +1,283 @@
+from datetime import datetime, timezone
+from io import StringIO
+from unittest.mock import ANY, patch
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from attendee.management.commands.fetch_pretix_orders import WATERMARK_OVERLAP
+from attendee.models import (
+    AttendeeProfile,
+    PayloadCodec,
+    PretixOrder,
+    PretixOrderPayload,
+    PretixSyncRun,
+)
+from attendee.sync import sync_orders
+from portal.models import Conference
+
+SYNCED_UNTIL = datetime(2025, 11, 13, 16, 12, 7, 2602, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def get_orders(settings):
+    settings.PRETIX_API_TOKEN = "test_token"
+    with patch(
+        "common.pretix_wrapper.PretixWrapper.get_order_pages", autospec=True
+    ) as get_orders:
+        yield get_orders
+
+
+@pytest.mark.django_db
+class TestFetchPretixOrdersCommand:
+    def test_first_sync_fetches_everything(
+        self, conference, get_orders, pretix_order_data
+    ):
+        get_orders.return_value = [[pretix_order_data]]
+        out = StringIO()
+        call_command("fetch_pretix_orders", stdout=out)
+
+        get_orders.assert_called_once_with(ANY, modified_since=None)
+        order = PretixOrder.objects.get(order_code="ORDER123")
+        assert AttendeeProfile.objects.filter(order=order).exists()
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == SYNCED_UNTIL
+        assert "Successfully synced 1 orders and 1 attendee profiles" in (
+            out.getvalue()
+        )
+
+    def test_reports_skipped_orders(self, conference, get_orders, pretix_order_data):
+        get_orders.return_value = [[pretix_order_data]]
+        call_command("fetch_pretix_orders", stdout=StringIO())
+        out = StringIO()
+        call_command("fetch_pretix_orders", stdout=out)
+
+        assert (
+            "synced 0 orders changed since 2025-11-13 16:07:07.002602+00:00 and 0 "
+            "attendee profiles, skipped 1 unchanged orders"
+        ) in out.getvalue()
+        call_command("fetch_pretix_orders", "--full", stdout=out)
+        assert "synced 1 orders and 1 attendee profiles, skipped 0" in out.getvalue()
+
+    def test_next_sync_fetches_changes_since_watermark(
+        self, conference, get_orders, pretix_order_data
+    ):
+        conference.pretix_orders_synced_until = SYNCED_UNTIL
+        conference.save()
+        get_orders.return_value = []
+        out = StringIO()
+        call_command("fetch_pretix_orders", stdout=out)
+
+        modified_since = SYNCED_UNTIL - WATERMARK_OVERLAP
+        get_orders.assert_called_once_with(ANY, modified_since=modified_since)
+        assert f"0 orders changed since {modified_since}" in out.getvalue()
+
+    def test_watermark_never_moves_back(
+        self, conference, get_orders, pretix_order_data
+    ):
+        later = SYNCED_UNTIL.replace(hour=18)
+        conference.pretix_orders_synced_until = later
+        conference.save()
+        # An order changed within the overlap is synced again...
+        get_orders.return_value = [[pretix_order_data]]
+        call_command("fetch_pretix_orders", stdout=StringIO())
+
+        assert PretixOrder.objects.filter(order_code="ORDER123").exists()
+        # ...without pulling the watermark back to it.
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == later
+
+    def test_full_ignores_watermark(self, conference, get_orders, pretix_order_data):
+        conference.pretix_orders_synced_until = SYNCED_UNTIL
+        conference.save()
+        get_orders.return_value = [[pretix_order_data]]
+        call_command("fetch_pretix_orders", "--full", stdout=StringIO())
+
+        get_orders.assert_called_once_with(ANY, modified_since=None)
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == SYNCED_UNTIL
+
+    def test_failed_sync_keeps_watermark(
+        self, conference, get_orders, pretix_order_data
+    ):
+        def orders(wrapper, modified_since):
+            yield [pretix_order_data]
+            raise ConnectionError("Pretix went away")
+
+        get_orders.side_effect = orders
+        err = StringIO()
+        with pytest.raises(CommandError, match="Failed to sync Pretix events: 2025"):
+            call_command("fetch_pretix_orders", stdout=StringIO(), stderr=err)
+
+        assert "2025: sync failed: ConnectionError('Pretix went away')" in (
+            err.getvalue()
+        )
+        # The page that came in is kept, but not the watermark.
+        assert PretixOrder.objects.filter(order_code="ORDER123").exists()
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until is None
+
+    def test_no_conference_with_pretix_event(self, conference, get_orders):
+        Conference.objects.filter(pk=conference.pk).update(pretix_event_slug="")
+        out = StringIO()
+        call_command("fetch_pretix_orders", stdout=out)
+
+        get_orders.assert_not_called()
+        assert "No conference has a Pretix event to sync" in out.getvalue()
+
+    def test_syncs_every_configured_event(
+        self, conference, get_orders, pretix_order_data
+    ):
+        Conference.objects.create(year=2024, name="PLC 2024", slug="2024")
+        next_year = Conference.objects.create(
+            year=2026, name="PLC 2026", slug="2026", pretix_event_slug="plc26"
+        )
+        next_year_order = dict(
+            pretix_order_data,
+            code="ORDER456",
+            event="plc26",
+            last_modified="2026-03-01T10:00:00+00:00",
+        )
+
+        def orders(wrapper, modified_since):
+            return {"2025": [[pretix_order_data]], "plc26": [[next_year_order]]}[
+                wrapper.event_slug
+            ]
+
+        get_orders.side_effect = orders
+        out = StringIO()
+        call_command("fetch_pretix_orders", stdout=out)
+
+        assert get_orders.call_count == 2
+        assert PretixOrder.objects.get(order_code="ORDER123").conference == conference
+        assert PretixOrder.objects.get(order_code="ORDER456").conference == next_year
+        next_year.refresh_from_db()
+        assert next_year.pretix_orders_synced_until == datetime(
+            2026, 3, 1, 10, tzinfo=timezone.utc
+        )
+        output = out.getvalue()
+        assert "2025: synced 1 orders and 1 attendee profiles" in output
+        assert "plc26: synced 1 orders and 1 attendee profiles" in output
+        assert "Successfully synced 2 orders and 2 attendee profiles from 2 events" in (
+            output
+        )
+
+    def test_failed_event_does_not_stop_the_others(
+        self, conference, get_orders, pretix_order_data
+    ):
+        next_year = Conference.objects.create(
+            year=2026, name="PLC 2026", slug="2026", pretix_event_slug="plc26"
+        )
+
+        def orders(wrapper, modified_since):
+            if wrapper.event_slug == "plc26":
+                raise ConnectionError("Pretix went away")
+            yield [pretix_order_data]
+
+        get_orders.side_effect = orders
+        out = StringIO()
+        with pytest.raises(CommandError, match="Failed to sync Pretix events: plc26"):
+            call_command("fetch_pretix_orders", stdout=out, stderr=StringIO())
+
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == SYNCED_UNTIL
+        next_year.refresh_from_db()
+        assert next_year.pretix_orders_synced_until is None
+        assert "Successfully synced 1 orders and 1 attendee profiles from 1 events" in (
+            out.getvalue()
+        )
+        runs = {run.event_slug: run for run in PretixSyncRun.objects.all()}
+        assert runs["2025"].source == "command"
+        assert runs["2025"].finished_at is not None
+        assert runs["2025"].orders_inserted == 1
+        assert runs["2025"].error == ""
+        assert runs["plc26"].finished_at is not None
+        assert "Pretix went away" in runs["plc26"].error
+
+    def test_write_error_stops_the_fetching(
+        self, conference, get_orders, pretix_order_data
+    ):
+        pages_fetched = []
+
+        def orders(wrapper, modified_since):
+            for page in range(20):
+                pages_fetched.append(page)
+                yield [pretix_order_data]
+
+        get_orders.side_effect = orders
+        with patch(
+            "attendee.management.commands.fetch_pretix_orders.sync_orders",
+            side_effect=RuntimeError("database went away"),
+        ):
+            with pytest.raises(RuntimeError):
+                call_command("fetch_pretix_orders", stdout=StringIO())
+
+        assert len(pages_fetched) < 20
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until is None
+        run = PretixSyncRun.objects.get()
+        assert run.finished_at is not None
+        assert "database went away" in run.error
+
+    def test_background(self, get_orders):
+        out = StringIO()
+        with patch("attendee.tasks.start_pretix_sync_task.delay") as delay:
+            call_command("fetch_pretix_orders", "--background", "--full", stdout=out)
+
+        delay.assert_called_once_with(full=True)
+        get_orders.assert_not_called()
+        assert "Queued a background Pretix sync" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestArchivePretixPayloadsCommand:
+    @pytest.fixture
+    def frozen(self, conference, pretix_order_data):
+        conference.historical_snapshot = {"registrations": 2}
+        conference.save()
+        sync_orders([pretix_order_data, dict(pretix_order_data, code="ORDER456")])
+        return conference
+
+    def test_recompresses_payloads(self, frozen, pretix_order_data):
+        live = Conference.objects.create(name="Live", year=2026, slug="2026")
+        PretixOrder(order_code="LIVE1").from_pretix_data(
+            pretix_order_data, conference=live
+        ).save()
+        out = StringIO()
+
+        with patch(
+            "attendee.management.commands.archive_pretix_payloads.BATCH_SIZE", 1
+        ):
+            call_command("archive_pretix_payloads", stdout=out)
+        call_command("archive_pretix_payloads", stdout=out)
+
+        assert out.getvalue().splitlines() == [
+            f"{frozen}: archived 2 Pretix order payloads",
+            f"{frozen}: archived 0 Pretix order payloads",
+        ]
+        codecs = dict(
+            PretixOrderPayload.objects.values_list("order__order_code", "codec")
+        )
+        assert codecs == {
+            "ORDER123": PayloadCodec.LZMA,
+            "ORDER456": PayloadCodec.LZMA,
+            "LIVE1": PayloadCodec.ZLIB,
+        }
+        order = PretixOrder.objects.get(order_code="ORDER123")
+        assert order.raw_data == pretix_order_data
+
+    def test_purges_payloads(self, frozen):
+        out = StringIO()
+        call_command("archive_pretix_payloads", "--purge", "--year", "2025", stdout=out)
+
+        assert out.getvalue() == f"{frozen}: purged 2 Pretix order payloads\n"
+        assert PretixOrderPayload.objects.count() == 0
+        assert PretixOrder.objects.count() == AttendeeProfile.objects.count() == 2
+        assert PretixOrder.objects.first().raw_data is None
+
+    def test_no_frozen_conference(self, frozen):
+        out = StringIO()
+        call_command("archive_pretix_payloads", "--year", "2024", stdout=out)
+
+        assert "No frozen conference to archive" in out.getvalue()
+        assert PretixOrderPayload.objects.filter(codec=PayloadCodec.ZLIB).count() == 2
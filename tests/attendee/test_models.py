@@ -1,6 +1,11 @@
+from unittest.mock import patch
+
 import pytest
+from django.utils.dateparse import parse_datetime
 
 from attendee.models import (
+    ATTENDEE_ANSWER_PARSERS,
+    ATTENDEE_FIELD_MAPPING,
     PRETIX_ATTENDEE_AGE_RANGE_QUESTION_IDENTIFIER,
     PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
     PRETIX_ATTENDEE_COUNTRY_QUESTION_IDENTIFIER,
@@ -14,8 +19,17 @@ from attendee.models import (
     PRETIX_ATTENDEE_PYLADIES_CHAPTER_QUESTION_IDENTIFIER,
     PRETIX_STAY_ANONYMOUS_ANSWER_IDENTIFIER,
     AttendeeProfile,
+    PayloadCodec,
     PretixOrder,
+    PretixOrderPayload,
+    PretixPositions,
+    PretixSyncRun,
+    PretixSyncSource,
+    parse_boolean_answer,
+    parse_choices_answer,
+    parse_text_answer,
 )
+from common.pretix_wrapper import PretixRequestStats
 
 
 @pytest.mark.django_db
@@ -54,11 +68,49 @@ class TestPretixOrderModel:
         assert order.cancellation_date == pretix_order_data["cancellation_date"]
         assert order.url == pretix_order_data["url"]
         assert order.datetime == pretix_order_data["datetime"]
-        assert order.last_modified == pretix_order_data["last_modified"]
+        assert order.last_modified == parse_datetime(pretix_order_data["last_modified"])
         assert order.event_slug == pretix_order_data["event"]
         assert order.name == "Example Attendee"
         assert order.is_anonymous is False
         assert order.raw_data == pretix_order_data
+        assert order.content_hash == PretixOrder.hash_pretix_data(pretix_order_data)
+
+    def test_hash_pretix_data(self, pretix_order_data):
+        """Only the parts of an order we import change its hash."""
+        content_hash = PretixOrder.hash_pretix_data(pretix_order_data)
+        reordered = dict(reversed(pretix_order_data.items()))
+        assert PretixOrder.hash_pretix_data(reordered) == content_hash
+        commented = dict(pretix_order_data, comment="Called about the invoice")
+        assert PretixOrder.hash_pretix_data(commented) == content_hash
+        cancelled = dict(pretix_order_data, status="c")
+        assert PretixOrder.hash_pretix_data(cancelled) != content_hash
+
+    def test_is_current(self, conference, pretix_order_data):
+        order = PretixOrder(order_code="ORDER123")
+        assert order.is_current(pretix_order_data) is False
+        order.from_pretix_data(pretix_order_data, conference=conference).save()
+        order = PretixOrder.objects.get(pk=order.pk)
+
+        assert order.is_current(pretix_order_data) is True
+        # Modified in pretix, but not in any field we import.
+        noted = dict(
+            pretix_order_data,
+            comment="Called about the invoice",
+            last_modified="2025-11-14T09:00:00+01:00",
+        )
+        assert order.is_current(noted) is True
+        cancelled = dict(noted, status="c")
+        assert order.is_current(cancelled) is False
+
+    def test_from_pretix_data_skips_current_data(self, conference, pretix_order_data):
+        order = PretixOrder(order_code="ORDER123")
+        order.from_pretix_data(pretix_order_data, conference=conference).save()
+        order.email = "edited@example.com"
+
+        order.from_pretix_data(pretix_order_data)
+        assert order.email == "edited@example.com"
+        order.from_pretix_data(pretix_order_data, force=True)
+        assert order.email == pretix_order_data["email"]
 
 
 @pytest.mark.django_db
@@ -147,7 +199,8 @@ class TestAttendeeProfileModel:
         assert profile.age_range == "19-25"
         assert profile.organization_name == "Umbrella Corp"
         assert profile.current_position == ["Student/Intern", "Other"]
-        assert profile.raw_answers is not None
+        order.raw_data = pretix_data
+        assert profile.raw_answers == pretix_data["positions"][0]["answers"]
 
     def test_populate_from_pretix_data_handles_missing_fields(self, conference):
         """Test that from_pretix_data handles missing fields gracefully."""
@@ -173,7 +226,8 @@ class TestAttendeeProfileModel:
         assert profile.age_range is None
         assert profile.organization_name is None
         assert len(profile.current_position) == 0
-        assert profile.raw_answers is not None
+        order.raw_data = pretix_data
+        assert profile.raw_answers == pretix_data["positions"][0]["answers"]
 
     def test_populate_from_pretix_data_none_value_for_chapter(self, conference):
         """Test populating AttendeeProfile with all demographic fields."""
@@ -251,7 +305,75 @@ class TestAttendeeProfileModel:
         assert profile.age_range == "19-25"
         assert profile.organization_name == "Umbrella Corp"
         assert profile.current_position == ["Student/Intern", "Other"]
-        assert profile.raw_answers is not None
+        order.raw_data = pretix_data
+        assert profile.raw_answers == pretix_data["positions"][0]["answers"]
+
+
+class TestPretixPositions:
+
+    def test_answer_parsers_follow_field_types(self):
+        """Each question is parsed the way its profile field needs."""
+        assert ATTENDEE_ANSWER_PARSERS.keys() == ATTENDEE_FIELD_MAPPING.keys()
+        assert ATTENDEE_ANSWER_PARSERS[
+            PRETIX_ATTENDEE_MAY_SHARE_EMAIL_WITH_SPONSOR_QUESTION_IDENTIFIER
+        ] == ("may_share_email_with_sponsor", parse_boolean_answer)
+        assert ATTENDEE_ANSWER_PARSERS[
+            PRETIX_ATTENDEE_HEARD_ABOUT_EVENT_QUESTION_IDENTIFIER
+        ] == ("heard_about", parse_choices_answer)
+        assert ATTENDEE_ANSWER_PARSERS[PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER] == (
+            "city",
+            parse_text_answer,
+        )
+
+    def test_reads_every_position_once(self):
+        """Order and profile fields come from the same pass over the positions."""
+        data = {
+            "positions": [
+                {
+                    "attendee_name": "",
+                    "answers": [
+                        {
+                            "answer": "Montreal",
+                            "question_identifier": PRETIX_ATTENDEE_PYLADIES_CHAPTER_QUESTION_IDENTIFIER,
+                        },
+                    ],
+                },
+                {
+                    "attendee_name": "Second Attendee",
+                    "answers": [
+                        {
+                            "answer": "Vancouver",
+                            "question_identifier": PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
+                        },
+                    ],
+                },
+            ]
+        }
+
+        positions = PretixPositions(data)
+
+        assert positions.name == "Second Attendee"
+        assert positions.is_anonymous is None
+        # The last position has no chapter, as before.
+        assert positions.profile_fields == {
+            "pyladies_chapter": None,
+            "city": "Vancouver",
+        }
+        assert len(positions.answers) == 2
+
+    def test_positions_are_shared(self, pretix_order_data, conference):
+        """An order and its profile can be filled from positions already read."""
+        positions = PretixPositions(pretix_order_data)
+
+        order = PretixOrder(order_code=pretix_order_data["code"])
+        with patch("attendee.models.PretixPositions") as parse:
+            order.from_pretix_data(
+                pretix_order_data, conference=conference, positions=positions
+            )
+            AttendeeProfile(order=order).from_pretix_data(pretix_order_data, positions)
+
+        parse.assert_not_called()
+        assert order.name == "Example Attendee"
 
 
 @pytest.mark.django_db
@@ -261,3 +383,91 @@ class TestPretixOrderConferenceLink:
     def test_links_to_conference(self, conference):
         order = PretixOrder.objects.create(order_code="ORDER123", conference=conference)
         assert list(conference.pretix_orders.all()) == [order]
+
+
+@pytest.mark.django_db
+class TestPretixOrderPayload:
+    @pytest.mark.parametrize("codec", PayloadCodec.values)
+    def test_compress_and_load(self, codec, pretix_order_data):
+        data = PretixOrderPayload.compress(pretix_order_data, codec)
+        assert len(data) < len(str(pretix_order_data))
+        payload = PretixOrderPayload(codec=codec, data=data)
+        assert payload.load() == pretix_order_data
+
+    def test_save_writes_the_payload(self, conference, pretix_order_data):
+        order = PretixOrder(order_code="ORDER123")
+        order.from_pretix_data(pretix_order_data, conference=conference).save()
+
+        payload = PretixOrderPayload.objects.get()
+        assert str(payload) == f"Payload of {order.pk}"
+        assert payload.codec == PayloadCodec.ZLIB
+        order = PretixOrder.objects.get()
+        assert order.raw_data == pretix_order_data
+
+    def test_save_rewrites_an_archived_payload(self, conference, pretix_order_data):
+        order = PretixOrder.objects.create(order_code="ORDER123", conference=conference)
+        PretixOrderPayload.objects.create(
+            order=order,
+            codec=PayloadCodec.LZMA,
+            data=PretixOrderPayload.compress({"code": "ORDER123"}, PayloadCodec.LZMA),
+        )
+
+        order.raw_data = pretix_order_data
+        order.save()
+        # Saved without new data, the payload is left alone.
+        order.save()
+
+        payload = PretixOrderPayload.objects.get()
+        assert payload.codec == PayloadCodec.ZLIB
+        assert payload.load() == pretix_order_data
+
+    def test_orders_without_a_payload(self, conference):
+        order = PretixOrder.objects.create(order_code="ORDER123", conference=conference)
+        profile = AttendeeProfile.objects.create(order=order)
+
+        assert order.raw_data is None
+        assert profile.raw_answers is None
+        assert PretixOrderPayload.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestPretixSyncRun:
+    def test_rates(self):
+        started_at = parse_datetime("2025-11-13T17:00:00+00:00")
+        run = PretixSyncRun(
+            event_slug="2025",
+            source=PretixSyncSource.COMMAND,
+            started_at=started_at,
+            orders_inserted=30,
+            orders_updated=10,
+            orders_skipped=100,
+        )
+        assert str(run) == "fetch_pretix_orders of 2025 at 2025-11-13 17:00:00+00:00"
+        assert run.seconds is None
+        assert run.orders_per_second is None
+
+        run.finished_at = started_at
+        assert run.seconds == 0
+        assert run.orders_per_second is None
+
+        run.finished_at = parse_datetime("2025-11-13T17:00:20+00:00")
+        assert run.seconds == 20
+        assert run.orders_per_second == 2
+
+    def test_add_requests_and_finish(self):
+        run = PretixSyncRun.objects.create(
+            event_slug="2025", source=PretixSyncSource.WEBHOOK
+        )
+        stats = PretixRequestStats()
+        stats.requests, stats.seconds, stats.retries = 3, 1.5, 2
+        run.add_requests(stats)
+        run.add_requests(stats)
+        run.finish(ValueError("boom"))
+
+        run.refresh_from_db()
+        assert (run.pages_fetched, run.http_seconds, run.retries) == (6, 3.0, 4)
+        assert run.finished_at is not None
+        assert run.error == "ValueError('boom')"
+
+        run.finish()
+        assert run.error == ""
@@ -0,0 +1,178 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from attendee.models import (
+    PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
+    AttendeeProfile,
+    PayloadCodec,
+    PretixOrder,
+    PretixOrderPayload,
+    PretixSyncRun,
+)
+from attendee.sync import sync_orders
+from portal.models import BaseModel
+
+
+def make_orders(pretix_order_data, count):
+    return [
+        dict(pretix_order_data, code=f"ORDER{index}", email=f"{index}@example.com")
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestSyncOrders:
+    def test_creates_orders_and_profiles(self, conference, pretix_order_data):
+        created, skipped = sync_orders(make_orders(pretix_order_data, 3))
+
+        assert created == ["ORDER0", "ORDER1", "ORDER2"]
+        assert skipped == 0
+        orders = PretixOrder.objects.order_by("order_code")
+        assert [order.email for order in orders] == [
+            "0@example.com",
+            "1@example.com",
+            "2@example.com",
+        ]
+        for order in orders:
+            assert order.conference == conference
+            assert order.name == "Example Attendee"
+            assert order.is_anonymous is False
+            assert order.creation_date is not None
+            assert (
+                order.profile.raw_answers
+                == pretix_order_data["positions"][0]["answers"]
+            )
+
+    def test_updates_stored_orders(self, conference, pretix_order_data):
+        sync_orders([pretix_order_data])
+        order = PretixOrder.objects.get(order_code="ORDER123")
+        city = {
+            "question_identifier": PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
+            "answer": "Vancouver",
+        }
+        changed = dict(
+            pretix_order_data,
+            status="c",
+            last_modified="2025-11-14T10:00:00+01:00",
+            positions=[{"attendee_name": "Renamed", "answers": [city]}],
+        )
+
+        assert sync_orders([changed]) == ([], 0)
+
+        order.refresh_from_db()
+        assert order.status == "c"
+        assert order.name == "Renamed"
+        assert order.modified_date > order.creation_date
+        assert AttendeeProfile.objects.get(order=order).city == "Vancouver"
+        assert PretixOrder.objects.count() == AttendeeProfile.objects.count() == 1
+
+    def test_writes_payloads(self, conference, pretix_order_data):
+        sync_orders([pretix_order_data])
+        order = PretixOrder.objects.get()
+        PretixOrderPayload.objects.update(
+            codec=PayloadCodec.LZMA,
+            data=PretixOrderPayload.compress({}, PayloadCodec.LZMA),
+        )
+        changed = dict(
+            pretix_order_data, status="c", last_modified="2025-11-14T10:00:00+01:00"
+        )
+
+        sync_orders([changed])
+
+        payload = PretixOrderPayload.objects.get()
+        assert payload.order == order
+        assert payload.codec == PayloadCodec.ZLIB
+        assert PretixOrder.objects.get().raw_data == changed
+
+    def test_stored_payloads_are_not_read(self, conference, pretix_order_data):
+        sync_orders([pretix_order_data])
+        changed = dict(
+            pretix_order_data, status="c", last_modified="2025-11-14T10:00:00+01:00"
+        )
+
+        with CaptureQueriesContext(connection) as captured:
+            sync_orders([changed])
+
+        lookup = captured[0]["sql"]
+        assert "attendee_pretixorderpayload" in lookup
+        assert '"attendee_pretixorderpayload"."data"' not in lookup
+
+    def test_skips_unchanged_orders(self, conference, pretix_order_data):
+        sync_orders(make_orders(pretix_order_data, 3))
+        modified = dict(PretixOrder.objects.values_list("order_code", "modified_date"))
+        orders = make_orders(pretix_order_data, 3)
+        for order in orders[1:]:
+            order["last_modified"] = "2025-11-14T09:00:00+01:00"
+        # Only this one changed in a way we import.
+        orders[1]["status"] = "c"
+
+        with CaptureQueriesContext(connection) as captured:
+            assert sync_orders(orders) == ([], 2)
+
+        order = PretixOrder.objects.get(order_code="ORDER1")
+        assert order.status == "c"
+        assert order.modified_date > modified["ORDER1"]
+        for code in ("ORDER0", "ORDER2"):
+            assert PretixOrder.objects.get(order_code=code).modified_date == (
+                modified[code]
+            )
+        with CaptureQueriesContext(connection) as unchanged:
+            assert sync_orders(make_orders(pretix_order_data, 1)) == ([], 1)
+        # Loading the stored orders is all an unchanged page costs.
+        assert len(unchanged) == 1
+        assert len(captured) > 1
+
+    def test_counts_the_orders_on_the_run(self, conference, pretix_order_data):
+        sync_orders(make_orders(pretix_order_data, 2))
+        orders = make_orders(pretix_order_data, 4)
+        orders[1]["status"] = "c"
+        orders[1]["last_modified"] = "2025-11-14T09:00:00+01:00"
+        run = PretixSyncRun()
+
+        sync_orders(orders, run=run)
+        sync_orders(orders[:1], run=run)
+
+        assert run.orders_inserted == 2
+        assert run.orders_updated == 1
+        assert run.orders_skipped == 2
+
+    def test_force_imports_unchanged_orders(self, conference, pretix_order_data):
+        sync_orders([pretix_order_data])
+        PretixOrder.objects.update(email="edited@example.com")
+
+        assert sync_orders([pretix_order_data], force=True) == ([], 0)
+
+        assert PretixOrder.objects.get().email == "attendee@example.com"
+
+    def test_later_copy_of_an_order_wins(self, conference, pretix_order_data):
+        cancelled = dict(pretix_order_data, status="c")
+
+        assert sync_orders([pretix_order_data, cancelled]) == (["ORDER123"], 0)
+
+        assert PretixOrder.objects.get().status == "c"
+
+    def test_adds_missing_profile(self, conference, pretix_order_data):
+        PretixOrder.objects.create(order_code="ORDER123", conference=conference)
+
+        assert sync_orders([pretix_order_data]) == (["ORDER123"], 0)
+
+        assert AttendeeProfile.objects.get().order.email == "attendee@example.com"
+
+    def test_empty_page(self):
+        with CaptureQueriesContext(connection) as captured:
+            assert sync_orders([]) == ([], 0)
+        assert len(captured) == 0
+
+    def test_query_count_does_not_grow_with_the_page(
+        self, conference, pretix_order_data
+    ):
+        with CaptureQueriesContext(connection) as small:
+            sync_orders(make_orders(pretix_order_data, 2))
+        with CaptureQueriesContext(connection) as large:
+            sync_orders(make_orders(pretix_order_data, 50))
+
+        assert len(large) <= len(small) + 2
+        assert PretixOrder.objects.count() == 50
+        # Orders, their payloads and profiles, and the conference.
+        assert BaseModel.objects.count() == 151
@@ -0,0 +1,387 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import ANY, patch
+
+import pytest
+import requests
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils.timezone import now
+
+from attendee.models import (
+    PretixOrder,
+    PretixSyncCheckpoint,
+    PretixSyncRun,
+    PretixSyncStatus,
+)
+from attendee.sync import PRETIX_SYNC_WORKERS, WATERMARK_OVERLAP, sync_orders
+from attendee.tasks import (
+    PRETIX_RECONCILE_LOCK,
+    PRETIX_SYNC_STALE_AFTER,
+    reconcile_pretix_orders_task,
+    start_pretix_sync_task,
+    sync_pretix_page_task,
+)
+from portal.models import BaseModel, Conference
+
+SYNCED_UNTIL = datetime(2025, 11, 13, 16, 12, 7, 2602, tzinfo=timezone.utc)
+PAGE_2 = "https://pretix.example/orders/?page=2"
+
+
+@pytest.fixture
+def get_order_page(settings):
+    settings.PRETIX_API_TOKEN = "test_token"
+    with patch(
+        "common.pretix_wrapper.PretixWrapper.get_order_page", autospec=True
+    ) as get_order_page:
+        yield get_order_page
+
+
+def two_pages(pretix_order_data):
+    """A ``get_order_page`` side effect serving two pages of one order each."""
+
+    def get_order_page(wrapper, url=None, modified_since=None):
+        if url is None:
+            return [pretix_order_data], PAGE_2
+        return [dict(pretix_order_data, code="ORDER456")], None
+
+    return get_order_page
+
+
+def running_checkpoint(conference, **fields):
+    return PretixSyncCheckpoint.objects.create(
+        conference=conference,
+        status=PretixSyncStatus.RUNNING,
+        started_at=now(),
+        **fields,
+    )
+
+
+@pytest.mark.django_db
+class TestStartPretixSyncTask:
+    def test_syncs_every_page(self, conference, get_order_page, pretix_order_data):
+        get_order_page.side_effect = two_pages(pretix_order_data)
+
+        result = start_pretix_sync_task()
+
+        assert result == "Queued 1 Pretix syncs, started 1"
+        assert [call.args[1] for call in get_order_page.call_args_list] == [
+            None,
+            PAGE_2,
+        ]
+        get_order_page.assert_any_call(ANY, None, modified_since=None)
+        checkpoint = conference.pretix_sync
+        assert checkpoint.status == PretixSyncStatus.DONE
+        assert checkpoint.pages_synced == 2
+        assert checkpoint.orders_synced == 2
+        assert checkpoint.orders_skipped == 0
+        assert checkpoint.next_url == ""
+        assert checkpoint.finished_at is not None
+        assert set(PretixOrder.objects.values_list("order_code", flat=True)) == {
+            "ORDER123",
+            "ORDER456",
+        }
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == SYNCED_UNTIL
+        run = PretixSyncRun.objects.get()
+        assert checkpoint.run == run
+        assert run.source == "background"
+        assert run.finished_at == checkpoint.finished_at
+        assert run.orders_inserted == 2
+        assert run.error == ""
+
+    def test_syncs_changes_since_the_last_sync(
+        self, conference, get_order_page, pretix_order_data
+    ):
+        conference.pretix_orders_synced_until = SYNCED_UNTIL
+        conference.save()
+        get_order_page.return_value = ([pretix_order_data], None)
+
+        start_pretix_sync_task()
+        get_order_page.assert_called_once_with(
+            ANY, None, modified_since=SYNCED_UNTIL - WATERMARK_OVERLAP
+        )
+
+        get_order_page.reset_mock()
+        start_pretix_sync_task(full=True)
+        get_order_page.assert_called_once_with(ANY, None, modified_since=None)
+        assert conference.pretix_sync.full is True
+
+    def test_syncs_a_few_events_at_a_time(self, get_order_page, pretix_order_data):
+        for year in range(2030, 2030 + PRETIX_SYNC_WORKERS + 2):
+            Conference.objects.create(
+                year=year,
+                name=f"PLC {year}",
+                slug=str(year),
+                pretix_event_slug=str(year),
+            )
+        running = []
+
+        def get_order_page_side_effect(wrapper, url=None, modified_since=None):
+            running.append(
+                PretixSyncCheckpoint.objects.filter(
+                    status=PretixSyncStatus.RUNNING
+                ).count()
+            )
+            slug = wrapper.event_slug
+            return [dict(pretix_order_data, code=f"ORDER{slug}", event=slug)], None
+
+        get_order_page.side_effect = get_order_page_side_effect
+
+        result = start_pretix_sync_task()
+
+        assert result == (
+            f"Queued {PRETIX_SYNC_WORKERS + 3} Pretix syncs, "
+            f"started {PRETIX_SYNC_WORKERS}"
+        )
+        assert len(running) == PRETIX_SYNC_WORKERS + 3
+        assert max(running) == PRETIX_SYNC_WORKERS
+        assert set(PretixSyncCheckpoint.objects.values_list("status", flat=True)) == {
+            PretixSyncStatus.DONE
+        }
+
+    def test_leaves_running_syncs_alone(self, conference, get_order_page):
+        checkpoint = running_checkpoint(conference, next_url=PAGE_2)
+
+        assert start_pretix_sync_task() == "Queued 0 Pretix syncs, started 0"
+        get_order_page.assert_not_called()
+        checkpoint.refresh_from_db()
+        assert checkpoint.status == PretixSyncStatus.RUNNING
+
+    @pytest.mark.parametrize("status", [PretixSyncStatus.FAILED, "stale"])
+    def test_resumes_from_the_checkpoint(
+        self, conference, get_order_page, pretix_order_data, status
+    ):
+        stalled_run = PretixSyncRun.objects.create(
+            conference=conference, event_slug="2025", source="background"
+        )
+        checkpoint = running_checkpoint(
+            conference,
+            next_url=PAGE_2,
+            pages_synced=1,
+            orders_synced=1,
+            synced_until=SYNCED_UNTIL,
+            run=stalled_run if status == "stale" else None,
+        )
+        if status == "stale":
+            BaseModel.objects.filter(pk=checkpoint.pk).update(
+                modified_date=now() - PRETIX_SYNC_STALE_AFTER - timedelta(minutes=1)
+            )
+        else:
+            checkpoint.status = status
+            checkpoint.save()
+        get_order_page.side_effect = two_pages(pretix_order_data)
+
+        start_pretix_sync_task()
+
+        get_order_page.assert_called_once_with(ANY, PAGE_2, modified_since=None)
+        checkpoint.refresh_from_db()
+        assert checkpoint.status == PretixSyncStatus.DONE
+        assert checkpoint.pages_synced == 2
+        assert checkpoint.orders_synced == 2
+        # The resumed sync is a run of its own.
+        assert checkpoint.run != stalled_run
+        assert checkpoint.run.orders_inserted == 1
+        stalled_run.refresh_from_db()
+        if status == "stale":
+            assert stalled_run.error == "The sync stalled"
+        else:
+            assert stalled_run.finished_at is None
+
+    def test_starts_a_finished_sync_over(
+        self, conference, get_order_page, pretix_order_data
+    ):
+        PretixSyncCheckpoint.objects.create(
+            conference=conference,
+            status=PretixSyncStatus.DONE,
+            pages_synced=5,
+            orders_synced=200,
+        )
+        get_order_page.return_value = ([pretix_order_data], None)
+
+        start_pretix_sync_task()
+
+        checkpoint = PretixSyncCheckpoint.objects.get(conference=conference)
+        assert checkpoint.pages_synced == 1
+        assert checkpoint.orders_synced == 1
+
+
+@pytest.mark.django_db
+class TestSyncPretixPageTask:
+    def test_not_running(self, conference):
+        checkpoint = PretixSyncCheckpoint.objects.create(
+            conference=conference, status=PretixSyncStatus.DONE
+        )
+        assert (
+            sync_pretix_page_task(checkpoint.pk)
+            == f"Pretix sync {checkpoint.pk} is not running"
+        )
+
+    def test_queues_the_next_page(self, conference, get_order_page, pretix_order_data):
+        checkpoint = running_checkpoint(conference)
+        get_order_page.return_value = ([pretix_order_data], PAGE_2)
+
+        with patch("attendee.tasks.enqueue") as enqueue:
+            result = sync_pretix_page_task(checkpoint.pk)
+
+        assert result == "2025: synced page 1"
+        enqueue.assert_called_once_with(sync_pretix_page_task, checkpoint.pk)
+        checkpoint.refresh_from_db()
+        assert checkpoint.next_url == PAGE_2
+        assert checkpoint.synced_until == SYNCED_UNTIL
+        assert checkpoint.status == PretixSyncStatus.RUNNING
+        conference.refresh_from_db()
+        # Only moves once the whole event is synced.
+        assert conference.pretix_orders_synced_until is None
+
+    def test_retries_pretix_errors(self, conference, get_order_page):
+        checkpoint = running_checkpoint(conference)
+        error = requests.exceptions.ConnectionError("Pretix is down")
+        get_order_page.side_effect = error
+
+        with patch.object(
+            sync_pretix_page_task, "retry", wraps=sync_pretix_page_task.retry
+        ) as retry:
+            with pytest.raises(Retry):
+                sync_pretix_page_task.apply(args=[checkpoint.pk], retries=2)
+
+        assert retry.call_args.kwargs == {"exc": error, "countdown": 240}
+        checkpoint.refresh_from_db()
+        assert checkpoint.status == PretixSyncStatus.RUNNING
+        assert "Pretix is down" in checkpoint.error
+        assert checkpoint.run.retries == 1
+        assert checkpoint.run.finished_at is None
+
+    def test_fails_after_the_last_retry(self, conference, get_order_page):
+        checkpoint = running_checkpoint(conference)
+        get_order_page.side_effect = requests.exceptions.ConnectionError("Down")
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            sync_pretix_page_task.apply(args=[checkpoint.pk], retries=3)
+
+        checkpoint.refresh_from_db()
+        assert checkpoint.status == PretixSyncStatus.FAILED
+        assert "Down" in checkpoint.error
+        assert checkpoint.run is None
+        run = PretixSyncRun.objects.get()
+        assert run.finished_at is not None
+        assert "Down" in run.error
+
+    def test_fails_on_database_errors(
+        self, conference, get_order_page, pretix_order_data
+    ):
+        checkpoint = running_checkpoint(conference)
+        get_order_page.return_value = ([pretix_order_data], None)
+
+        with patch(
+            "attendee.tasks.sync_orders", side_effect=DatabaseError("deadlock")
+        ), pytest.raises(DatabaseError):
+            sync_pretix_page_task(checkpoint.pk)
+
+        checkpoint.refresh_from_db()
+        assert checkpoint.status == PretixSyncStatus.FAILED
+        assert checkpoint.pages_synced == 0
+        assert "deadlock" in checkpoint.error
+        run = PretixSyncRun.objects.get()
+        assert "deadlock" in run.error
+
+    def test_str(self, conference):
+        checkpoint = PretixSyncCheckpoint(conference=conference)
+        assert str(checkpoint) == "Pretix sync of PyLadiesCon 2025"
+
+
+@pytest.fixture
+def get_order_pages(settings):
+    settings.PRETIX_API_TOKEN = "test_token"
+    with patch(
+        "common.pretix_wrapper.PretixWrapper.get_order_pages", autospec=True
+    ) as get_order_pages:
+        yield get_order_pages
+
+
+@pytest.mark.django_db
+class TestReconcilePretixOrdersTask:
+    def test_repairs_only_divergent_orders(
+        self, conference, get_order_pages, pretix_order_data
+    ):
+        stored = [pretix_order_data, dict(pretix_order_data, code="ORDER456")]
+        sync_orders(stored, conference=conference)
+        conference.pretix_orders_synced_until = SYNCED_UNTIL
+        conference.save()
+        # The webhook cancelling ORDER456 was lost, as was the one for ORDER789.
+        cancelled = dict(
+            stored[1], status="c", last_modified="2025-11-14T10:00:00+00:00"
+        )
+        new = dict(pretix_order_data, code="ORDER789")
+        get_order_pages.return_value = [[pretix_order_data, cancelled], [new]]
+
+        with patch(
+            "attendee.tasks.sync_orders", wraps=sync_orders
+        ) as reconciled_sync_orders:
+            result = reconcile_pretix_orders_task()
+
+        assert result == "Repaired 2 Pretix orders"
+        get_order_pages.assert_called_once_with(
+            ANY, modified_since=SYNCED_UNTIL - WATERMARK_OVERLAP
+        )
+        assert [
+            [order["code"] for order in call.args[0]]
+            for call in reconciled_sync_orders.call_args_list
+        ] == [["ORDER456"], ["ORDER789"]]
+        assert PretixOrder.objects.get(order_code="ORDER456").status == "c"
+        assert PretixOrder.objects.filter(order_code="ORDER789").exists()
+        run = PretixSyncRun.objects.get()
+        assert run.source == "reconcile"
+        assert (run.orders_inserted, run.orders_updated, run.orders_skipped) == (
+            1,
+            1,
+            1,
+        )
+        assert run.finished_at is not None
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until == datetime(
+            2025, 11, 14, 10, tzinfo=timezone.utc
+        )
+
+    def test_leaves_events_being_synced_alone(self, conference, get_order_pages):
+        checkpoint = running_checkpoint(conference)
+        get_order_pages.return_value = []
+
+        assert reconcile_pretix_orders_task() == "Repaired 0 Pretix orders"
+        get_order_pages.assert_not_called()
+
+        BaseModel.objects.filter(pk=checkpoint.pk).update(
+            modified_date=now() - PRETIX_SYNC_STALE_AFTER - timedelta(minutes=1)
+        )
+        reconcile_pretix_orders_task()
+        get_order_pages.assert_called_once_with(ANY, modified_since=None)
+
+    def test_is_scheduled(self, settings):
+        schedule = settings.CELERY_BEAT_SCHEDULE["reconcile-pretix-orders"]
+        assert schedule["task"] == reconcile_pretix_orders_task.name
+        assert schedule["schedule"] == settings.PRETIX_RECONCILE_INTERVAL
+
+    def test_one_at_a_time(self, conference, get_order_pages):
+        cache.add(PRETIX_RECONCILE_LOCK, True)
+
+        result = reconcile_pretix_orders_task()
+
+        assert result == "A Pretix reconciliation is already running"
+        get_order_pages.assert_not_called()
+        cache.delete(PRETIX_RECONCILE_LOCK)
+
+    def test_failed_event(self, conference, get_order_pages, pretix_order_data):
+        def pages(wrapper, modified_since):
+            yield [pretix_order_data]
+            raise requests.exceptions.ConnectionError("Pretix is down")
+
+        get_order_pages.side_effect = pages
+
+        result = reconcile_pretix_orders_task()
+
+        assert result == "Repaired 1 Pretix orders, failed to reconcile 2025"
+        run = PretixSyncRun.objects.get()
+        assert "Pretix is down" in run.error
+        conference.refresh_from_db()
+        assert conference.pretix_orders_synced_until is None
+        assert cache.get(PRETIX_RECONCILE_LOCK) is None
@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from attendee.models import PretixOrder
+from common import bulk
+from common.bulk import bulk_upsert
+from portal.models import BaseModel
+
+
+@pytest.mark.django_db
+class TestBulkUpsert:
+    def test_inserts_new_rows(self, conference):
+        orders = [
+            PretixOrder(order_code=f"ORDER{index}", conference=conference)
+            for index in range(3)
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            bulk_upsert(PretixOrder, orders, "order_code")
+
+        # The BaseModel rows and the PretixOrder rows, inside a savepoint.
+        assert len(captured) == 4
+        for order in orders:
+            assert order.pk is not None
+            assert order.id == order.pk
+            assert not order._state.adding
+            stored = PretixOrder.objects.get(pk=order.pk)
+            assert stored.order_code == order.order_code
+            assert stored.creation_date == order.creation_date
+
+    def test_updates_loaded_rows(self, conference):
+        order = PretixOrder.objects.create(order_code="ORDER1", conference=conference)
+        order = PretixOrder.objects.get(pk=order.pk)
+        created, modified = order.creation_date, order.modified_date
+        order.status = "c"
+
+        bulk_upsert(PretixOrder, [order], "order_code")
+
+        stored = PretixOrder.objects.get(pk=order.pk)
+        assert stored.status == "c"
+        assert stored.creation_date == created
+        assert stored.modified_date > modified
+        assert BaseModel.objects.count() == 2
+
+    def test_takes_over_rows_inserted_meanwhile(self, conference):
+        stored = PretixOrder.objects.create(order_code="ORDER1", conference=conference)
+        order = PretixOrder(order_code="ORDER1", conference=conference, status="p")
+
+        bulk_upsert(PretixOrder, [order], "order_code")
+
+        assert order.pk == stored.pk
+        assert PretixOrder.objects.get().status == "p"
+        # The BaseModel row made for the duplicate is gone again.
+        assert BaseModel.objects.count() == 2
+
+    def test_batches(self, conference, monkeypatch):
+        monkeypatch.setattr(bulk, "BATCH_SIZE", 2)
+        orders = [
+            PretixOrder(order_code=f"ORDER{index}", conference=conference)
+            for index in range(5)
+        ]
+        bulk_upsert(PretixOrder, orders, "order_code")
+
+        assert PretixOrder.objects.count() == 5
+        assert len({order.pk for order in orders}) == 5
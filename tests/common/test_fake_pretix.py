@@ -0,0 +1,125 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+import requests
+from django.core.management import call_command
+from django.urls import reverse
+
+from attendee.models import PretixOrder, PretixSyncRun
+from attendee.tasks import reconcile_pretix_orders_task
+from common.pretix_wrapper import PRETIX_ORG, PretixRequestStats, PretixWrapper
+from tests.fake_pretix import FAKE_PRETIX_START
+
+# The fixture's 120 orders, less 3 pending (7, 57, 107) and 2 in test mode
+# (3, 103). 6 of them are cancelled.
+SYNCED_ORDERS = 120 - 3 - 2
+
+
+@pytest.fixture
+def wrapper(fake_pretix):
+    return PretixWrapper(PRETIX_ORG, fake_pretix.event)
+
+
+@pytest.mark.django_db
+class TestFakePretix:
+    def test_pages_through_the_orders(self, wrapper, fake_pretix):
+        pages = list(wrapper.get_order_pages())
+
+        assert len(pages) == 3
+        assert fake_pretix.requests == 3
+        orders = [order for page in pages for order in page]
+        assert len(orders) == SYNCED_ORDERS
+        assert {order["status"] for order in orders} == {"p", "c"}
+        assert "invoice_address" not in orders[0]
+
+    def test_orders_changed_since(self, wrapper):
+        since = FAKE_PRETIX_START + timedelta(seconds=99.5)
+        codes = [order["code"] for order in wrapper.get_orders(modified_since=since)]
+        assert codes == [
+            f"F{index:07d}" for index in range(100, 120) if index not in (103, 107)
+        ]
+
+    def test_order_by_code(self, wrapper, fake_pretix):
+        assert wrapper.get_order_by_code("F0000042")["code"] == "F0000042"
+        with pytest.raises(Exception, match="404"):
+            wrapper.get_order_by_code("F9999999")
+        with pytest.raises(Exception, match="404"):
+            wrapper.get_order_by_code("NOTANORDER")
+
+    def test_unknown_path(self, fake_pretix):
+        response = requests.get(
+            PretixWrapper.base_url + "organizers/pyladiescon/events/",
+            headers={"Authorization": f"Token {fake_pretix.token}"},
+        )
+        assert response.status_code == 404
+
+    def test_checks_the_token(self, wrapper, fake_pretix):
+        fake_pretix.token = "another_token"
+        with pytest.raises(requests.exceptions.HTTPError, match="401"):
+            list(wrapper.get_orders())
+
+    def test_flaky_pretix_is_retried(self, wrapper, fake_pretix):
+        fake_pretix.error_rate = 0.5
+        with PretixRequestStats().record() as stats:
+            orders = list(wrapper.get_orders())
+
+        assert len(orders) == SYNCED_ORDERS
+        assert fake_pretix.requests > 3
+        assert stats.requests == 3
+        assert stats.retries == fake_pretix.requests - 3
+        assert stats.seconds > 0
+
+    def test_latency(self, wrapper, fake_pretix):
+        fake_pretix.latency = 0.01
+        with patch("tests.fake_pretix.time.sleep") as sleep:
+            wrapper.get_order_by_code("F0000001")
+        sleep.assert_called_once_with(0.01)
+
+    def test_fetch_pretix_orders(self, fake_pretix):
+        call_command("fetch_pretix_orders", stdout=StringIO())
+
+        assert PretixOrder.objects.count() == SYNCED_ORDERS
+        assert PretixOrder.objects.filter(status="c").count() == 6
+        order = PretixOrder.objects.get(order_code="F0000000")
+        assert order.is_anonymous is True
+        assert order.profile.city == "Vancouver"
+        run = PretixSyncRun.objects.get()
+        assert run.pages_fetched == 3
+        assert run.http_seconds > 0
+        assert run.orders_inserted == SYNCED_ORDERS
+
+    def test_reconciles(self, fake_pretix):
+        assert reconcile_pretix_orders_task() == (
+            f"Repaired {SYNCED_ORDERS} Pretix orders"
+        )
+        requests_made = fake_pretix.requests
+
+        # Everything is in sync; only the last few minutes are listed again.
+        assert reconcile_pretix_orders_task() == "Repaired 0 Pretix orders"
+        assert fake_pretix.requests == requests_made + 3
+        run = PretixSyncRun.objects.latest("started_at")
+        assert run.orders_skipped == SYNCED_ORDERS
+        assert run.orders_inserted == run.orders_updated == 0
+
+    def test_replays_webhooks(self, client, settings, fake_pretix):
+        settings.PRETIX_WEBHOOK_SECRET = "supersecret"
+        fake_pretix.orders = 10
+        notifications = list(fake_pretix.notifications())
+        for notification in notifications:
+            response = client.post(
+                reverse("webhooks:pretix_webhook"),
+                query_params={"secret": "supersecret"},
+                data=json.dumps(notification),
+                content_type="application/json",
+            )
+            assert response.status_code == 202
+
+        # Less one pending order and one in test mode.
+        assert len(notifications) == 8
+        assert PretixOrder.objects.count() == 8
+        runs = PretixSyncRun.objects.filter(source="webhook")
+        assert runs.count() == 8
+        assert sum(run.pages_fetched for run in runs) == 8
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from common.json_stream import PaginatedListing
+
+
+def chunked(text, size):
+    body = text.encode()
+    chunks = []
+    for start in range(0, len(body), size):
+        end = start + size
+        chunks.append(body[start:end])
+    return chunks
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_reads_the_results_and_the_next_page(size):
+    page = {
+        "count": 12345,
+        "next": "https://pretix.example/orders/?page=2",
+        "previous": None,
+        "results": [{"code": "ORDER123", "name": "Zoë 🐍"}, {"code": "ORDER456"}],
+    }
+    listing = PaginatedListing(chunked(json.dumps(page, ensure_ascii=False), size))
+
+    assert list(listing) == page["results"]
+    assert listing.next == "https://pretix.example/orders/?page=2"
+
+
+def test_results_before_next():
+    listing = PaginatedListing(
+        chunked(' { "results" : [ 1 , 2 ] , "next" : null , "count": 2 } ', 2)
+    )
+
+    assert list(listing) == [1, 2]
+    assert listing.next is None
+
+
+def test_results_are_handed_over_as_they_are_read():
+    chunks = iter([b'{"results": [{"code": "A"}, ', b'{"code": "B"}]}'])
+    listing = iter(PaginatedListing(chunks))
+
+    assert next(listing) == {"code": "A"}
+    # The second chunk is still unread.
+    assert next(chunks) == b'{"code": "B"}]}'
+
+
+@pytest.mark.parametrize("text", ["{}", '{"results": []}'])
+def test_empty(text):
+    listing = PaginatedListing([text.encode()])
+
+    assert list(listing) == []
+    assert listing.next is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "[]",
+        '{"results": [1, 2}',
+        '{"results": [1, 2] "next": null}',
+        '{"next" null}',
+        '{"results": [{"code": "ORDER',
+        '{"results": [1, 2]',
+    ],
+)
+def test_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(PaginatedListing(chunked(text, 4)))
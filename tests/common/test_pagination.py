@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.core.cache import cache
+
+from common.pagination import (
+    KeysetPaginationMixin,
+    decode_cursor,
+    encode_cursor,
+    seek_filter,
+)
+from sponsorship.models import SponsorshipProfile
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["-organization_name", "pk"], ["Acme", 7])
+    assert decode_cursor(cursor) == (["-organization_name", "pk"], ["Acme", 7])
+
+
+def test_cursor_serializes_dates():
+    when = datetime(2025, 9, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor(["creation_date", "pk"], [when, 7])
+    assert decode_cursor(cursor) == (
+        ["creation_date", "pk"],
+        ["2025-09-01T12:30:00Z", 7],
+    )
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30="])
+def test_decode_cursor_rejects_garbage(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_decode_cursor_rejects_unsigned_cursor():
+    forged = json.dumps({"o": ["pk"], "v": ["abc"]})
+    assert decode_cursor(base64.urlsafe_b64encode(forged.encode()).decode()) is None
+
+
+def test_decode_cursor_rejects_tampered_cursor():
+    cursor = encode_cursor(["pk"], [1])
+    assert decode_cursor(cursor[:-1] + ("A" if cursor[-1] != "A" else "B")) is None
+
+
+@pytest.mark.django_db
+class TestKeysetCount:
+    def test_empty_queryset_counts_zero(self):
+        assert (
+            KeysetPaginationMixin().get_keyset_count(SponsorshipProfile.objects.none())
+            == 0
+        )
+
+    def test_count_is_refreshed_when_a_row_changes(self, conference):
+        cache.clear()
+        queryset = SponsorshipProfile.objects.filter(conference=conference)
+        mixin = KeysetPaginationMixin()
+        SponsorshipProfile.objects.create(organization_name="A", conference=conference)
+        assert mixin.get_keyset_count(queryset) == 1
+
+        profile = SponsorshipProfile.objects.create(
+            organization_name="B", conference=conference
+        )
+        assert mixin.get_keyset_count(queryset) == 2
+
+        profile.delete()
+        assert mixin.get_keyset_count(queryset) == 1
+
+    def test_count_is_cached(self, conference, django_assert_num_queries):
+        cache.clear()
+        queryset = SponsorshipProfile.objects.filter(conference=conference)
+        mixin = KeysetPaginationMixin()
+        mixin.get_keyset_count(queryset)
+
+        # The version and the count come from the cache; nothing is counted.
+        with django_assert_num_queries(2) as captured:
+            mixin.get_keyset_count(queryset)
+        assert not any("COUNT(" in query["sql"] for query in captured)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "ordering",
+    [
+        ["organization_name", "pk"],
+        ["-organization_name", "pk"],
+        ["po_number", "pk"],
+        ["-po_number", "-pk"],
+    ],
+)
+def test_seek_filter_walks_every_row_once(conference, ordering):
+    """Seeking row by row visits the same rows, in the same order, as order_by()."""
+    for name, po_number in [
+        ("Acme", "1"),
+        ("Acme", None),
+        ("Bolt", None),
+        ("Bolt", "2"),
+        ("Cog", "1"),
+    ]:
+        SponsorshipProfile.objects.create(
+            conference=conference, organization_name=name, po_number=po_number
+        )
+    queryset = SponsorshipProfile.objects.order_by(*ordering)
+    expected = list(queryset.values_list("pk", flat=True))
+
+    walked = []
+    rows = queryset
+    while row := rows.first():
+        walked.append(row.pk)
+        values = [getattr(row, term.lstrip("-")) for term in ordering]
+        rows = queryset.filter(seek_filter(ordering, values))
+
+    assert walked == expected
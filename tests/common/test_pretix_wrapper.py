@@ -1,4 +1,9 @@
-from unittest.mock import Mock, patch
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
@@ -6,9 +11,71 @@ from django.test import TestCase, override_settings
 
 from attendee.models import (
     PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER,
+    PRETIX_HASHED_ORDER_FIELDS,
+    PRETIX_HASHED_POSITION_FIELDS,
     PRETIX_NOT_ANONYMOUS_ANSWER_IDENTIFIER,
 )
-from common.pretix_wrapper import PretixWrapper
+from common.pretix_wrapper import (
+    PRETIX_ORDER_FIELDS,
+    PRETIX_POSITION_FIELDS,
+    PRETIX_RETRY,
+    PRETIX_STREAM_CHUNK_SIZE,
+    PRETIX_TIMEOUT,
+    PretixWrapper,
+    compact_order,
+    get_session,
+    get_wrapper,
+)
+
+
+def listing_response(results, next_url=None):
+    """A streamed response with a page of the pretix order list."""
+    body = json.dumps(
+        {"count": len(results), "next": next_url, "previous": None, "results": results}
+    ).encode()
+    response = MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    # Small chunks, so orders are split across them.
+    chunks = []
+    for start in range(0, len(body), 100):
+        end = start + 100
+        chunks.append(body[start:end])
+    response.iter_content.return_value = chunks
+    return response
+
+
+@contextmanager
+def pretix_server(responses):
+    """Serve ``(status, headers, body)`` responses in order on localhost.
+
+    Yields the base URL to point the wrapper at and the list of request headers
+    the server received.
+    """
+    requests_seen = []
+    remaining = list(responses)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(dict(self.headers))
+            status, headers, body = remaining.pop(0)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/", requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
 
 
 @override_settings(
@@ -67,21 +134,28 @@ class TestPretixWrapper(TestCase):
         assert self.wrapper.event_slug == "test_event"
         assert self.wrapper.headers == {"Authorization": "Token test_token"}
 
+    def test_api_url_setting(self):
+        """The portal can talk to another Pretix API, such as a local stand-in."""
+        assert self.wrapper.base_url == "https://pretix.eu/api/v1/"
+        with self.settings(PRETIX_API_URL="http://127.0.0.1:8001/api/v1/"):
+            wrapper = PretixWrapper("test_org", "test_event")
+        assert wrapper.base_url == "http://127.0.0.1:8001/api/v1/"
+
     def test_get_order_by_code(self):
         """Test get_order_by_code method."""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
+        with patch("requests.Session.get") as mock_get:
+            mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = self._pretix_order_data
             mock_get.return_value = mock_response
             order_result = self.wrapper.get_order_by_code(self.order_code)
 
-            assert order_result == self._pretix_order_data
+            assert order_result == compact_order(self._pretix_order_data)
 
     def test_get_order_by_code_error_handling(self):
         """Test get_order_by_code method error handling."""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
+        with patch("requests.Session.get") as mock_get:
+            mock_response = MagicMock()
             mock_response.status_code = 500
             mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
                 "404 Not Found"
@@ -91,19 +165,185 @@ class TestPretixWrapper(TestCase):
                 self.wrapper.get_order_by_code(self.order_code)
 
     def test_get_orders(self):
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {
-                "count": 1,
-                "next": None,
-                "previous": None,
-                "results": [self._pretix_order_data],
-            }
+        with patch("requests.Session.get") as mock_get:
+            mock_response = listing_response([self._pretix_order_data])
+            mock_get.return_value = mock_response
+            orders = list(self.wrapper.get_orders())
+
+        assert orders == [compact_order(self._pretix_order_data)]
+        mock_response.iter_content.assert_called_once_with(PRETIX_STREAM_CHUNK_SIZE)
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_response.__exit__.assert_called_once()
+
+    def test_get_orders_keeps_only_the_fields_we_use(self):
+        full = dict(
+            self._pretix_order_data,
+            invoice_address={"name": "Example Attendee", "street": "Main St"},
+            payments=[{"amount": "30.00"}],
+            positions=[
+                dict(
+                    self._pretix_order_data["positions"][0],
+                    secret="s3cr3t",
+                    pdf_data={"big": "x" * 1000},
+                )
+            ],
+        )
+        with patch("requests.Session.get", return_value=listing_response([full])):
+            (order,) = self.wrapper.get_orders()
+
+        expected = dict(self._pretix_order_data)
+        del expected["testmode"]
+        assert order == expected
+
+    def test_compact_orders_hash_the_same(self):
+        """Everything an order's content hash covers is kept."""
+        assert set(PRETIX_HASHED_ORDER_FIELDS) <= set(PRETIX_ORDER_FIELDS) | {
+            "positions"
+        }
+        assert set(PRETIX_HASHED_POSITION_FIELDS) <= set(PRETIX_POSITION_FIELDS)
+
+    def test_get_orders_follows_pages(self):
+        with patch("requests.Session.get") as mock_get:
+            mock_get.side_effect = [
+                listing_response(
+                    [self._pretix_order_data], "https://pretix.example/orders/?page=2"
+                ),
+                listing_response([dict(self._pretix_order_data, code="ORDER456")]),
+            ]
+            codes = [order["code"] for order in self.wrapper.get_orders()]
+
+        assert codes == ["ORDER123", "ORDER456"]
+        assert mock_get.call_args_list[0].kwargs["params"] == {
+            "ordering": "last_modified"
+        }
+        assert mock_get.call_args_list[1].args == (
+            "https://pretix.example/orders/?page=2",
+        )
+        for call in mock_get.call_args_list:
+            assert call.kwargs["timeout"] == PRETIX_TIMEOUT
+            assert call.kwargs["headers"] == {"Authorization": "Token test_token"}
+
+    def test_get_order_pages(self):
+        with patch("requests.Session.get") as mock_get:
+            mock_get.side_effect = [
+                listing_response(
+                    [
+                        self._pretix_order_data,
+                        dict(self._pretix_order_data, code="TEST1", testmode=True),
+                        dict(self._pretix_order_data, code="PENDING1", status="n"),
+                    ],
+                    "https://pretix.example/orders/?page=2",
+                ),
+                listing_response(
+                    [dict(self._pretix_order_data, code="TEST2", testmode=True)]
+                ),
+            ]
+            pages = [
+                [order["code"] for order in page]
+                for page in self.wrapper.get_order_pages()
+            ]
+
+        assert pages == [["ORDER123"], []]
+
+    def test_get_order_pages_from_a_server(self):
+        """Pages are streamed from a real HTTP response."""
+        body = json.dumps(
+            {"next": None, "results": [self._pretix_order_data] * 3}
+        ).encode()
+        responses = [(200, {"Content-Type": "application/json"}, body)]
+        with pretix_server(responses) as (base_url, requests_seen), patch.object(
+            PretixWrapper, "base_url", base_url
+        ), patch("common.pretix_wrapper.PRETIX_STREAM_CHUNK_SIZE", 64):
+            pages = list(self.wrapper.get_order_pages())
+
+        assert pages == [[compact_order(self._pretix_order_data)] * 3]
+        assert len(requests_seen) == 1
+
+    def test_get_orders_by_code_lists_orders_changed_since(self):
+        since = datetime(2025, 11, 13, 16, 0, tzinfo=timezone.utc)
+        listed = [
+            self._pretix_order_data,
+            dict(self._pretix_order_data, code="ORDER456"),
+            dict(self._pretix_order_data, code="ORDER999"),
+        ]
+        with patch.object(
+            PretixWrapper, "get_orders", return_value=listed
+        ) as get_orders, patch.object(
+            PretixWrapper,
+            "get_order_by_code",
+            return_value=dict(self._pretix_order_data, code="ORDER789"),
+        ) as get_order:
+            orders = self.wrapper.get_orders_by_code(
+                ["ORDER123", "ORDER456", "ORDER789"], since
+            )
+
+        get_orders.assert_called_once_with(modified_since=since)
+        get_order.assert_called_once_with("ORDER789")
+        assert sorted(order["code"] for order in orders) == [
+            "ORDER123",
+            "ORDER456",
+            "ORDER789",
+        ]
+
+    def test_get_orders_by_code_fetches_a_single_order(self):
+        since = datetime(2025, 11, 13, 16, 0, tzinfo=timezone.utc)
+        with patch.object(PretixWrapper, "get_orders") as get_orders, patch.object(
+            PretixWrapper, "get_order_by_code", return_value=self._pretix_order_data
+        ):
+            orders = self.wrapper.get_orders_by_code(["ORDER123"], since)
+
+        get_orders.assert_not_called()
+        assert orders == [self._pretix_order_data]
+
+    def test_get_orders_modified_since(self):
+        with patch("requests.Session.get") as mock_get:
+            mock_get.return_value = listing_response([])
+            since = datetime(2025, 11, 13, 16, 0, tzinfo=timezone.utc)
+            assert list(self.wrapper.get_orders(modified_since=since)) == []
+
+        assert mock_get.call_args.kwargs["params"] == {
+            "ordering": "last_modified",
+            "modified_since": "2025-11-13T16:00:00+00:00",
+        }
+
+    def test_get_orders_raises_on_error_page(self):
+        with patch("requests.Session.get") as mock_get:
+            mock_response = MagicMock(status_code=401)
+            mock_response.__enter__.return_value = mock_response
             mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
-                "404 Not Found"
+                "401 Unauthorized"
             )
             mock_get.return_value = mock_response
-            orders = self.wrapper.get_orders()
-            for order in orders:
-                assert order == self._pretix_order_data
+            with self.assertRaises(requests.exceptions.HTTPError):
+                list(self.wrapper.get_orders())
+
+    def test_get_wrapper_is_shared(self):
+        wrapper = get_wrapper("2025")
+        assert wrapper is get_wrapper("2025")
+        assert wrapper.org == "pyladiescon"
+        assert wrapper.event_slug == "2025"
+        assert get_wrapper("plc26").event_slug == "plc26"
+
+    def test_wrappers_share_one_session(self):
+        other = PretixWrapper("other_org", "other_event")
+        assert other.session is self.wrapper.session is get_session()
+        adapter = get_session().get_adapter("https://pretix.eu/api/v1/")
+        assert adapter.max_retries is PRETIX_RETRY
+
+    def test_retries_server_errors_honouring_retry_after(self):
+        """A 503 with ``Retry-After`` is retried after the given delay."""
+        responses = [
+            (503, {"Retry-After": "1"}, b"busy"),
+            (429, {"Retry-After": "0"}, b"slow down"),
+            (200, {"Content-Type": "application/json"}, b'{"code": "ORDER123"}'),
+        ]
+        with pretix_server(responses) as (base_url, requests_seen):
+            with patch.object(PretixWrapper, "base_url", base_url), patch(
+                "urllib3.util.retry.time.sleep"
+            ) as sleep:
+                order = self.wrapper.get_order_by_code(self.order_code)
+
+        assert order == {"code": "ORDER123"}
+        assert len(requests_seen) == 3
+        assert requests_seen[0]["Authorization"] == "Token test_token"
+        sleep.assert_any_call(1)
@@ -0,0 +1,74 @@
+import pytest
+
+from common.search import build_search_query, search_documents, search_words
+from sponsorship.models import SponsorshipProfile
+
+
+def test_search_words_drops_punctuation():
+    assert search_words("Jane.Doe_42 @PyLadies!") == ["jane", "doe", "42", "pyladies"]
+    assert search_words(None) == []
+
+
+def test_build_search_query_without_words():
+    assert build_search_query("  ...  ") is None
+
+
+@pytest.mark.django_db
+class TestSearchDocuments:
+    def test_matches_prefixes_and_ranks_by_weight(self, conference):
+        by_po = SponsorshipProfile.objects.create(
+            organization_name="Other Corp", po_number="ACME-1", conference=conference
+        )
+        by_name = SponsorshipProfile.objects.create(
+            organization_name="Acme Inc", conference=conference
+        )
+        SponsorshipProfile.objects.create(
+            organization_name="Unrelated", conference=conference
+        )
+
+        results = list(search_documents(SponsorshipProfile.objects.all(), "acm"))
+
+        # The organization name outranks the PO number.
+        assert results == [by_name, by_po]
+        assert results[0].search_rank > results[1].search_rank
+
+    def test_every_word_must_match(self, conference):
+        SponsorshipProfile.objects.create(
+            organization_name="Acme Inc",
+            sponsor_contact_name="Jane Doe",
+            conference=conference,
+        )
+
+        queryset = SponsorshipProfile.objects.all()
+        assert search_documents(queryset, "acme jan").count() == 1
+        assert search_documents(queryset, "acme bob").count() == 0
+
+    def test_empty_value_returns_queryset_unchanged(self, conference):
+        queryset = SponsorshipProfile.objects.all()
+        assert search_documents(queryset, "") is queryset
+
+    def test_document_follows_updates(self, conference):
+        profile = SponsorshipProfile.objects.create(
+            organization_name="Acme Inc", conference=conference
+        )
+        profile.organization_name = "Globex"
+        profile.save()
+
+        queryset = SponsorshipProfile.objects.all()
+        assert search_documents(queryset, "acme").count() == 0
+        assert search_documents(queryset, "globex").count() == 1
+
+        # The document is a generated column, so even update() keeps it current.
+        queryset.update(organization_name="Initech")
+        assert search_documents(queryset, "initech").count() == 1
+
+    def test_matches_words_inside_emails_and_handles(self, conference):
+        profile = SponsorshipProfile.objects.create(
+            organization_name="Acme Inc",
+            sponsors_contact_email="jane.doe@example.org",
+            conference=conference,
+        )
+
+        queryset = SponsorshipProfile.objects.all()
+        assert list(search_documents(queryset, "example")) == [profile]
+        assert list(search_documents(queryset, "jane.doe")) == [profile]
@@ -2,7 +2,7 @@ import logging
 
 from kombu.exceptions import OperationalError
 
-from common.tasks import enqueue
+from common.tasks import enqueue, enqueue_later
 
 
 class _RecordingTask:
@@ -14,6 +14,9 @@ class _RecordingTask:
     def delay(self, *args, **kwargs):
         self.calls.append((args, kwargs))
 
+    def apply_async(self, args, kwargs, countdown=None):
+        self.calls.append((args, kwargs, countdown))
+
 
 class _FailingTask:
     name = "failing.task"
@@ -21,6 +24,9 @@ class _FailingTask:
     def delay(self, *args, **kwargs):
         raise OperationalError("broker unavailable")
 
+    def apply_async(self, *args, **kwargs):
+        raise OperationalError("broker unavailable")
+
 
 def test_enqueue_calls_delay():
     task = _RecordingTask()
@@ -32,3 +38,15 @@ def test_enqueue_swallows_broker_error(caplog):
     with caplog.at_level(logging.ERROR):
         enqueue(_FailingTask())  # must not raise
     assert "Failed to enqueue" in caplog.text
+
+
+def test_enqueue_later_calls_apply_async():
+    task = _RecordingTask()
+    enqueue_later(task, 5, 1, x=3)
+    assert task.calls == [((1,), {"x": 3}, 5)]
+
+
+def test_enqueue_later_swallows_broker_error(caplog):
+    with caplog.at_level(logging.ERROR):
+        enqueue_later(_FailingTask(), 5)  # must not raise
+    assert "Failed to enqueue" in caplog.text
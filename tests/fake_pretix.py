@@ -0,0 +1,272 @@
+"""A stand-in for the Pretix REST API, for tests, benchmarks and local runs.
+
+``FakePretix`` is a WSGI app serving the order list and single order lookups
+of one event, with orders generated from their position in the event, so even
+an event of 100k orders costs no memory until its pages are asked for. It can
+be made slow (``latency``) or flaky (``error_rate``), and hands out the webhook
+notifications Pretix would have sent for its orders (``notifications()``).
+
+In tests, use the ``fake_pretix`` fixture. To point a local portal at it::
+
+    python -m tests.fake_pretix --orders 10000 --port 8001
+    PRETIX_API_URL=http://127.0.0.1:8001/api/v1/ PRETIX_API_TOKEN=test_token \\
+        python manage.py fetch_pretix_orders
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+# Order n was last modified this many seconds after FAKE_PRETIX_START.
+FAKE_PRETIX_START = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+class FakePretix:
+    """The Pretix API of ``org``'s ``event``, with ``orders`` generated orders.
+
+    One order in 20 is cancelled, one in 50 pending and one in 100 a test
+    mode order; the rest are paid. Every order has the bulk of a real one
+    (invoice address, payments, check-ins, ...), so the fake costs as much to
+    read as Pretix does.
+    """
+
+    def __init__(
+        self,
+        orders=1000,
+        event="2025",
+        org="pyladiescon",
+        token="test_token",
+        page_size=50,
+        latency=0.0,
+        error_rate=0.0,
+        seed=0,
+    ):
+        self.orders = orders
+        self.event = event
+        self.org = org
+        self.token = token
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return f"/api/v1/organizers/{self.org}/events/{self.event}/orders/"
+
+    def code(self, index):
+        return f"F{index:07d}"
+
+    def order(self, index):
+        """Return the order at ``index``, as Pretix would."""
+        # Imported here so ``python -m tests.fake_pretix`` can set Django up first.
+        from attendee.models import (
+            PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER,
+            PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
+            PRETIX_ATTENDEE_HEARD_ABOUT_EVENT_QUESTION_IDENTIFIER,
+            PRETIX_NOT_ANONYMOUS_ANSWER_IDENTIFIER,
+            PRETIX_STAY_ANONYMOUS_ANSWER_IDENTIFIER,
+        )
+
+        code = self.code(index)
+        status = "p"
+        if index % 20 == 19:
+            status = "c"
+        elif index % 50 == 7:
+            status = "n"
+        modified = (FAKE_PRETIX_START + timedelta(seconds=index)).isoformat()
+        anonymous = (
+            PRETIX_STAY_ANONYMOUS_ANSWER_IDENTIFIER
+            if index % 3 == 0
+            else PRETIX_NOT_ANONYMOUS_ANSWER_IDENTIFIER
+        )
+        return {
+            "code": code,
+            "event": self.event,
+            "status": status,
+            "testmode": index % 100 == 3,
+            "secret": f"secret{index}",
+            "email": f"attendee{index}@example.com",
+            "locale": "en",
+            "datetime": modified,
+            "last_modified": modified,
+            "cancellation_date": modified if status == "c" else None,
+            "total": "30.00",
+            "url": f"https://pretix.eu/{self.org}/{self.event}/order/{code}/",
+            "invoice_address": {
+                "name": f"Attendee {index}",
+                "street": f"{index} Main Street",
+                "zipcode": "12345",
+                "city": "Vancouver",
+                "country": "CA",
+            },
+            "payments": [{"local_id": 1, "state": "confirmed", "amount": "30.00"}],
+            "fees": [],
+            "downloads": [{"output": "pdf", "url": f"https://pretix.eu/{code}.pdf"}],
+            "positions": [
+                {
+                    "id": index,
+                    "order": code,
+                    "item": 1,
+                    "price": "30.00",
+                    "attendee_name": f"Attendee {index}",
+                    "secret": f"position-secret-{index}",
+                    "checkins": [],
+                    "pdf_data": {"event": self.event, "seat": None},
+                    "answers": [
+                        {
+                            "question_identifier": PRETIX_ATTENDEE_CITY_QUESTION_IDENTIFIER,
+                            "answer": "Vancouver",
+                            "option_identifiers": [],
+                        },
+                        {
+                            "question_identifier": PRETIX_ATTENDEE_HEARD_ABOUT_EVENT_QUESTION_IDENTIFIER,
+                            "answer": "Social Media, Other",
+                            "option_identifiers": [],
+                        },
+                        {
+                            "question_identifier": PRETIX_ANONYMOUS_DONATION_QUESTION_IDENTIFIER,
+                            "answer": "",
+                            "option_identifiers": [anonymous],
+                        },
+                    ],
+                }
+            ],
+        }
+
+    def notifications(self, action="pretix.event.order.paid"):
+        """Yield the webhook notification Pretix sends about each paid order."""
+        for index in range(self.orders):
+            order = self.order(index)
+            if order["status"] == "p" and not order["testmode"]:
+                yield {
+                    "notification_id": index + 1,
+                    "organizer": self.org,
+                    "event": self.event,
+                    "code": order["code"],
+                    "action": action,
+                }
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.requests += 1
+            failing = self.error_rate and self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if environ.get("HTTP_AUTHORIZATION") != f"Token {self.token}":
+            return self._respond(start_response, 401, {"detail": "Invalid token."})
+        if failing:
+            return self._respond(
+                start_response, 503, {"detail": "Unavailable"}, [("Retry-After", "0")]
+            )
+
+        path = environ["PATH_INFO"]
+        if path == self.path:
+            query = parse_qs(environ.get("QUERY_STRING", ""))
+            base_url = f"http://{environ['HTTP_HOST']}{path}"
+            return self._respond(start_response, 200, self._listing(query, base_url))
+        if path.startswith(self.path) and path.endswith("/"):
+            index = path.removeprefix(self.path).rstrip("/")[1:]
+            if index.isdigit() and int(index) < self.orders:
+                return self._respond(start_response, 200, self.order(int(index)))
+        return self._respond(start_response, 404, {"detail": "Not found."})
+
+    def _listing(self, query, base_url):
+        first = 0
+        if "modified_since" in query:
+            since = datetime.fromisoformat(query["modified_since"][0])
+            seconds = (since - FAKE_PRETIX_START).total_seconds()
+            first = min(max(math.ceil(seconds), 0), self.orders)
+        page = int(query.get("page", ["1"])[0])
+        start = first + (page - 1) * self.page_size
+        end = min(start + self.page_size, self.orders)
+        next_url = None
+        if end < self.orders:
+            params = {key: values[0] for key, values in query.items()}
+            next_url = f"{base_url}?{urlencode(dict(params, page=page + 1))}"
+        return {
+            "count": self.orders - first,
+            "next": next_url,
+            "previous": None,
+            "results": [self.order(index) for index in range(start, end)],
+        }
+
+    def _respond(self, start_response, status, data, headers=()):
+        reasons = {200: "OK", 401: "Unauthorized", 404: "Not Found", 503: "Unavailable"}
+        body = json.dumps(data).encode()
+        start_response(
+            f"{status} {reasons[status]}",
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(body))),
+                *headers,
+            ],
+        )
+        return [body]
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve(app, port=0):
+    """Serve ``app`` on localhost, and yield the base URL of its Pretix API."""
+    server = make_server(
+        "127.0.0.1",
+        port,
+        app,
+        server_class=_ThreadingWSGIServer,
+        handler_class=_QuietHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/api/v1/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--event", default="2025")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "portal.settings")
+    import django
+
+    django.setup()
+    pretix = FakePretix(
+        orders=args.orders,
+        event=args.event,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    with serve(pretix, args.port) as url:
+        print(f"Serving {args.orders} orders of event {args.event!r} at {url}")
+        threading.Event().wait()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -11,6 +11,7 @@ from portal.common import (
     get_sponsorship_paid_percent_cache,
     get_sponsorship_pending_amount_stats_cache,
     get_sponsorship_pending_count_stats_cache,
+    get_sponsorship_pipeline_summary,
     get_sponsorship_to_goal_percent_cache,
     get_sponsorship_total_count_stats_cache,
     get_stats_cached_values,
@@ -321,6 +322,66 @@ class TestGetStatsCachedValues:
         assert result == 20
 
 
+@pytest.mark.django_db
+class TestSponsorshipPipelineSummary:
+
+    def _profile(self, conference, status, tier=None, override=None):
+        return SponsorshipProfile.objects.create(
+            organization_name="Org",
+            sponsorship_tier=tier,
+            sponsorship_override_amount=override,
+            progress_status=status,
+            conference=conference,
+        )
+
+    def test_counts_and_amounts_per_status(self, conference):
+        tier = SponsorshipTier.objects.create(
+            name="Gold", amount=1000, description="g", conference=conference
+        )
+        self._profile(conference, SponsorshipProgressStatus.INVOICED, tier=tier)
+        self._profile(
+            conference, SponsorshipProgressStatus.INVOICED, tier=tier, override=250
+        )
+        self._profile(conference, SponsorshipProgressStatus.PAID, override=500)
+        self._profile(conference, SponsorshipProgressStatus.ACCEPTED)
+        other = Conference.objects.create(year=2024, name="PLC 2024", slug="2024")
+        self._profile(other, SponsorshipProgressStatus.PAID, override=100)
+
+        summary = get_sponsorship_pipeline_summary(conference)
+
+        assert set(summary) == set(SponsorshipProgressStatus.values)
+        assert summary[SponsorshipProgressStatus.INVOICED] == {
+            "count": 2,
+            "amount": 1250,
+        }
+        assert summary[SponsorshipProgressStatus.PAID] == {"count": 1, "amount": 500}
+        assert summary[SponsorshipProgressStatus.ACCEPTED] == {
+            "count": 1,
+            "amount": 0,
+        }
+        assert summary[SponsorshipProgressStatus.APPROVED] == {
+            "count": 0,
+            "amount": 0,
+        }
+
+    def test_cached_and_refreshed_on_save(self, conference, django_assert_num_queries):
+        profile = self._profile(conference, SponsorshipProgressStatus.AGREEMENT_SENT)
+        get_sponsorship_pipeline_summary(conference)
+        with django_assert_num_queries(1):
+            summary = get_sponsorship_pipeline_summary(conference)
+        assert summary[SponsorshipProgressStatus.AGREEMENT_SENT]["count"] == 1
+
+        profile.progress_status = SponsorshipProgressStatus.AGREEMENT_SIGNED
+        profile.save()
+        summary = get_sponsorship_pipeline_summary(conference)
+        assert summary[SponsorshipProgressStatus.AGREEMENT_SENT]["count"] == 0
+        assert summary[SponsorshipProgressStatus.AGREEMENT_SIGNED]["count"] == 1
+
+        profile.delete()
+        summary = get_sponsorship_pipeline_summary(conference)
+        assert summary[SponsorshipProgressStatus.AGREEMENT_SIGNED]["count"] == 0
+
+
 @pytest.mark.django_db
 class TestAttendeeStats:
     """Test attendee statistics functions."""
@@ -1,3 +1,4 @@
+import time
 from datetime import date, timedelta
 
 import pytest
@@ -105,6 +106,75 @@ class TestConferenceModel:
         assert years == [2026, 2025, 2024]
 
 
+@pytest.mark.django_db
+class TestPretixEventSlugs:
+    def test_configured_slugs(self):
+        Conference.objects.create(year=2024, name="PLC 2024", slug="2024")
+        Conference.objects.create(
+            year=2025, name="PLC 2025", slug="2025", pretix_event_slug="2025"
+        )
+        assert Conference.pretix_event_slugs() == {"2025"}
+
+    def test_cached_until_a_conference_changes(self, django_assert_num_queries):
+        conference = Conference.objects.create(
+            year=2025, name="PLC 2025", slug="2025", pretix_event_slug="2025"
+        )
+        Conference.pretix_event_slugs()
+        with django_assert_num_queries(0):
+            assert Conference.pretix_event_slugs() == {"2025"}
+
+        conference.pretix_event_slug = "plc-2025"
+        conference.save()
+        assert Conference.pretix_event_slugs() == {"plc-2025"}
+        conference.delete()
+        assert Conference.pretix_event_slugs() == set()
+
+    def test_cache_expires(self, monkeypatch):
+        Conference.objects.create(
+            year=2025, name="PLC 2025", slug="2025", pretix_event_slug="2025"
+        )
+        Conference.pretix_event_slugs()
+        # Added by another process, which cannot clear this process' copy.
+        Conference.objects.filter(year=2025).update(pretix_event_slug="plc-2025")
+        assert Conference.pretix_event_slugs() == {"2025"}
+
+        later = time.monotonic() + 61
+        monkeypatch.setattr("portal.models.time.monotonic", lambda: later)
+        assert Conference.pretix_event_slugs() == {"plc-2025"}
+
+
+@pytest.mark.django_db
+class TestForPretixEvent:
+    def test_matches_the_event_slug(self):
+        Conference.objects.create(
+            year=2024, name="PLC 2024", slug="2024", pretix_event_slug="plc"
+        )
+        latest = Conference.objects.create(
+            year=2025, name="PLC 2025", slug="2025", pretix_event_slug="plc"
+        )
+        active = Conference.objects.create(
+            year=2026, name="PLC 2026", slug="2026", is_active=True
+        )
+        assert Conference.for_pretix_event("plc") == latest
+        assert Conference.for_pretix_event("unknown") == active
+
+    def test_none_without_an_active_conference(self):
+        assert Conference.for_pretix_event("unknown") is None
+
+    def test_cached_until_a_conference_changes(self, django_assert_num_queries):
+        conference = Conference.objects.create(
+            year=2025, name="PLC 2025", slug="2025", pretix_event_slug="2025"
+        )
+        Conference.for_pretix_event("2025")
+        with django_assert_num_queries(0):
+            assert Conference.for_pretix_event("2025") == conference
+            assert Conference.for_pretix_event("plc-2025") is None
+
+        conference.pretix_event_slug = "plc-2025"
+        conference.save()
+        assert Conference.for_pretix_event("plc-2025") == conference
+
+
 @pytest.mark.django_db
 class TestActiveConferenceContextProcessor:
     def test_returns_active_conference(self):
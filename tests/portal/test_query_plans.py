@@ -0,0 +1,331 @@
+"""Check that the hot stats and list queries are served by indexes.
+
+A few hundred rows fit in a page or two, where Postgres rightly prefers a
+sequential scan, so these tests first generate a realistic volume of data
+across many editions, refresh the planner statistics, and then ``EXPLAIN
+ANALYZE`` every query the code under test runs. None of them may read one of
+the big tables sequentially, or fetch more rows from it than it keeps.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from attendee.models import PretixOrder
+from portal import common
+from portal.models import BaseModel, Conference
+from sponsorship.models import IndividualDonation, SponsorshipProfile
+from volunteer.models import Team, VolunteerProfile
+
+EDITIONS = 20
+ROWS_PER_EDITION = 500
+BATCH = 50
+
+BIG_TABLES = {
+    model._meta.db_table
+    for model in (
+        BaseModel,
+        User,
+        VolunteerProfile,
+        Team,
+        SponsorshipProfile,
+        IndividualDonation,
+        PretixOrder,
+    )
+} | {VolunteerProfile.teams.through._meta.db_table}
+
+
+def generate_rows(model, count, **columns):
+    """Insert ``count`` rows of a ``BaseModel`` subclass in one statement.
+
+    ``columns`` maps column names to SQL expressions over ``n``, the row
+    number from 1 to ``count``; they are not parameters, so write ``mod()``
+    rather than ``%``. Other columns get NULL or the field default.
+    """
+    names, values, params = ["basemodel_ptr_id"], ["base.id"], []
+    for field in model._meta.local_concrete_fields:
+        if field.column in columns:
+            names.append(field.column)
+            values.append(columns[field.column])
+        elif not (field.primary_key or field.null or field.generated):
+            names.append(field.column)
+            values.append("%s")
+            params.append(field.get_db_prep_save(field.get_default(), connection))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH inserted AS (
+                INSERT INTO {BaseModel._meta.db_table} (creation_date, modified_date)
+                SELECT now(), now() FROM generate_series(1, %s)
+                RETURNING id
+            )
+            INSERT INTO {model._meta.db_table} ({", ".join(names)})
+            SELECT {", ".join(values)}
+            FROM (
+                SELECT id, row_number() OVER (ORDER BY id) AS n FROM inserted
+            ) AS base
+            """,
+            [count, *params],
+        )
+
+
+def generate_users(count):
+    """Insert ``count`` users in one statement and return the first id."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {User._meta.db_table} (
+                password, is_superuser, username, first_name, last_name, email,
+                is_staff, is_active, date_joined
+            )
+            SELECT '', false, 'volunteer' || n, '', '', '', false, true, now()
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+            """,
+            [count],
+        )
+        return min(row[0] for row in cursor.fetchall())
+
+
+def generate_team_members():
+    """Put the n-th volunteer in the n-th team, which is in the same edition."""
+    volunteers, teams = VolunteerProfile._meta.db_table, Team._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {VolunteerProfile.teams.through._meta.db_table}
+                (volunteerprofile_id, team_id)
+            SELECT volunteer.id, team.id
+            FROM (
+                SELECT basemodel_ptr_id AS id,
+                    row_number() OVER (ORDER BY basemodel_ptr_id) AS n
+                FROM {volunteers}
+            ) AS volunteer
+            JOIN (
+                SELECT basemodel_ptr_id AS id,
+                    row_number() OVER (ORDER BY basemodel_ptr_id) AS n
+                FROM {teams}
+            ) AS team USING (n)
+            """
+        )
+
+
+def wasteful_scans(sql):
+    """Return the big tables the plan of ``sql`` reads more of than it needs.
+
+    That is a sequential scan, or a scan that finds rows by conference alone
+    and then throws most of them away, because no index covers the rest of the
+    filter.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+
+    found = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get("Plans", []))
+        if node.get("Relation Name") not in BIG_TABLES:
+            continue
+        removed = node.get("Rows Removed by Filter", 0) + node.get(
+            "Rows Removed by Index Recheck", 0
+        )
+        condition = node.get("Index Cond") or node.get("Recheck Cond") or ""
+        by_conference_only = " AND " not in condition
+        if node["Node Type"] == "Seq Scan" or (
+            by_conference_only and removed > node["Actual Rows"]
+        ):
+            found.add(node["Relation Name"])
+    return found
+
+
+def assert_index_scans(captured):
+    """Fail if any captured ``SELECT`` scans a big table wastefully."""
+    offenders = {
+        query["sql"]: tables
+        for query in captured
+        if query["sql"].startswith("SELECT")
+        and (tables := wasteful_scans(query["sql"]))
+    }
+    assert offenders == {}
+
+
+def delete_rows(conferences, first_base, first_user):
+    """Delete everything ``editions`` created and refresh the statistics."""
+    ids = [edition.pk for edition in conferences]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {VolunteerProfile.teams.through._meta.db_table}
+            WHERE team_id IN (
+                SELECT basemodel_ptr_id FROM {Team._meta.db_table}
+                WHERE conference_id = ANY(%s)
+            )
+            """,
+            [ids],
+        )
+        for model in (
+            VolunteerProfile,
+            Team,
+            SponsorshipProfile,
+            IndividualDonation,
+            PretixOrder,
+        ):
+            cursor.execute(
+                f"DELETE FROM {model._meta.db_table} WHERE conference_id = ANY(%s)",
+                [ids],
+            )
+        cursor.execute(
+            f"DELETE FROM {Conference._meta.db_table} WHERE basemodel_ptr_id = ANY(%s)",
+            [ids],
+        )
+        cursor.execute(
+            f"DELETE FROM {BaseModel._meta.db_table} WHERE id >= %s", [first_base]
+        )
+        cursor.execute(
+            f"DELETE FROM {User._meta.db_table} WHERE id >= %s", [first_user]
+        )
+        # Leave the planner statistics describing the tables other tests see.
+        cursor.execute(f"VACUUM ANALYZE {', '.join(sorted(BIG_TABLES))}")
+
+
+@pytest.fixture(scope="module")
+def editions(django_db_setup, django_db_blocker):
+    """``EDITIONS`` conferences, each with ``ROWS_PER_EDITION`` of everything.
+
+    Built and vacuumed once, outside the per-test transactions: rows every test
+    inserts and rolls back would otherwise bloat the tables and shift the
+    planner's costs from one test to the next.
+    """
+    with django_db_blocker.unblock():
+        first_base = (BaseModel.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        first_user = (User.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        conferences = []
+        try:
+            conferences = [
+                Conference.objects.create(
+                    year=2000 + index, name=f"PLC {index}", slug=index
+                )
+                for index in range(EDITIONS)
+            ]
+            ids = ", ".join(str(edition.pk) for edition in conferences)
+            # Rows arrive in runs of BATCH for one edition at a time, as
+            # sign-ups for different years trickle in side by side.
+            conference_of_n = f"(ARRAY[{ids}])[1 + mod((n - 1) / {BATCH}, {EDITIONS})]"
+            count = EDITIONS * ROWS_PER_EDITION
+
+            first_volunteer = generate_users(count)
+            generate_rows(
+                VolunteerProfile,
+                count,
+                conference_id=conference_of_n,
+                user_id=f"{first_volunteer} + n - 1",
+                application_status="(ARRAY['Pending', 'Approved', 'Rejected'])"
+                "[1 + mod(n, 3)]",
+            )
+            generate_rows(
+                Team,
+                count,
+                conference_id=conference_of_n,
+                short_name="'Team ' || n",
+                description="''",
+                open_to_new_members="mod(n, 4) = 0",
+            )
+            generate_rows(
+                SponsorshipProfile,
+                count,
+                conference_id=conference_of_n,
+                organization_name="'Sponsor ' || n",
+                progress_status="1 + mod(n, 10)",
+                sponsorship_override_amount="CASE WHEN mod(n, 7) = 0 THEN 1000 END",
+            )
+            generate_rows(
+                IndividualDonation,
+                count,
+                conference_id=conference_of_n,
+                transaction_id="'T' || n",
+                donation_amount="mod(n, 100)",
+                donor_email="'donor' || mod(n, 3000) || '@example.com'",
+            )
+            generate_rows(
+                PretixOrder,
+                count,
+                conference_id=conference_of_n,
+                order_code="'ORDER' || n",
+                status="(ARRAY['p', 'c', 'n'])[1 + mod(n, 3)]",
+                total="mod(n, 50)",
+            )
+            generate_team_members()
+            with connection.cursor() as cursor:
+                cursor.execute(f"VACUUM ANALYZE {', '.join(sorted(BIG_TABLES))}")
+            cache.clear()
+            yield conferences
+        finally:
+            delete_rows(conferences, first_base, first_user)
+
+
+@pytest.fixture
+def conference(db, editions):
+    """Make the first generated edition the active one, for the list views."""
+    editions[0].is_active = True
+    editions[0].save()
+    return editions[0]
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    @pytest.mark.parametrize(
+        "stat",
+        [
+            common.get_volunteer_signup_stat_cache,
+            common.get_volunteer_onboarded_stat_cache,
+            common.get_volunteer_teams_stat_cache,
+            common.get_sponsorship_total_count_stats_cache,
+            common.get_sponsorship_paid_count_stats_cache,
+            common.get_sponsorship_pending_count_stats_cache,
+            common.get_sponsorship_committed_count_stats_cache,
+            common.get_sponsorship_paid_amount_stats_cache,
+            common.get_sponsorship_pending_amount_stats_cache,
+            common.get_sponsorship_committed_amount_stats_cache,
+            common.get_total_donations_amount_cache,
+            common.get_donors_count_cache,
+            common.get_attendee_count_cache,
+        ],
+    )
+    def test_stats_use_indexes(self, editions, stat):
+        with CaptureQueriesContext(connection) as captured:
+            stat(editions[0])
+        assert_index_scans(captured)
+
+    def test_wasteful_scans_are_reported(self, editions):
+        with CaptureQueriesContext(connection) as captured:
+            list(Team.objects.filter(conference=editions[0], description="x"))
+        assert {"volunteer_team"} in [
+            wasteful_scans(query["sql"]) for query in captured
+        ]
+
+    def test_open_teams_use_index(self, editions):
+        with CaptureQueriesContext(connection) as captured:
+            list(Team.objects.filter(open_to_new_members=True, conference=editions[0]))
+        assert_index_scans(captured)
+
+    @pytest.mark.parametrize(
+        "url_name,params",
+        [
+            ("volunteer:volunteer_profile_list", {}),
+            ("volunteer:volunteer_profile_list", {"application_status": "Approved"}),
+            ("sponsorship:sponsorship_list", {}),
+            ("sponsorship:sponsorship_list", {"progress_status": "9"}),
+        ],
+    )
+    def test_list_pages_use_indexes(self, client, admin_user, url_name, params):
+        client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(reverse(url_name), params)
+        assert response.status_code == 200
+        assert_index_scans(captured)
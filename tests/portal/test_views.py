@@ -1,8 +1,18 @@
+from datetime import timedelta
+from unittest.mock import ANY, patch
+
 import pytest
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils.timezone import now
 from pytest_django.asserts import assertRedirects
 
+from attendee.models import (
+    PretixSyncCheckpoint,
+    PretixSyncRun,
+    PretixSyncSource,
+    PretixSyncStatus,
+)
 from portal.common import get_alltime_landing_stats
 from portal.models import Conference
 from portal_account.models import PortalProfile
@@ -526,6 +536,124 @@ class TestOrganizerDashboard:
         assert pct == int(pct)  # rounded, not a long decimal
         assert response.context["sponsorship_bar_width"] == 100  # bar capped
 
+    def test_shows_pretix_sync_progress(self, client, admin_user, conference):
+        client.force_login(admin_user)
+        response = client.get(reverse("organizer_dashboard"))
+        assert "No Pretix sync has run from the portal yet." in (
+            response.content.decode()
+        )
+
+        PretixSyncCheckpoint.objects.create(
+            conference=conference,
+            status=PretixSyncStatus.FAILED,
+            pages_synced=3,
+            orders_synced=142,
+            error="ConnectionError('Pretix is down')",
+        )
+        response = client.get(reverse("organizer_dashboard"))
+        content = response.content.decode()
+        assert "Failed" in content
+        assert "142" in content
+        assert "Pretix is down" in content
+
+
+@pytest.mark.django_db
+class TestPretixSyncView:
+    def test_requires_admin(self, client, portal_user):
+        client.force_login(portal_user)
+        with patch("portal.views.enqueue") as enqueue:
+            response = client.post(reverse("pretix_sync"))
+        assert response.status_code in (302, 403)
+        enqueue.assert_not_called()
+
+    def test_starts_a_sync(self, client, admin_user):
+        client.force_login(admin_user)
+        with patch("portal.views.enqueue") as enqueue:
+            response = client.post(reverse("pretix_sync"), follow=True)
+
+        assertRedirects(response, reverse("organizer_dashboard"))
+        enqueue.assert_called_once()
+        assert "Pretix sync started." in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestPretixSyncRunsView:
+    def make_run(self, source, seconds, **fields):
+        started_at = now() - timedelta(hours=1)
+        return PretixSyncRun.objects.create(
+            event_slug="2025",
+            source=source,
+            started_at=started_at,
+            finished_at=started_at + timedelta(seconds=seconds),
+            **fields,
+        )
+
+    def test_requires_admin(self, client, portal_user):
+        client.force_login(portal_user)
+        response = client.get(reverse("pretix_sync_runs"))
+        assert response.status_code in (302, 403)
+
+    def test_charts_the_runs(self, client, admin_user):
+        self.make_run(
+            PretixSyncSource.COMMAND,
+            20,
+            pages_fetched=4,
+            http_seconds=12.5,
+            orders_inserted=150,
+            orders_updated=50,
+        )
+        self.make_run(
+            PretixSyncSource.WEBHOOK,
+            2,
+            orders_updated=1,
+            error="ConnectionError('Pretix is down')",
+        )
+        PretixSyncRun.objects.create(
+            event_slug="2025", source=PretixSyncSource.BACKGROUND
+        )
+        client.force_login(admin_user)
+
+        response = client.get(reverse("pretix_sync_runs"))
+
+        assert response.status_code == 200
+        # Oldest first, and only finished runs.
+        assert response.context["chart_data"] == [
+            {
+                "started_at": ANY,
+                "seconds": 20.0,
+                "http_seconds": 12.5,
+                "orders_per_second": 10.0,
+            },
+            {
+                "started_at": ANY,
+                "seconds": 2.0,
+                "http_seconds": 0.0,
+                "orders_per_second": 0.5,
+            },
+        ]
+        assert len(response.context["runs"]) == 3
+        content = response.content.decode()
+        assert "Pretix is down" in content
+        assert "running" in content
+
+    def test_filters_by_source(self, client, admin_user):
+        self.make_run(PretixSyncSource.COMMAND, 20)
+        self.make_run(PretixSyncSource.WEBHOOK, 2)
+        client.force_login(admin_user)
+
+        response = client.get(reverse("pretix_sync_runs"), {"source": "webhook"})
+        assert response.context["source"] == "webhook"
+        assert [run.source for run in response.context["runs"]] == ["webhook"]
+
+        response = client.get(reverse("pretix_sync_runs"), {"source": "nonsense"})
+        assert response.context["source"] == ""
+        assert len(response.context["runs"]) == 2
+
+    def test_no_runs(self, client, admin_user):
+        client.force_login(admin_user)
+        response = client.get(reverse("pretix_sync_runs"))
+        assert "No Pretix sync has been recorded yet." in response.content.decode()
+
 
 @pytest.mark.django_db
 class TestConferenceBanner:
@@ -0,0 +1,229 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook
+
+from portal.common import get_donors_count_cache, get_total_donations_amount_cache
+from portal.models import Conference
+from sponsorship.donations import import_donations, read_donation_rows
+from sponsorship.models import IndividualDonation
+
+HEADER = "Transaction ID,Total Amount,Email,Date Received,Display Name,Anonymous"
+
+
+def export(*rows, header=HEADER):
+    """A CiviCRM CSV export of ``rows``, as uploaded."""
+    return BytesIO(("\ufeff" + "\n".join([header, *rows]) + "\n").encode())
+
+
+def read(*rows, header=HEADER):
+    return list(read_donation_rows(export(*rows, header=header), "export.csv"))
+
+
+class TestReadDonationRows:
+    def test_csv(self):
+        rows = read(
+            'T1,"$ 1,250.00",ada@example.com,2025-10-01 14:33:00,Ada,Yes',
+            ",,,,,",
+            "T2,25",
+        )
+
+        assert rows == [
+            {
+                "transaction_id": "T1",
+                "donation_amount": "$ 1,250.00",
+                "donor_email": "ada@example.com",
+                "transaction_date": "2025-10-01 14:33:00",
+                "donor_name": "Ada",
+                "is_anonymous": "Yes",
+            },
+            {
+                "transaction_id": "T2",
+                "donation_amount": "25",
+                "donor_email": None,
+                "transaction_date": None,
+                "donor_name": None,
+                "is_anonymous": None,
+            },
+        ]
+
+    def test_column_names(self):
+        rows = read("T1,10,ada@example.com", header="trxn_id, AMOUNT ,Email Address")
+        assert rows == [
+            {
+                "transaction_id": "T1",
+                "donation_amount": "10",
+                "donor_email": "ada@example.com",
+            }
+        ]
+
+    def test_xlsx(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(HEADER.split(","))
+        sheet.append(["T1", 25.5, "ada@example.com", datetime(2025, 10, 1), None, 1])
+        sheet.append([None] * 6)
+        file = BytesIO()
+        workbook.save(file)
+        file.seek(0)
+
+        rows = list(read_donation_rows(file, "Contributions.XLSX"))
+
+        assert rows == [
+            {
+                "transaction_id": "T1",
+                "donation_amount": 25.5,
+                "donor_email": "ada@example.com",
+                "transaction_date": datetime(2025, 10, 1),
+                "donor_name": None,
+                "is_anonymous": 1,
+            }
+        ]
+
+    def test_missing_columns(self):
+        with pytest.raises(ValueError, match="no Total Amount, Email column"):
+            read("T1", header="Transaction ID,Date Received")
+        with pytest.raises(ValueError, match="no Transaction Id"):
+            read(header="")
+
+
+@pytest.mark.django_db
+class TestImportDonations:
+    def test_imports_donations(self, conference):
+        result = import_donations(
+            read(
+                'T1,"$ 1,250.00",ada@example.com,2025-10-01 14:33:00,Ada,Yes',
+                "T2,25,grace@example.com,2025-10-02,,",
+            )
+        )
+
+        assert str(result) == (
+            "Imported 2 donations (2 new, 0 updated), "
+            "skipped 0 repeated transactions and 0 invalid rows"
+        )
+        first, second = IndividualDonation.objects.order_by("transaction_id")
+        assert first.conference == conference
+        assert first.donation_amount == Decimal("1250.00")
+        assert first.donor_email == "ada@example.com"
+        assert first.transaction_date == datetime(
+            2025, 10, 1, 14, 33, tzinfo=timezone.utc
+        )
+        assert first.donor_name == "Ada"
+        assert first.is_anonymous is True
+        assert second.donor_name is None
+        assert second.is_anonymous is False
+
+    def test_resolves_the_conference_by_date(self, conference):
+        conference.start_date = date(2024, 12, 1)
+        conference.end_date = date(2025, 11, 30)
+        conference.save()
+        previous = Conference.objects.create(year=2024, name="2024", slug="2024")
+
+        result = import_donations(
+            read(
+                "T1,10,a@example.com,2024-12-15",
+                "T2,10,b@example.com,2024-06-01",
+                "T3,10,c@example.com,2023-06-01",
+            )
+        )
+
+        donations = IndividualDonation.objects.order_by("transaction_id")
+        assert [donation.conference for donation in donations] == [
+            conference,
+            previous,
+        ]
+        assert result.errors == [(4, "No conference for 2023-06-01")]
+        assert result.conferences == {conference, previous}
+
+    def test_given_conference(self, conference):
+        previous = Conference.objects.create(year=2024, name="2024", slug="2024")
+
+        import_donations(
+            read("T1,10,a@example.com,2025-10-01", "T2,10,b@example.com,"),
+            conference=previous,
+        )
+
+        assert IndividualDonation.objects.filter(conference=previous).count() == 2
+
+    def test_updates_and_deduplicates(self, conference):
+        stored = IndividualDonation.objects.create(
+            conference=conference,
+            transaction_id="T1",
+            donation_amount=10,
+            donor_email="ada@example.com",
+        )
+
+        result = import_donations(
+            read(
+                "T1,15,ada@example.com,2025-10-01",
+                "T2,20,grace@example.com,2025-10-01",
+                "T2,25,grace@example.com,2025-10-01",
+            )
+        )
+
+        assert (result.created, result.updated, result.duplicates) == (1, 1, 1)
+        stored.refresh_from_db()
+        assert stored.donation_amount == 15
+        # The last row of a repeated transaction wins.
+        assert IndividualDonation.objects.get(transaction_id="T2").donation_amount == 25
+        assert IndividualDonation.objects.count() == 2
+
+    def test_reports_invalid_rows(self, conference):
+        result = import_donations(
+            read(
+                "T1,10,not-an-email,2025-10-01",
+                ",ten,a@example.com,2025-10-01",
+                "T3,10,c@example.com,",
+                "T4,10,d@example.com,2025-10-01",
+            )
+        )
+
+        assert result.errors == [
+            (2, "donor_email: Enter a valid email address."),
+            (3, "transaction_id: This field is required."),
+            (3, "donation_amount: This field is required."),
+            (4, "transaction_date: needed to find the conference"),
+        ]
+        assert list(
+            IndividualDonation.objects.values_list("transaction_id", flat=True)
+        ) == ["T4"]
+
+    def test_upserts_in_batches(self, conference):
+        rows = [f"T{index},10,{index}@example.com,2025-10-01" for index in range(6)]
+        # Repeated in a later batch than its first copy.
+        rows.append("T0,30,0@example.com,2025-10-01")
+
+        with patch("sponsorship.donations.BATCH_SIZE", 2):
+            result = import_donations(read(*rows))
+
+        assert (result.created, result.updated, result.duplicates) == (6, 0, 1)
+        assert IndividualDonation.objects.get(transaction_id="T0").donation_amount == 30
+        assert IndividualDonation.objects.count() == 6
+
+    def test_query_count_does_not_grow_with_the_export(self, conference):
+        rows = [f"T{index},10,{index}@example.com,2025-10-01" for index in range(52)]
+
+        with CaptureQueriesContext(connection) as small:
+            import_donations(read(*rows[:2]))
+        with CaptureQueriesContext(connection) as large:
+            import_donations(read(*rows[2:]))
+
+        assert len(large) == len(small)
+        assert IndividualDonation.objects.count() == 52
+
+    def test_refreshes_the_donation_stats_once(self, conference):
+        assert get_donors_count_cache(conference) == 0
+        assert get_total_donations_amount_cache(conference) == 0
+
+        with patch("portal.common.cache.delete_many") as delete_many:
+            import_donations(read("T1,10,a@example.com,2025-10-01"))
+        delete_many.assert_called_once()
+        import_donations(read("T1,10,a@example.com,2025-10-01"))
+
+        assert get_donors_count_cache(conference) == 1
+        assert get_total_donations_amount_cache(conference) == 10
@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from portal.models import Conference
+from sponsorship.models import IndividualDonation
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "contributions.csv"
+    path.write_text(
+        "Transaction ID,Total Amount,Email,Date Received\n"
+        "T1,10,ada@example.com,2025-10-01\n"
+        "T2,20,not-an-email,2025-10-01\n"
+    )
+    return path
+
+
+@pytest.mark.django_db
+class TestImportDonationsCommand:
+    def test_imports(self, conference, export):
+        out, err = StringIO(), StringIO()
+        call_command("import_donations", str(export), stdout=out, stderr=err)
+
+        assert out.getvalue() == (
+            "Imported 1 donations (1 new, 0 updated), "
+            "skipped 0 repeated transactions and 1 invalid rows\n"
+        )
+        assert err.getvalue() == "Row 3: donor_email: Enter a valid email address.\n"
+        assert IndividualDonation.objects.get().conference == conference
+
+    def test_year(self, export):
+        previous = Conference.objects.create(year=2024, name="2024", slug="2024")
+        call_command(
+            "import_donations", str(export), "--year", "2024", stdout=StringIO()
+        )
+        assert IndividualDonation.objects.get().conference == previous
+
+        with pytest.raises(CommandError, match="No conference for 2023"):
+            call_command("import_donations", str(export), "--year", "2023")
+
+    def test_unreadable_export(self, tmp_path):
+        with pytest.raises(CommandError, match="No such file"):
+            call_command("import_donations", str(tmp_path / "missing.csv"))
+
+        path = tmp_path / "contributions.csv"
+        path.write_text("Transaction ID,Email\n")
+        with pytest.raises(CommandError, match="no Total Amount column"):
+            call_command("import_donations", str(path))
@@ -1,11 +1,12 @@
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.urls import reverse
+from django.urls import reverse, reverse_lazy
 from pytest_django.asserts import assertRedirects
 
 from portal.constants import SPONSORSHIP_GOAL
 from portal.models import Conference
 from sponsorship.models import (
+    IndividualDonation,
     SponsorshipProfile,
     SponsorshipProgressStatus,
     SponsorshipTier,
@@ -535,6 +536,85 @@ class TestSponsorshipViews:
         )
         assert profile.github_issue_url in gh_url_render
 
+    def test_sponsors_table_keyset_pagination(self, client, admin_user, conference):
+        for name in ["Delta", "Alpha", "Echo", "Charlie", "Bravo"]:
+            SponsorshipProfile.objects.create(
+                organization_name=name, conference=conference
+            )
+
+        client.force_login(admin_user)
+        url = reverse("sponsorship:sponsorship_list")
+        params = {"sort": "organization_name", "per_page": 2}
+
+        seen = []
+        response = client.get(url, params)
+        for _ in range(10):  # bounded, so a cursor that never advances fails
+            table = response.context["table"]
+            seen.extend(row.record.organization_name for row in table.page.object_list)
+            assert table.keyset_count == 5
+            if not table.keyset_next_cursor:
+                break
+            response = client.get(url, {**params, "after": table.keyset_next_cursor})
+            assert response.context["table"].keyset_has_previous
+        assert not table.keyset_next_cursor
+
+        assert seen == ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]
+
+    def test_sponsors_table_cursor_ignored_after_sort_change(
+        self, client, admin_user, conference
+    ):
+        for name in ["Alpha", "Bravo", "Charlie"]:
+            SponsorshipProfile.objects.create(
+                organization_name=name, conference=conference
+            )
+
+        client.force_login(admin_user)
+        url = reverse("sponsorship:sponsorship_list")
+        response = client.get(url, {"sort": "organization_name", "per_page": 1})
+        cursor = response.context["table"].keyset_next_cursor
+        assert cursor
+
+        response = client.get(
+            url, {"sort": "-organization_name", "per_page": 1, "after": cursor}
+        )
+        table = response.context["table"]
+        assert not table.keyset_has_previous
+        assert [row.record.organization_name for row in table.page.object_list] == [
+            "Charlie"
+        ]
+
+    def test_sponsors_table_search_pages_by_rank(self, client, admin_user, conference):
+        best = SponsorshipProfile.objects.create(
+            organization_name="Acme", conference=conference
+        )
+        others = [
+            SponsorshipProfile.objects.create(
+                organization_name=f"Other {index}",
+                po_number="ACME-PO",
+                conference=conference,
+            )
+            for index in range(2)
+        ]
+        SponsorshipProfile.objects.create(
+            organization_name="Unrelated", conference=conference
+        )
+
+        client.force_login(admin_user)
+        url = reverse("sponsorship:sponsorship_list")
+        params = {"search": "acme", "per_page": 1}
+
+        seen = []
+        response = client.get(url, params)
+        for _ in range(10):  # bounded, so a cursor that never advances fails
+            table = response.context["table"]
+            seen.extend(row.record for row in table.page.object_list)
+            if not table.keyset_next_cursor:
+                break
+            response = client.get(url, {**params, "after": table.keyset_next_cursor})
+        assert not table.keyset_next_cursor
+
+        assert seen == [best, *others]
+
 
 @pytest.mark.django_db
 class TestSponsorshipCreateViews:
@@ -1093,3 +1173,68 @@ class TestSponsorshipNeedsAttention:
         assert response.context["selected_status"] == str(
             SponsorshipProgressStatus.INVOICED.value
         )
+
+
+@pytest.mark.django_db
+class TestIndividualDonationImport:
+    url = reverse_lazy("sponsorship:donation_import")
+
+    def _export(self, content, name="contributions.csv"):
+        return SimpleUploadedFile(name, content.encode(), content_type="text/csv")
+
+    def test_requires_an_organizer(self, client, portal_user):
+        client.force_login(portal_user)
+        assert client.get(self.url).status_code == 403
+
+    def test_form(self, client, admin_user):
+        client.force_login(admin_user)
+        content = client.get(self.url).content.decode()
+        assert 'enctype="multipart/form-data"' in content
+        assert 'active" href="' + str(self.url) in " ".join(content.split())
+
+    def test_imports(self, client, admin_user, conference):
+        client.force_login(admin_user)
+        response = client.post(
+            self.url,
+            {
+                "file": self._export(
+                    "Transaction ID,Total Amount,Email,Date Received\n"
+                    "T1,10,ada@example.com,2025-10-01\n"
+                    "T2,20,not-an-email,2025-10-01\n"
+                ),
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.context["result"].created == 1
+        content = response.content.decode()
+        assert "Imported 1 donations" in content
+        assert "Row 3: donor_email: Enter a valid email address." in content
+        assert IndividualDonation.objects.get().conference == conference
+
+    def test_conference(self, client, admin_user):
+        previous = Conference.objects.create(year=2024, name="2024", slug="2024")
+        client.force_login(admin_user)
+        client.post(
+            self.url,
+            {
+                "file": self._export(
+                    "Transaction ID,Total Amount,Email\nT1,10,a@b.co\n"
+                ),
+                "conference": previous.pk,
+            },
+        )
+        assert IndividualDonation.objects.get().conference == previous
+
+    def test_rejects_other_files(self, client, admin_user):
+        client.force_login(admin_user)
+        response = client.post(self.url, {"file": self._export("Transaction ID\nT1\n")})
+        assert response.context["form"].errors == {
+            "file": ["The export has no Total Amount, Email column"]
+        }
+
+        response = client.post(
+            self.url, {"file": self._export("T1", name="contributions.pdf")}
+        )
+        assert "file" in response.context["form"].errors
+        assert IndividualDonation.objects.count() == 0
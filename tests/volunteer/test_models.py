@@ -3,11 +3,15 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core import mail
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from common.search import search_documents
 from volunteer.constants import ApplicationStatus, Region, RoleTypes
 from volunteer.models import (
+    Language,
     PyladiesChapter,
     Role,
     Team,
@@ -793,3 +797,91 @@ class TestBringForwardTo:
             VolunteerProfile.objects.filter(user=portal_user, conference=target).count()
             == 1
         )
+
+
+@pytest.mark.django_db
+class TestVolunteerSearchDocument:
+    def matches(self, value):
+        return list(search_documents(VolunteerProfile.objects.all(), value))
+
+    @pytest.fixture
+    def profile(self, portal_user, conference):
+        portal_user.first_name = "Ada"
+        portal_user.last_name = "Lovelace"
+        portal_user.save()
+        chapter = PyladiesChapter.objects.create(
+            chapter_name="Berlin", chapter_description="PyLadies Berlin"
+        )
+        return VolunteerProfile.objects.create(
+            user=portal_user,
+            conference=conference,
+            discord_username="ada.codes",
+            github_username="octocat",
+            chapter=chapter,
+        )
+
+    @pytest.mark.parametrize("value", ["ada", "lovel", "codes", "octo", "berlin"])
+    def test_matches_profile_fields(self, profile, value):
+        assert self.matches(value) == [profile]
+
+    def test_status_change_does_not_rebuild_document(self, profile):
+        profile = VolunteerProfile.objects.get(pk=profile.pk)
+        profile.application_status = ApplicationStatus.APPROVED
+        profile.skip_notifications = True
+        with CaptureQueriesContext(connection) as captured:
+            profile.save()
+        assert not any("to_tsvector" in query["sql"] for query in captured)
+
+    def test_saving_again_keeps_document(self, profile):
+        profile.application_status = ApplicationStatus.APPROVED
+        profile.save()
+
+        assert self.matches("ada") == [profile]
+
+    def test_follows_handle_change(self, profile):
+        profile = VolunteerProfile.objects.get(pk=profile.pk)
+        profile.discord_username = "lovelace.ada"
+        profile.save()
+
+        assert self.matches("codes") == []
+        assert self.matches("lovelace ada") == [profile]
+
+    def test_follows_user_rename(self, profile, portal_user):
+        portal_user.last_name = "Byron"
+        portal_user.save()
+
+        assert self.matches("lovelace") == []
+        assert self.matches("byron") == [profile]
+
+    def test_login_does_not_rebuild_documents(
+        self, profile, portal_user, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            portal_user.save(update_fields=["last_login"])
+
+    def test_follows_chapter_rename(self, profile):
+        profile.chapter.chapter_name = "Lagos"
+        profile.chapter.save()
+
+        assert self.matches("berlin") == []
+        assert self.matches("lagos") == [profile]
+
+    def test_follows_languages(self, profile):
+        language = Language.objects.create(code="sw", name="Swahili")
+        profile.language.add(language)
+        assert self.matches("swahili") == [profile]
+
+        language.name = "Kiswahili"
+        language.save()
+        assert self.matches("kiswahili") == [profile]
+
+        profile.language.remove(language)
+        assert self.matches("kiswahili") == []
+
+    def test_follows_languages_edited_from_language_side(self, profile):
+        language = Language.objects.create(code="sw", name="Swahili")
+        language.volunteer_profile.add(profile)
+        assert self.matches("swahili") == [profile]
+
+        language.volunteer_profile.clear()
+        assert self.matches("swahili") == []
@@ -1,8 +1,12 @@
 import pytest
 from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
+from common.pagination import encode_cursor
 from portal.models import Conference
 from volunteer.constants import Region
 from volunteer.models import (
@@ -590,6 +594,138 @@ class TestManageVolunteers:
         assert reverse("team_detail", kwargs={"pk": team.pk}) in team_render
         assert "badge bg-secondary" in team_render
 
+    def test_volunteers_table_query_count_does_not_grow_with_rows(
+        self, client, admin_user, django_user_model, conference
+    ):
+        """Teams, roles and user are loaded up front, not once per row."""
+        team = Team.objects.create(
+            short_name="Team", description="Team", conference=conference
+        )
+        role = Role.objects.create(short_name="Role", description="Role")
+
+        def add_volunteers(start, count):
+            for index in range(start, start + count):
+                user = django_user_model.objects.create_user(username=f"vol{index}")
+                profile = VolunteerProfile.objects.create(
+                    user=user, conference=conference
+                )
+                profile.teams.add(team)
+                profile.roles.add(role)
+
+        client.force_login(admin_user)
+        url = reverse("volunteer:volunteer_profile_list")
+
+        add_volunteers(0, 2)
+        cache.clear()
+        with CaptureQueriesContext(connection) as few_rows:
+            response = client.get(url)
+        assert response.status_code == 200
+
+        add_volunteers(2, 8)
+        cache.clear()
+        with CaptureQueriesContext(connection) as many_rows:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert "vol9" in response.content.decode()
+
+        assert len(many_rows) == len(few_rows)
+
+    def test_volunteers_table_keyset_pagination(
+        self, client, admin_user, django_user_model, conference
+    ):
+        for index in range(5):
+            user = django_user_model.objects.create_user(username=f"vol{index}")
+            VolunteerProfile.objects.create(
+                user=user, conference=conference, discord_username="same"
+            )
+
+        client.force_login(admin_user)
+        url = reverse("volunteer:volunteer_profile_list")
+        params = {"sort": "discord_username", "per_page": 2}
+
+        seen = []
+        response = client.get(url, params)
+        for _ in range(10):  # bounded, so a cursor that never advances fails
+            table = response.context["table"]
+            seen.extend(row.record.pk for row in table.page.object_list)
+            if not table.keyset_next_cursor:
+                break
+            response = client.get(url, {**params, "after": table.keyset_next_cursor})
+        assert not table.keyset_next_cursor
+
+        # Equal sort values fall back to the primary key, so no row is
+        # skipped or repeated across pages.
+        assert seen == sorted(VolunteerProfile.objects.values_list("pk", flat=True))
+
+    def test_volunteers_table_invalid_cursor_shows_first_page(
+        self, client, admin_user, django_user_model, conference
+    ):
+        user = django_user_model.objects.create_user(username="vol0")
+        VolunteerProfile.objects.create(user=user, conference=conference)
+
+        client.force_login(admin_user)
+        url = reverse("volunteer:volunteer_profile_list")
+        response = client.get(url, {"after": "garbage"})
+
+        assert response.status_code == 200
+        table = response.context["table"]
+        assert not table.keyset_has_previous
+        assert len(table.page.object_list) == 1
+
+    @pytest.mark.parametrize(
+        "sort,values",
+        [
+            (None, ["abc"]),
+            ("updated_date", ["not-a-date", 1]),
+        ],
+    )
+    def test_volunteers_table_cursor_with_bad_value_shows_first_page(
+        self, client, admin_user, django_user_model, conference, sort, values
+    ):
+        user = django_user_model.objects.create_user(username="vol0")
+        VolunteerProfile.objects.create(user=user, conference=conference)
+        ordering = ["modified_date", "pk"] if sort else ["pk"]
+
+        client.force_login(admin_user)
+        url = reverse("volunteer:volunteer_profile_list")
+        params = {"after": encode_cursor(ordering, values)}
+        if sort:
+            params["sort"] = sort
+        response = client.get(url, params)
+
+        assert response.status_code == 200
+        table = response.context["table"]
+        assert not table.keyset_has_previous
+        assert len(table.page.object_list) == 1
+
+    def test_volunteers_table_application_date_sorts_by_id(
+        self, client, admin_user, django_user_model, conference
+    ):
+        profiles = [
+            VolunteerProfile.objects.create(
+                user=django_user_model.objects.create_user(username=f"vol{index}"),
+                conference=conference,
+            )
+            for index in range(3)
+        ]
+
+        client.force_login(admin_user)
+        url = reverse("volunteer:volunteer_profile_list")
+        response = client.get(url, {"sort": "-application_date", "per_page": 2})
+        table = response.context["table"]
+        assert [row.record for row in table.page.object_list] == profiles[:0:-1]
+
+        response = client.get(
+            url,
+            {
+                "sort": "-application_date",
+                "per_page": 2,
+                "after": table.keyset_next_cursor,
+            },
+        )
+        table = response.context["table"]
+        assert [row.record for row in table.page.object_list] == profiles[:1]
+
     def test_filter_volunteers_table(
         self, client, portal_user, django_user_model, conference
     ):
@@ -0,0 +1,16 @@
+import pytest
+
+from common.pretix_wrapper import PRETIX_WEBHOOK_ORDER_PAID
+from webhooks.models import WebhookEvent
+
+
+@pytest.mark.django_db
+def test_webhook_event_str():
+    event = WebhookEvent.objects.create(
+        notification_id="123",
+        action=PRETIX_WEBHOOK_ORDER_PAID,
+        event_slug="2025",
+        order_code="ORDER123",
+        payload={},
+    )
+    assert str(event) == "pretix.event.order.paid ORDER123 (123)"
@@ -0,0 +1,202 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import requests
+from celery.exceptions import Retry
+from django.utils.timezone import now
+
+from attendee.models import PretixOrder, PretixSyncRun
+from common.pretix_wrapper import PRETIX_WEBHOOK_ORDER_PAID
+from portal.models import BaseModel
+from webhooks.models import WebhookEvent, WebhookEventStatus
+from webhooks.tasks import (
+    WEBHOOK_BATCH_MAX_AGE,
+    WEBHOOK_BATCH_OVERLAP,
+    process_pretix_webhook_task,
+    sync_pretix_order,
+)
+
+
+def make_event(notification_id, order_code="ORDER123", **fields):
+    fields.setdefault("event_slug", "2025")
+    return WebhookEvent.objects.create(
+        notification_id=notification_id,
+        action=PRETIX_WEBHOOK_ORDER_PAID,
+        order_code=order_code,
+        payload={},
+        **fields,
+    )
+
+
+@pytest.fixture
+def webhook_event(settings):
+    settings.PRETIX_API_TOKEN = "test_token"
+    return make_event("123")
+
+
+@pytest.mark.django_db
+class TestProcessPretixWebhookTask:
+    def test_fetches_and_stores_the_order(self, webhook_event, pretix_order_data):
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code",
+            return_value=pretix_order_data,
+        ) as get_order:
+            result = process_pretix_webhook_task(webhook_event.id)
+
+        get_order.assert_called_once_with("ORDER123")
+        assert result == "Processed 1 notifications about 1 orders"
+        order = PretixOrder.objects.get(order_code="ORDER123")
+        assert order.profile is not None
+        webhook_event.refresh_from_db()
+        assert webhook_event.status == WebhookEventStatus.PROCESSED
+        assert webhook_event.processed_at is not None
+        run = PretixSyncRun.objects.get()
+        assert run.source == "webhook"
+        assert run.conference.pretix_event_slug == "2025"
+        assert run.orders_inserted == 1
+        assert run.finished_at is not None
+
+    def test_one_task_answers_the_pending_notifications_of_the_event(
+        self, webhook_event, pretix_order_data
+    ):
+        failed = make_event("124", status=WebhookEventStatus.FAILED)
+        pending = make_event("125")
+        other_order = make_event("126", order_code="ORDER456")
+        missed_order = make_event("127", order_code="ORDER789")
+        processed_before = make_event(
+            "128", status=WebhookEventStatus.PROCESSED, processed_at=now()
+        )
+        other_event = make_event("129", event_slug="plc26")
+        # Came in after the fetch started, so may be about a later change.
+        later = make_event("130")
+        BaseModel.objects.filter(pk=later.pk).update(
+            creation_date=now() + timedelta(minutes=1)
+        )
+        listed = [
+            pretix_order_data,
+            dict(pretix_order_data, code="ORDER456"),
+            dict(pretix_order_data, code="ORDER999"),
+        ]
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_orders", return_value=listed
+        ) as get_orders, patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code",
+            return_value=dict(pretix_order_data, code="ORDER789"),
+        ) as get_order, patch.object(
+            PretixOrder, "resolve_conference", wraps=PretixOrder.resolve_conference
+        ) as resolve_conference:
+            result = process_pretix_webhook_task(webhook_event.id)
+            assert process_pretix_webhook_task(pending.id) == (
+                f"WebhookEvent {pending.id} was already processed"
+            )
+
+        # One listing, plus a fetch for the order it did not have.
+        get_orders.assert_called_once()
+        modified_since = get_orders.call_args.kwargs["modified_since"]
+        assert modified_since == webhook_event.creation_date - WEBHOOK_BATCH_OVERLAP
+        get_order.assert_called_once_with("ORDER789")
+        # Once for the whole batch.
+        resolve_conference.assert_called_once_with("2025")
+        assert result == "Processed 5 notifications about 3 orders"
+        assert set(PretixOrder.objects.values_list("order_code", flat=True)) == {
+            "ORDER123",
+            "ORDER456",
+            "ORDER789",
+        }
+        statuses = dict(WebhookEvent.objects.values_list("pk", "status"))
+        assert statuses == {
+            webhook_event.pk: WebhookEventStatus.PROCESSED,
+            failed.pk: WebhookEventStatus.PROCESSED,
+            pending.pk: WebhookEventStatus.PROCESSED,
+            other_order.pk: WebhookEventStatus.PROCESSED,
+            missed_order.pk: WebhookEventStatus.PROCESSED,
+            processed_before.pk: WebhookEventStatus.PROCESSED,
+            other_event.pk: WebhookEventStatus.PENDING,
+            later.pk: WebhookEventStatus.PENDING,
+        }
+        assert WebhookEvent.counters() == {
+            "received": 8,
+            "deduplicated": 0,
+            "processed": 6,
+        }
+
+    def test_lists_at_most_the_last_hour(self, webhook_event, pretix_order_data):
+        old = make_event("124", order_code="ORDER456")
+        BaseModel.objects.filter(pk=old.pk).update(
+            creation_date=now() - timedelta(days=1)
+        )
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_orders",
+            return_value=[pretix_order_data, dict(pretix_order_data, code="ORDER456")],
+        ) as get_orders:
+            process_pretix_webhook_task(webhook_event.id)
+
+        modified_since = get_orders.call_args.kwargs["modified_since"]
+        assert now() - modified_since < WEBHOOK_BATCH_MAX_AGE + timedelta(minutes=1)
+
+    def test_event_not_found(self):
+        assert process_pretix_webhook_task(0) == "WebhookEvent with id 0 not found"
+
+    def test_already_processed(self, webhook_event):
+        webhook_event.status = WebhookEventStatus.PROCESSED
+        webhook_event.save()
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code"
+        ) as get_order:
+            result = process_pretix_webhook_task(webhook_event.id)
+
+        get_order.assert_not_called()
+        assert result == f"WebhookEvent {webhook_event.id} was already processed"
+
+    def test_retries_pretix_errors(self, webhook_event):
+        error = requests.exceptions.ConnectionError("Pretix is down")
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code",
+            side_effect=error,
+        ), patch.object(
+            process_pretix_webhook_task,
+            "retry",
+            wraps=process_pretix_webhook_task.retry,
+        ) as retry:
+            with pytest.raises(Retry):
+                process_pretix_webhook_task.apply(args=[webhook_event.id], retries=1)
+
+        # Backing off: 60s, then 120s, then 240s.
+        assert retry.call_args.kwargs == {"exc": error, "countdown": 120}
+        webhook_event.refresh_from_db()
+        assert webhook_event.status == WebhookEventStatus.PENDING
+        assert "Pretix is down" in webhook_event.error
+
+    def test_gives_up_after_the_last_retry(self, webhook_event):
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code",
+            side_effect=requests.exceptions.ConnectionError("Pretix is down"),
+        ):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                process_pretix_webhook_task.apply(args=[webhook_event.id], retries=3)
+
+        webhook_event.refresh_from_db()
+        assert webhook_event.status == WebhookEventStatus.FAILED
+        assert "Pretix is down" in webhook_event.error
+        run = PretixSyncRun.objects.get()
+        assert run.finished_at is not None
+        assert "Pretix is down" in run.error
+
+
+@pytest.mark.django_db
+class TestSyncPretixOrder:
+    def test_counts_the_order_on_the_run(self, conference, pretix_order_data):
+        run = PretixSyncRun()
+        sync_pretix_order(pretix_order_data, conference, run=run)
+        sync_pretix_order(pretix_order_data, conference, run=run)
+        changed = dict(
+            pretix_order_data, status="c", last_modified="2025-11-14T10:00:00+01:00"
+        )
+        sync_pretix_order(changed, conference, run=run)
+
+        assert (run.orders_inserted, run.orders_updated, run.orders_skipped) == (
+            1,
+            1,
+            1,
+        )
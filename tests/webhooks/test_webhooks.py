@@ -13,11 +13,12 @@ from attendee.models import (
     PretixOrderstatus,
 )
 from common.pretix_wrapper import (
-    PRETIX_EVENT_SLUG,
     PRETIX_ORG,
     PRETIX_WEBHOOK_ORDER_CANCELLED,
 )
 from portal.models import Conference
+from webhooks.models import WebhookEvent, WebhookEventStatus
+from webhooks.tasks import WEBHOOK_DEBOUNCE_SECONDS, process_pretix_webhook_task
 
 
 @pytest.fixture(autouse=True)
@@ -91,12 +92,61 @@ class TestPretixWebhook(TestCase):
         assert response.status_code == 401
         assert "Unauthorized" in str(response.content)
 
+    @override_settings(PRETIX_WEBHOOK_SECRET="")
+    def test_pretix_webhook_endpoint_secret_not_configured(self):
+        response = self.client.post(self.url, query_params={"secret": ""})
+        assert response.status_code == 401
+
+    def test_pretix_webhook_endpoint_body_not_json(self):
+        for body in ("not json", "[1, 2]"):
+            response = self.client.post(
+                f"{self.url}",
+                query_params={"secret": "supersecret"},
+                data=body,
+                content_type="application/json",
+            )
+            assert response.status_code == 400
+            assert response.content == b"Invalid pretix payload structure"
+
+    def test_pretix_webhook_logs_a_summary(self):
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": self.conference.pretix_event_slug,
+            "code": "ORDER123",
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+            "secret_note": "not for the logs",
+        }
+        with patch("webhooks.views.enqueue_later"), self.assertLogs(
+            "webhooks", level="INFO"
+        ) as logs:
+            for _ in range(2):
+                self.client.post(
+                    f"{self.url}",
+                    query_params={"secret": "supersecret"},
+                    data=json.dumps(payload),
+                    content_type="application/json",
+                )
+
+        assert logs.records[0].getMessage() == (
+            "Pretix webhook received, {'notification_id': 123, 'organizer': "
+            "'pyladiescon', 'event': '2025', 'code': 'ORDER123', 'action': "
+            "'pretix.event.order.canceled'}"
+        )
+        assert logs.records[0].code == "ORDER123"
+        assert (
+            logs.records[-1]
+            .getMessage()
+            .startswith("Duplicate pretix notification, {'notification_id': 123")
+        )
+        assert "not for the logs" not in "\n".join(logs.output)
+
     def test_pretix_webhook_endpoint_invalid_payload(self):
         # wrong action
         payload = {
             "notification_id": 123,
             "organizer": PRETIX_ORG,
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": "ABC123",
             "action": "pretix.event.order.wrongaction",
         }
@@ -113,7 +163,7 @@ class TestPretixWebhook(TestCase):
         payload = {
             "notification_id": 123,
             "organizer": "wrong_org",
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": "ABC123",
             "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
         }
@@ -160,7 +210,7 @@ class TestPretixWebhook(TestCase):
         payload = {
             "notification_id": 123,
             "organizer": PRETIX_ORG,
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": order_code,
             "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
         }
@@ -174,7 +224,7 @@ class TestPretixWebhook(TestCase):
                 data=json.dumps(payload),
                 content_type="application/json",
             )
-            assert response.status_code == 200
+            assert response.status_code == 202
             assert mock_get_order.call_count == 1
 
             assert PretixOrder.objects.filter(order_code=order_code).exists() is True
@@ -199,7 +249,7 @@ class TestPretixWebhook(TestCase):
         payload = {
             "notification_id": 123,
             "organizer": PRETIX_ORG,
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": order_code,
             "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
         }
@@ -213,7 +263,7 @@ class TestPretixWebhook(TestCase):
                 data=json.dumps(payload),
                 content_type="application/json",
             )
-            assert response.status_code == 200
+            assert response.status_code == 202
             assert mock_get_order.call_count == 1
 
             order.refresh_from_db()
@@ -224,6 +274,134 @@ class TestPretixWebhook(TestCase):
             assert order.url == self._pretix_order_data["url"]
             assert order.raw_data == self._pretix_order_data
 
+    def test_pretix_webhook_stores_notification_and_enqueues_task(self):
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": self.conference.pretix_event_slug,
+            "code": "ORDER123",
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+        }
+        with patch("webhooks.views.enqueue_later") as mock_enqueue:
+            response = self.client.post(
+                f"{self.url}",
+                query_params={"secret": "supersecret"},
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+        assert response.status_code == 202
+        event = WebhookEvent.objects.get()
+        assert event.notification_id == "123"
+        assert event.action == PRETIX_WEBHOOK_ORDER_CANCELLED
+        assert event.event_slug == "2025"
+        assert event.order_code == "ORDER123"
+        assert event.payload == payload
+        assert event.status == WebhookEventStatus.PENDING
+        mock_enqueue.assert_called_once_with(
+            process_pretix_webhook_task, WEBHOOK_DEBOUNCE_SECONDS, event.id
+        )
+        # The order is only fetched and stored by the task.
+        assert not PretixOrder.objects.exists()
+
+    def test_pretix_webhook_drops_repeated_notification(self):
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": self.conference.pretix_event_slug,
+            "code": "ORDER123",
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+        }
+        with patch("webhooks.views.enqueue_later") as mock_enqueue:
+            for _ in range(3):
+                response = self.client.post(
+                    f"{self.url}",
+                    query_params={"secret": "supersecret"},
+                    data=json.dumps(payload),
+                    content_type="application/json",
+                )
+                assert response.status_code == 202
+
+        assert mock_enqueue.call_count == 1
+        assert WebhookEvent.objects.get().duplicates == 2
+        assert WebhookEvent.counters() == {
+            "received": 3,
+            "deduplicated": 2,
+            "processed": 0,
+        }
+
+    def test_pretix_webhook_accepts_any_configured_event(self):
+        Conference.objects.create(
+            year=2026, name="PyLadiesCon 2026", slug="2026", pretix_event_slug="plc26"
+        )
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": "plc26",
+            "code": "ORDER456",
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+        }
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code", autospec=True
+        ) as mock_get_order:
+            mock_get_order.return_value = dict(
+                self._pretix_order_data, code="ORDER456", event="plc26", status="c"
+            )
+            response = self.client.post(
+                f"{self.url}",
+                query_params={"secret": "supersecret"},
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+        assert response.status_code == 202
+        assert mock_get_order.call_args.args[0].event_slug == "plc26"
+        order = PretixOrder.objects.get(order_code="ORDER456")
+        assert order.conference.year == 2026
+
+    def test_pretix_webhook_event_check_is_cached(self):
+        Conference.pretix_event_slugs()
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": "wrong event",
+            "code": "ORDER456",
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+        }
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                f"{self.url}",
+                query_params={"secret": "supersecret"},
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+        assert response.status_code == 400
+
+    def test_pretix_webhook_skips_unchanged_order(self):
+        order = PretixOrder(order_code=self._pretix_order_data["code"])
+        order.from_pretix_data(self._pretix_order_data).save()
+        modified_date = order.modified_date
+        payload = {
+            "notification_id": 123,
+            "organizer": PRETIX_ORG,
+            "event": self.conference.pretix_event_slug,
+            "code": order.order_code,
+            "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
+        }
+        with patch(
+            "common.pretix_wrapper.PretixWrapper.get_order_by_code"
+        ) as mock_get_order:
+            mock_get_order.return_value = self._pretix_order_data
+            with self.assertLogs("webhooks.tasks", level="INFO") as logs:
+                response = self.client.post(
+                    f"{self.url}",
+                    query_params={"secret": "supersecret"},
+                    data=json.dumps(payload),
+                    content_type="application/json",
+                )
+        assert response.status_code == 202
+        order.refresh_from_db()
+        assert order.modified_date == modified_date
+        assert "Order ORDER123 is unchanged, skipping" in logs.output[-1]
+
     def test_pretix_webhook_creates_attendee_profile_for_paid_order(self):
         """Test that webhook creates AttendeeProfile for paid orders."""
         order_code = "PAID_ORDER_123"
@@ -294,7 +472,7 @@ class TestPretixWebhook(TestCase):
         payload = {
             "notification_id": 456,
             "organizer": PRETIX_ORG,
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": order_code,
             "action": "pretix.event.order.paid",
         }
@@ -309,7 +487,7 @@ class TestPretixWebhook(TestCase):
                 data=json.dumps(payload),
                 content_type="application/json",
             )
-            assert response.status_code == 200
+            assert response.status_code == 202
 
             # Verify order was created
             order = PretixOrder.objects.get(order_code=order_code)
@@ -361,7 +539,7 @@ class TestPretixWebhook(TestCase):
         payload = {
             "notification_id": 789,
             "organizer": PRETIX_ORG,
-            "event": PRETIX_EVENT_SLUG,
+            "event": self.conference.pretix_event_slug,
             "code": order_code,
             "action": PRETIX_WEBHOOK_ORDER_CANCELLED,
         }
@@ -376,7 +554,7 @@ class TestPretixWebhook(TestCase):
                 data=json.dumps(payload),
                 content_type="application/json",
             )
-            assert response.status_code == 200
+            assert response.status_code == 202
 
             # Verify order was created
             order = PretixOrder.objects.get(order_code=order_code)
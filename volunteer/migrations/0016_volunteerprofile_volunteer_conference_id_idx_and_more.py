@@ -0,0 +1,37 @@
+# Generated by Django 5.2.13 on 2026-10-19 14:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+        ("volunteer", "0015_alter_team_description"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="volunteerprofile",
+            index=models.Index(
+                fields=["conference", "basemodel_ptr"],
+                name="volunteer_conference_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="volunteerprofile",
+            index=models.Index(
+                fields=["conference", "application_status", "basemodel_ptr"],
+                name="volunteer_conf_status_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="volunteerprofile",
+            index=models.Index(
+                fields=["conference", "discord_username", "basemodel_ptr"],
+                name="volunteer_conf_discord_id_idx",
+            ),
+        ),
+    ]
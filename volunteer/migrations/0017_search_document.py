@@ -0,0 +1,68 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# One statement for every existing profile. It mirrors
+# VolunteerProfile.search_document_parts() as of this migration: the words of
+# each text (runs of letters and digits), weighted A to C.
+POPULATE_SEARCH_DOCUMENTS = """
+UPDATE volunteer_volunteerprofile AS profile
+SET search_document =
+    setweight(to_tsvector('simple', regexp_replace(
+        lower(concat_ws(' ', account.username, account.first_name, account.last_name)),
+        '[^[:alnum:]]+', ' ', 'g'
+    )), 'A')
+    || setweight(to_tsvector('simple', regexp_replace(
+        lower(concat_ws(' ', profile.discord_username, profile.github_username)),
+        '[^[:alnum:]]+', ' ', 'g'
+    )), 'B')
+    || setweight(to_tsvector('simple', regexp_replace(
+        lower(concat_ws(
+            ' ',
+            (
+                SELECT chapter.chapter_name
+                FROM volunteer_pyladieschapter AS chapter
+                WHERE chapter.basemodel_ptr_id = profile.chapter_id
+            ),
+            (
+                SELECT string_agg(language.name, ' ')
+                FROM volunteer_volunteerprofile_language AS spoken
+                JOIN volunteer_language AS language
+                    ON language.basemodel_ptr_id = spoken.language_id
+                WHERE spoken.volunteerprofile_id = profile.basemodel_ptr_id
+            )
+        )),
+        '[^[:alnum:]]+', ' ', 'g'
+    )), 'C')
+FROM auth_user AS account
+WHERE account.id = profile.user_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+        ("volunteer", "0016_volunteerprofile_volunteer_conference_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="volunteerprofile",
+            name="search_document",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="volunteerprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="volunteer_search_document_idx"
+            ),
+        ),
+        migrations.RunSQL(POPULATE_SEARCH_DOCUMENTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.13 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_conference_coc_url_conference_donate_url_and_more"),
+        ("volunteer", "0017_search_document"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="team",
+            index=models.Index(
+                fields=["conference", "open_to_new_members"], name="team_conf_open_idx"
+            ),
+        ),
+    ]
@@ -2,15 +2,19 @@ import re
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Q
 from django.db.models.functions import Lower
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.functional import cached_property
 
+from common.pagination import invalidate_keyset_counts
+from common.search import build_search_vector
 from common.send_emails import send_email
 from portal.models import BaseModel, ChoiceArrayField
 from portal.validators import validate_linked_in_pattern
@@ -63,6 +67,15 @@ class Team(BaseModel):
     )
     open_to_new_members = models.BooleanField(default=True)
 
+    class Meta:
+        # The sign-up form lists the open teams of the active edition.
+        indexes = [
+            models.Index(
+                fields=["conference", "open_to_new_members"],
+                name="team_conf_open_idx",
+            ),
+        ]
+
     def __str__(self):
         # Include the conference year so teams are distinguishable across
         # editions (e.g. in admin M2M pickers that list every year's teams).
@@ -173,6 +186,9 @@ class VolunteerProfile(BaseModel):
         null=True,
         blank=True,
     )
+    # Stored tsvector for the review table search, kept current by the signal
+    # receivers at the bottom of this module. See common/search.py.
+    search_document = SearchVectorField(null=True, editable=False)
 
     @cached_property
     def is_approved(self):
@@ -324,6 +340,23 @@ class VolunteerProfile(BaseModel):
 
     class Meta:
         unique_together = ("user", "conference")
+        # Keyset pagination of the review table seeks on ``(sort_key, id)``
+        # within one edition; these cover the default and status orderings.
+        indexes = [
+            models.Index(
+                fields=["conference", "basemodel_ptr"],
+                name="volunteer_conference_id_idx",
+            ),
+            models.Index(
+                fields=["conference", "application_status", "basemodel_ptr"],
+                name="volunteer_conf_status_id_idx",
+            ),
+            models.Index(
+                fields=["conference", "discord_username", "basemodel_ptr"],
+                name="volunteer_conf_discord_id_idx",
+            ),
+            GinIndex(fields=["search_document"], name="volunteer_search_document_idx"),
+        ]
 
     def __str__(self):
         return self.user.username
@@ -331,6 +364,37 @@ class VolunteerProfile(BaseModel):
     def get_absolute_url(self):
         return reverse("volunteer:volunteer_profile_edit", kwargs={"pk": self.pk})
 
+    def search_document_parts(self):
+        """The ``(weight, text)`` pairs the review table search matches on."""
+        return [
+            ("A", self.user.username),
+            ("A", self.user.first_name),
+            ("A", self.user.last_name),
+            ("B", self.discord_username),
+            ("B", self.github_username),
+            ("C", self.chapter.chapter_name if self.chapter else ""),
+            ("C", " ".join(language.name for language in self.language.all())),
+        ]
+
+    def searched_field_values(self):
+        """The values of this profile's own fields that are in the search document.
+
+        Deferred fields are read as ``None`` rather than loaded.
+        """
+        return tuple(
+            self.__dict__.get(field)
+            for field in ("discord_username", "github_username", "chapter_id")
+        )
+
+    def update_search_document(self):
+        """Rebuild the stored search document from the current data."""
+        VolunteerProfile.objects.filter(pk=self.pk).update(
+            search_document=build_search_vector(self.search_document_parts())
+        )
+        # Leave the field deferred: it is read fresh if needed, and a later
+        # save() of this instance does not write the old value back.
+        self.__dict__.pop("search_document", None)
+
 
 def send_volunteer_notification_email(instance, updated=False):
     """Send email to the user whenever their volunteer profile was updated/created."""
@@ -508,3 +572,88 @@ def volunteer_profile_signal(sender, instance, created, **kwargs):
     from .tasks import send_volunteer_profile_emails_task
 
     enqueue(send_volunteer_profile_emails_task, instance.id, created)
+
+
+def _update_search_documents(profiles):
+    for profile in profiles.select_related("user", "chapter"):
+        profile.update_search_document()
+
+
+@receiver(post_init, sender=VolunteerProfile)
+def volunteer_profile_search_snapshot_signal(sender, instance, **kwargs):
+    """Remember the searched fields as loaded, see the receiver below."""
+    instance._search_snapshot = instance.searched_field_values()
+
+
+@receiver(post_save, sender=VolunteerProfile)
+def volunteer_profile_search_signal(sender, instance, created, raw, **kwargs):
+    """Keep the profile's search document in step with its own fields.
+
+    Reviews only change the status, so the document is rebuilt only for new
+    profiles or when a searched field changed since the profile was loaded.
+    The user, chapter and languages have receivers of their own below.
+    """
+    values = instance.searched_field_values()
+    if raw or (not created and values == instance._search_snapshot):
+        return
+    instance.update_search_document()
+    instance._search_snapshot = values
+
+
+@receiver(m2m_changed, sender=VolunteerProfile.language.through)
+def volunteer_profile_language_search_signal(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Languages are part of the search document, so refresh it when they change.
+
+    ``instance`` is the profile when its languages are edited, or the language
+    when its profiles are (``reverse``). Clearing from the language side does
+    not say which profiles were affected, so they are noted beforehand.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            instance.update_search_document()
+        return
+    if action == "pre_clear":
+        instance._search_profile_pks = list(
+            instance.volunteer_profile.values_list("pk", flat=True)
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_search_profile_pks", [])
+    elif action not in ("post_add", "post_remove"):
+        return
+    _update_search_documents(VolunteerProfile.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=User)
+def user_search_signal(sender, instance, created, raw, update_fields, **kwargs):
+    """Refresh the user's profiles when their username or name changes.
+
+    Logging in saves ``last_login`` only, which is not searched, so it is skipped.
+    """
+    searched = {"username", "first_name", "last_name"}
+    if created or raw or (update_fields and not searched & set(update_fields)):
+        return
+    _update_search_documents(VolunteerProfile.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=PyladiesChapter)
+def chapter_search_signal(sender, instance, created, raw, **kwargs):
+    """Refresh the profiles of a chapter's members when it is renamed."""
+    if not (created or raw):
+        _update_search_documents(VolunteerProfile.objects.filter(chapter=instance))
+
+
+@receiver(post_save, sender=Language)
+def language_search_signal(sender, instance, created, raw, **kwargs):
+    """Refresh the profiles speaking a language when it is renamed."""
+    if not (created or raw):
+        _update_search_documents(VolunteerProfile.objects.filter(language=instance))
+
+
+@receiver(post_save, sender=VolunteerProfile)
+@receiver(post_delete, sender=VolunteerProfile)
+def volunteer_profile_count_signal(sender, **kwargs):
+    """Refresh the review table's "About N results" count."""
+    invalidate_keyset_counts(sender)
@@ -3,7 +3,6 @@ import django_tables2 as tables
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.postgres.search import SearchQuery, SearchVector
 from django.http import Http404
 from django.shortcuts import redirect, render
 from django.urls import reverse, reverse_lazy
@@ -19,6 +18,8 @@ from common.mixins import (
     TeamLeadRequiredMixin,
     VolunteerOrAdminRequiredMixin,
 )
+from common.pagination import KeysetPaginationMixin
+from common.search import search_documents
 from common.tasks import enqueue
 from portal.common import (
     get_volunteer_languages_stat_cache,
@@ -90,7 +91,8 @@ class VolunteerAdminRequiredMixin(AdminRequiredMixin):
 class VolunteerProfileFilter(django_filters.FilterSet):
 
     search = django_filters.CharFilter(
-        label="Search by username, first name, or last name", method="search_fulltext"
+        label="Search by name, username, handle, chapter, or language",
+        method="search_fulltext",
     )
     # temporarily disable the language filter
     # language = django_filters.ChoiceFilter(
@@ -105,11 +107,7 @@ class VolunteerProfileFilter(django_filters.FilterSet):
         fields = ["search", "application_status"]
 
     def search_fulltext(self, queryset, field_name, value):
-        if not value:
-            return queryset
-        return queryset.annotate(  # pragma: no cover
-            search=SearchVector("user__username", "user__first_name", "user__last_name")
-        ).filter(search=SearchQuery(value))
+        return search_documents(queryset, value)
 
     # def filter_language(self, queryset, name, value):
     #     """Custom filtering for the languages field."""
@@ -121,8 +119,10 @@ class VolunteerProfileTable(tables.Table):
     date_joined = tables.Column(
         accessor="user__date_joined", verbose_name="Joined Date"
     )
+    # Ids grow with creation time, and unlike ``creation_date`` (which lives
+    # on the BaseModel parent table) they are indexed per conference.
     application_date = tables.Column(
-        accessor="creation_date", verbose_name="Application Date"
+        accessor="creation_date", verbose_name="Application Date", order_by=("pk",)
     )
     updated_date = tables.Column(
         accessor="modified_date", verbose_name="Application Last Updated"
@@ -132,8 +132,10 @@ class VolunteerProfileTable(tables.Table):
     )
     actions = tables.Column(accessor="id", verbose_name="Actions")
     username = tables.Column(accessor="user__username", verbose_name="Username")
-    teams = tables.Column(accessor="teams", verbose_name="Teams")
-    roles = tables.Column(accessor="roles", verbose_name="Roles")
+    # Many-to-many columns: ordering by them would repeat a volunteer once per
+    # team/role, so they are display-only.
+    teams = tables.Column(accessor="teams", verbose_name="Teams", orderable=False)
+    roles = tables.Column(accessor="roles", verbose_name="Roles", orderable=False)
 
     class Meta:
         model = VolunteerProfile
@@ -231,7 +233,25 @@ class VolunteerProfileTable(tables.Table):
         return html_content
 
 
-class VolunteerProfileList(VolunteerAdminRequiredMixin, SingleTableMixin, FilterView):
+# Columns ``VolunteerProfileTable`` reads from each row, including the user
+# fields behind the accessor columns and ``render_username``.
+VOLUNTEER_PROFILE_TABLE_FIELDS = (
+    "id",
+    "application_status",
+    "discord_username",
+    "creation_date",
+    "modified_date",
+    "user__username",
+    "user__first_name",
+    "user__last_name",
+    "user__date_joined",
+    "user__is_superuser",
+)
+
+
+class VolunteerProfileList(
+    VolunteerAdminRequiredMixin, KeysetPaginationMixin, SingleTableMixin, FilterView
+):
     model = VolunteerProfile
     template_name = "volunteer/volunteerprofile_list.html"
     table_class = VolunteerProfileTable
@@ -250,7 +270,17 @@ class VolunteerProfileList(VolunteerAdminRequiredMixin, SingleTableMixin, Filter
     def get_queryset(self):
         # ``conference=None`` matches nothing, so an unknown year or no active
         # conference yields an empty list rather than every year at once.
-        return super().get_queryset().filter(conference=self.get_selected_conference())
+        # The table renders the user, teams and roles of every row; load them
+        # up front (and only the columns it shows) so the page costs a fixed
+        # number of queries however many volunteers applied.
+        return (
+            super()
+            .get_queryset()
+            .filter(conference=self.get_selected_conference())
+            .select_related("user")
+            .prefetch_related("teams", "roles")
+            .only(*VOLUNTEER_PROFILE_TABLE_FIELDS)
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
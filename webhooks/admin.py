@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import WebhookEvent
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "notification_id",
+        "action",
+        "event_slug",
+        "order_code",
+        "status",
+        "duplicates",
+        "creation_date",
+        "processed_at",
+    )
+    list_filter = ("status", "action", "event_slug")
+    search_fields = ("notification_id", "order_code")
+    readonly_fields = ("creation_date", "modified_date")
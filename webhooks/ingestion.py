@@ -0,0 +1,95 @@
+"""Checks every incoming webhook request goes through before its view runs.
+
+The body is parsed once, here, and the payload handed to the view as
+``request.pretix_payload``. Only a short summary of each notification is
+logged: the full payload is stored on its ``WebhookEvent`` anyway.
+"""
+
+import hmac
+import json
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest
+
+from common.pretix_wrapper import PRETIX_ALLOWED_WEBHOOK_ACTIONS, PRETIX_ORG
+from portal.models import Conference
+
+logger = logging.getLogger(__name__)
+
+PRETIX_PAYLOAD_KEYS = ("notification_id", "organizer", "event", "code", "action")
+
+
+def payload_summary(payload):
+    """The identifying fields of a pretix notification, for the logs."""
+    return {key: payload.get(key) for key in PRETIX_PAYLOAD_KEYS}
+
+
+def require_webhook_secret(param_name):
+    """
+    Decorator to ensure the webhook secret query parameter is present in the request.
+
+    The secret is compared in constant time, so response times do not give
+    away how much of a guess was right.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if param_name not in request.GET:
+                return HttpResponseBadRequest(
+                    f"Missing required query parameter: {param_name}"
+                )
+            secret = settings.PRETIX_WEBHOOK_SECRET or ""
+            param_value = request.GET[param_name]
+            if not secret or not hmac.compare_digest(
+                param_value.encode(), secret.encode()
+            ):
+                return HttpResponse("Unauthorized", status=401)
+
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
+
+
+def require_pretix_payload():
+    """
+    Decorator to ensure the request contains a valid pretix payload.
+
+    The parsed payload is set as ``request.pretix_payload``.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            try:
+                event_json = json.loads(request.body)
+            except ValueError:
+                logger.warning("Pretix webhook body is not JSON")
+                return HttpResponseBadRequest("Invalid pretix payload structure")
+            # Basic validation of pretix payload structure
+            if not isinstance(event_json, dict) or not set(
+                PRETIX_PAYLOAD_KEYS
+            ).issubset(event_json):
+                logger.warning("Invalid pretix payload structure")
+                return HttpResponseBadRequest("Invalid pretix payload structure")
+            summary = payload_summary(event_json)
+            if event_json["action"] not in PRETIX_ALLOWED_WEBHOOK_ACTIONS:
+                logger.warning("Unsupported pretix action, %s", summary)
+                return HttpResponseBadRequest("Unsupported pretix action")
+            if event_json["organizer"] != PRETIX_ORG:
+                logger.warning("Invalid organizer, %s", summary)
+                return HttpResponseBadRequest("Invalid organizer")
+            if event_json["event"] not in Conference.pretix_event_slugs():
+                logger.warning("Invalid event slug, %s", summary)
+                return HttpResponseBadRequest("Invalid event slug")
+            logger.info("Pretix webhook received, %s", summary, extra=summary)
+            request.pretix_payload = event_json
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.13 on 2026-10-19 18:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("portal", "0008_conference_pretix_orders_synced_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                (
+                    "basemodel_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="portal.basemodel",
+                    ),
+                ),
+                ("notification_id", models.CharField(max_length=100)),
+                ("action", models.CharField(max_length=100)),
+                ("event_slug", models.CharField(max_length=100)),
+                ("order_code", models.CharField(max_length=100)),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processed", "Processed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "Webhook Event",
+                "verbose_name_plural": "Webhook Events",
+            },
+            bases=("portal.basemodel",),
+        ),
+    ]
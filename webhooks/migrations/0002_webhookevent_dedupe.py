@@ -0,0 +1,23 @@
+# Generated by Django 5.2.13 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("webhooks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="webhookevent",
+            name="duplicates",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="webhookevent",
+            name="notification_id",
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from portal.models import BaseModel
+
+
+class WebhookEventStatus(models.TextChoices):
+    """Where a received webhook notification is in its processing."""
+
+    PENDING = "pending", "Pending"
+    PROCESSED = "processed", "Processed"
+    FAILED = "failed", "Failed"
+
+
+class WebhookEvent(BaseModel):
+    """A notification received from the Pretix webhook.
+
+    The webhook only validates and stores the notification; a Celery task
+    (``process_pretix_webhook_task``) then fetches the order from Pretix and
+    updates it. ``creation_date`` is when the notification came in.
+
+    Pretix retries a notification until it gets an answer, so one can arrive
+    more than once: it is stored once, by ``notification_id``, and the repeats
+    are only counted in ``duplicates``.
+    """
+
+    notification_id = models.CharField(max_length=100, unique=True)
+    action = models.CharField(max_length=100)
+    event_slug = models.CharField(max_length=100)
+    order_code = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=20,
+        choices=WebhookEventStatus.choices,
+        default=WebhookEventStatus.PENDING,
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    duplicates = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Webhook Event"
+        verbose_name_plural = "Webhook Events"
+
+    def __str__(self):
+        return f"{self.action} {self.order_code} ({self.notification_id})"
+
+    @classmethod
+    def counters(cls):
+        """Count the notifications received, dropped as repeats, and processed."""
+        totals = cls.objects.aggregate(
+            events=models.Count("pk"),
+            deduplicated=Coalesce(models.Sum("duplicates"), 0),
+            processed=models.Count(
+                "pk", filter=models.Q(status=WebhookEventStatus.PROCESSED)
+            ),
+        )
+        return {
+            "received": totals["events"] + totals["deduplicated"],
+            "deduplicated": totals["deduplicated"],
+            "processed": totals["processed"],
+        }
@@ -0,0 +1,134 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Min
+from django.utils.timezone import now
+
+from attendee.models import (
+    AttendeeProfile,
+    PretixOrder,
+    PretixPositions,
+    PretixSyncRun,
+    PretixSyncSource,
+)
+from common.pretix_wrapper import PretixRequestStats, get_wrapper
+
+from .models import WebhookEvent, WebhookEventStatus
+
+logger = logging.getLogger(__name__)
+
+# Pretix sends several notifications for one order within seconds (placed,
+# paid, modified), and many orders at once during a ticket launch. Each
+# notification is handled this long after it arrives, by which time the burst
+# is usually over and one task serves all of them.
+WEBHOOK_DEBOUNCE_SECONDS = 5
+WEBHOOK_BATCH_OVERLAP = timedelta(minutes=5)
+WEBHOOK_BATCH_MAX_AGE = timedelta(hours=1)
+
+
+def sync_pretix_order(order_data, conference=None, run=None):
+    """Create or update the order (and, once paid, its attendee profile).
+
+    Pass the order's ``conference`` when it is already known, to save
+    looking it up from the event slug. With a ``PretixSyncRun``, counts the
+    order as inserted, updated or skipped on it (the caller saves it).
+    """
+    order_code = order_data["code"]
+    conference = conference or PretixOrder.resolve_conference(order_data["event"])
+    order_instance, created = PretixOrder.objects.get_or_create(
+        order_code=order_code, defaults={"conference": conference}
+    )
+    if not created and order_instance.is_current(order_data):
+        logger.info(f"Order {order_code} is unchanged, skipping")
+        if run is not None:
+            run.orders_skipped += 1
+        return
+    if run is not None:
+        if created:
+            run.orders_inserted += 1
+        else:
+            run.orders_updated += 1
+    positions = PretixPositions(order_data)
+    order_instance.from_pretix_data(
+        order_data, conference=conference, positions=positions
+    )
+    order_instance.save()
+
+    # Create or update attendee profile for paid orders
+    if order_instance.status == "p":  # Paid status
+        profile, created = AttendeeProfile.objects.get_or_create(order=order_instance)
+        profile.from_pretix_data(order_data, positions)
+        profile.save()
+        logger.info(
+            f"{'Created' if created else 'Updated'} attendee profile for order {order_code}"
+        )
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def process_pretix_webhook_task(self, event_id):
+    """Fetch the orders pending Pretix webhook notifications are about and store them.
+
+    Handles every notification for the same Pretix event that was pending
+    when this task started, not only ``event_id``'s: during a burst, the
+    first task fetches the orders of all of them in a few requests
+    (``PretixWrapper.get_orders_by_code``), and the other tasks then have
+    nothing left to do. Pretix errors are retried after 1, 2 and 4 minutes;
+    after that the notification is marked failed, with the error, for the
+    next sync to pick up.
+    """
+    try:
+        event = WebhookEvent.objects.get(id=event_id)
+    except WebhookEvent.DoesNotExist:
+        return f"WebhookEvent with id {event_id} not found"
+    if event.status == WebhookEventStatus.PROCESSED:
+        return f"WebhookEvent {event_id} was already processed"
+
+    started = now()
+    pending = WebhookEvent.objects.filter(
+        event_slug=event.event_slug, creation_date__lte=started
+    ).exclude(status=WebhookEventStatus.PROCESSED)
+    batch = pending.aggregate(
+        codes=ArrayAgg("order_code", distinct=True, default=[]),
+        oldest=Min("creation_date"),
+    )
+    # Orders change in Pretix before it notifies us; allow for that, and for
+    # clock differences, but never list more than a burst's worth of changes.
+    # Orders outside the window are fetched by code.
+    modified_since = max(
+        batch["oldest"] - WEBHOOK_BATCH_OVERLAP, started - WEBHOOK_BATCH_MAX_AGE
+    )
+    conference = PretixOrder.resolve_conference(event.event_slug)
+    run = PretixSyncRun.objects.create(
+        conference=conference,
+        event_slug=event.event_slug,
+        source=PretixSyncSource.WEBHOOK,
+    )
+    stats = PretixRequestStats()
+    try:
+        with stats.record():
+            orders = get_wrapper(event.event_slug).get_orders_by_code(
+                batch["codes"], modified_since
+            )
+    except Exception as error:
+        run.add_requests(stats)
+        run.finish(error)
+        event.error = repr(error)
+        if self.request.retries >= self.max_retries:
+            event.status = WebhookEventStatus.FAILED
+            event.save(update_fields=["error", "status"])
+            raise
+        event.save(update_fields=["error"])
+        raise self.retry(
+            exc=error, countdown=self.default_retry_delay * 2**self.request.retries
+        )
+
+    run.add_requests(stats)
+    for order_data in orders:
+        sync_pretix_order(order_data, conference, run=run)
+    run.finish()
+    processed = pending.filter(order_code__in=batch["codes"]).update(
+        status=WebhookEventStatus.PROCESSED, processed_at=now(), error=""
+    )
+    return f"Processed {processed} notifications about {len(orders)} orders"